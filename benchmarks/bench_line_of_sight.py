@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: visibilité avec murs (table précalculée) vs rayon seul
+
+Compare, pour 10 joueurs sur N frames (positions aléatoires hors murs):
+    - rayon       : compute_visible_to_enemy() sans murs
+    - table       : compute_visible_to_enemy(line_of_sight=...), lecture de table
+    - marche      : marche de rayon à l'exécution, par paire à portée
+Mesure aussi la construction et le chargement (cache disque) de la table.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from lol_fog_predictor.fog.engine import CHAMPION_VISION_RADIUS, compute_visible_to_enemy
+from lol_fog_predictor.fog.line_of_sight import LOS_CELL_SIZE, get_line_of_sight
+from lol_fog_predictor.fog.structures import TURRET_POSITIONS
+
+FRAME_COUNTS = (60, 600, 6000)
+N_PAIRS = 100000
+MARCH_PAIRS = 2000  # La marche de rayon Python est mesurée sur un sous-ensemble
+TEAMS = np.array([100] * 5 + [200] * 5)
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Meilleur temps (s) sur `repeat` exécutions"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def random_positions(rng, free_x: np.ndarray, free_y: np.ndarray, shape) -> np.ndarray:
+    """Positions aléatoires dans des cellules hors murs"""
+    pick = rng.integers(0, len(free_x), shape)
+    cells = np.stack([free_x[pick], free_y[pick]], axis=-1)
+    return (cells + rng.uniform(0, 1, cells.shape)) * LOS_CELL_SIZE
+
+
+def ray_march(walls: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Marche de rayon cellule par cellule, à l'exécution (référence)"""
+    src = np.floor(sources / LOS_CELL_SIZE).astype(np.int64)
+    dst = np.floor(targets / LOS_CELL_SIZE).astype(np.int64)
+    result = np.ones(len(src), dtype=bool)
+    for i in range(len(src)):
+        steps = int(np.abs(dst[i] - src[i]).max())
+        for t in np.arange(1, steps) / max(steps, 1):
+            x, y = np.floor(src[i] + t * (dst[i] - src[i]) + 0.5).astype(np.int64)
+            if walls[y, x]:
+                result[i] = False
+                break
+    return result
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        line_of_sight = get_line_of_sight(cache_dir=Path(cache_dir))
+        build_s = time.perf_counter() - start
+
+        get_line_of_sight.cache_clear()
+        start = time.perf_counter()
+        get_line_of_sight(cache_dir=Path(cache_dir))
+        load_s = time.perf_counter() - start
+
+    walls = line_of_sight.walls
+    free_y, free_x = np.nonzero(~walls)
+
+    print(f"\n{'='*80}")
+    print(f"⏱️  BENCHMARK LIGNE DE VUE (cellules {LOS_CELL_SIZE}, {walls.mean()*100:.0f}% de murs)")
+    print(f"{'='*80}\n")
+    print(f"🧱 Table: {line_of_sight.table.nbytes / 1e6:.1f} Mo, "
+          f"construction {build_s:.2f}s, chargement {load_s * 1000:.0f} ms\n")
+    print(f"{'frames':>8} │ {'rayon µs/frame':>15} │ {'table µs/frame':>15} │ {'table/rayon':>11}")
+    print(f"{'─'*9}┼{'─'*17}┼{'─'*17}┼{'─'*12}")
+
+    for n_frames in FRAME_COUNTS:
+        positions = random_positions(rng, free_x, free_y, (n_frames, 10))
+
+        def run_radius():
+            return compute_visible_to_enemy(positions, TEAMS, TURRET_POSITIONS)
+
+        def run_table():
+            return compute_visible_to_enemy(positions, TEAMS, TURRET_POSITIONS, line_of_sight=line_of_sight)
+
+        radius_us = best_of(run_radius) / n_frames * 1e6
+        table_us = best_of(run_table) / n_frames * 1e6
+        print(f"{n_frames:>8,} │ {radius_us:>15.1f} │ {table_us:>15.1f} │ {table_us / radius_us:>10.2f}×")
+
+    # Paires source → cible à portée: lecture de table vs marche de rayon
+    sources = random_positions(rng, free_x, free_y, (N_PAIRS,))
+    angle = rng.uniform(0, 2 * np.pi, N_PAIRS)
+    distance = rng.uniform(0, CHAMPION_VISION_RADIUS, N_PAIRS)
+    targets = sources + np.stack([np.cos(angle), np.sin(angle)], axis=-1) * distance[:, None]
+    targets = np.clip(targets, 0, walls.shape[0] * LOS_CELL_SIZE - 1)
+
+    # La table et la marche doivent donner le même résultat
+    expected = ray_march(walls, sources[:MARCH_PAIRS], targets[:MARCH_PAIRS])
+    assert np.array_equal(line_of_sight.visible(sources[:MARCH_PAIRS], targets[:MARCH_PAIRS]), expected)
+
+    march_us = best_of(lambda: ray_march(walls, sources[:MARCH_PAIRS], targets[:MARCH_PAIRS]), repeat=1) / MARCH_PAIRS * 1e6
+    table_us = best_of(lambda: line_of_sight.visible(sources, targets)) / N_PAIRS * 1e6
+    print(f"\n🔦 Paires à portée: table {table_us:.3f} µs/paire, marche {march_us:.1f} µs/paire "
+          f"({march_us / table_us:.0f}×)")
+    print()
+
+
+if __name__ == '__main__':
+    main()
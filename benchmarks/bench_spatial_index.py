@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: requêtes "une source à portée ?" avec 100, 1 000 et 10 000 sources
+
+Compare:
+    - boucle      : version scalaire d'origine de is_enemy_visible() (une
+                    cible à la fois, Position.distance_to par source)
+    - dense       : within_radius(...).any(-1), matrice cibles × sources
+    - grille      : VisionGrid.any_within(), cellules de 1350 unités
+
+Sources réparties sur la moitié bleue de la map (rayon 900, comme des wards):
+les cibles côté rouge ne trouvent aucune source, la boucle fait un scan
+complet.
+"""
+
+import math
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from lol_fog_predictor.fog.engine import WARD_VISION_RADIUS, within_radius
+from lol_fog_predictor.fog.spatial_index import MAP_SIZE, VisionGrid
+
+N_TARGETS = 2000
+LOOP_TARGETS = 200  # La boucle Python est mesurée sur un sous-ensemble
+SOURCE_COUNTS = (100, 1000, 10000)
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Meilleur temps (s) sur `repeat` exécutions"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@dataclass
+class Position:
+    """Position sur la carte (dataclass d'origine du processeur)"""
+    x: float
+    y: float
+
+    def distance_to(self, other: 'Position') -> float:
+        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
+
+
+def loop_is_visible(enemy_pos: Position, ward_positions: List[Position]) -> bool:
+    """Boucle d'origine de is_enemy_visible(), réduite aux wards (900 unités)"""
+    for ward_pos in ward_positions:
+        if enemy_pos.distance_to(ward_pos) <= WARD_VISION_RADIUS:
+            return True
+    return False
+
+
+def main():
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(0, MAP_SIZE, (N_TARGETS, 2))
+
+    print(f"\n{'='*80}")
+    print(f"⏱️  BENCHMARK INDEX SPATIAL ({N_TARGETS} cibles, rayon {WARD_VISION_RADIUS})")
+    print(f"{'='*80}\n")
+    print(f"{'sources':>8} │ {'boucle µs/cible':>16} │ {'dense µs/cible':>15} │ "
+          f"{'grille µs/cible':>16} │ {'vs boucle':>9} │ {'vs dense':>8}")
+    print(f"{'─'*9}┼{'─'*18}┼{'─'*17}┼{'─'*18}┼{'─'*11}┼{'─'*9}")
+
+    for n_sources in SOURCE_COUNTS:
+        sources = rng.uniform(0, MAP_SIZE, (n_sources, 2))
+        sources[:, 0] *= 0.5  # Moitié bleue de la map
+
+        loop_sources = [Position(x, y) for x, y in sources]
+        loop_targets = [Position(x, y) for x, y in targets[:LOOP_TARGETS]]
+
+        def run_loop():
+            return [loop_is_visible(t, loop_sources) for t in loop_targets]
+
+        def run_dense():
+            return within_radius(targets[None], sources, WARD_VISION_RADIUS).any(axis=-1)
+
+        def run_grid():
+            return VisionGrid(sources, WARD_VISION_RADIUS).any_within(targets)
+
+        # Les trois méthodes doivent donner le même résultat
+        expected = run_dense()[0]
+        assert np.array_equal(run_grid(), expected)
+        assert run_loop() == expected[:LOOP_TARGETS].tolist()
+
+        loop_us = best_of(run_loop, repeat=1) / LOOP_TARGETS * 1e6
+        dense_us = best_of(run_dense) / N_TARGETS * 1e6
+        grid_us = best_of(run_grid) / N_TARGETS * 1e6
+
+        print(f"{n_sources:>8,} │ {loop_us:>16.2f} │ {dense_us:>15.3f} │ {grid_us:>16.3f} │ "
+              f"{loop_us / grid_us:>8.0f}× │ {dense_us / grid_us:>7.1f}×")
+
+    print()
+
+
+if __name__ == '__main__':
+    main()
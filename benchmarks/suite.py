@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks du pipeline, comparée à une baseline enregistrée
+
+Cas mesurés (matchs fournis dans data/riot_api/matches + entrées synthétiques):
+    - process_timeline      : process_timeline_to_dataset, 5 matchs / timeline ×SCALE
+    - ward_tracker          : construction de WardTracker, 5 matchs / timeline ×SCALE
+    - webapp_frames         : GET /api/match/<id>/frames (client de test Flask)
+    - chunk_parser          : ChunkParser.parse_all_chunks (chunks zstd synthétiques)
+    - block_parser          : BlockParser.parse_all_blocks (blocs synthétiques)
+    - parse_path_packet     : packets de mouvement synthétiques
+
+Chaque cas tourne dans un processus neuf (spawn): le pic de RSS mesuré est
+celui du cas seul. Résultats JSON par cas: ops/s, items/s, p50/p99 (ms),
+pic RSS (MB).
+
+Usage:
+    python benchmarks/suite.py                   # mesurer + comparer à baseline.json
+    python benchmarks/suite.py --save-baseline   # enregistrer la baseline
+    python benchmarks/suite.py --only parser     # cas dont le nom contient "parser"
+
+Code de sortie 1 si un cas régresse au-delà de la tolérance (débit ou RSS).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'webapp'))
+
+MATCHES_DIR = ROOT / 'data' / 'riot_api' / 'matches'
+RESULTS_PATH = Path(__file__).parent / 'results.json'
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+
+SCALE = 8               # Facteur des timelines synthétiques (durée ×SCALE)
+MIN_TIME = 2.0          # Durée minimale de mesure par cas (s)
+MIN_RUNS = 5
+TOLERANCE = 0.25        # Régression si ops/s < baseline × (1 - TOLERANCE)
+RSS_TOLERANCE = 0.25    # Régression si RSS > baseline × (1 + RSS_TOLERANCE)
+
+N_CHUNKS = 64
+BLOCKS_PER_CHUNK = 2000
+N_PATH_PACKETS = 10000
+
+
+# ============================================================================
+# Entrées synthétiques
+# ============================================================================
+
+def scale_timeline(timeline: Dict, factor: int) -> Dict:
+    """
+    Timeline `factor` fois plus longue: frames et events recopiés bout à
+    bout, timestamps décalés d'une durée de match à chaque copie
+    """
+    frames = timeline['info']['frames']
+    duration = frames[-1]['timestamp'] + timeline['info'].get('frameInterval', 60000)
+    scaled = []
+    for copy in range(factor):
+        shift = copy * duration
+        for frame in frames:
+            scaled.append({
+                **frame,
+                'timestamp': frame['timestamp'] + shift,
+                'events': [{**event, 'timestamp': event['timestamp'] + shift} for event in frame['events']],
+            })
+    return {**timeline, 'info': {**timeline['info'], 'frames': scaled}}
+
+
+def write_scaled_match(output_dir: Path, factor: int = SCALE) -> Tuple[Path, Path]:
+    """Écrire une copie ×factor du premier match fourni, renvoie (timeline, match)"""
+    timeline_path = sorted(MATCHES_DIR.glob('*_timeline.json'))[0]
+    match_id = timeline_path.stem.replace('_timeline', '')
+    with open(timeline_path) as f:
+        timeline = scale_timeline(json.load(f), factor)
+
+    scaled_id = f'{match_id}_x{factor}'
+    scaled_timeline = output_dir / f'{scaled_id}_timeline.json'
+    scaled_match = output_dir / f'{scaled_id}.json'
+    with open(scaled_timeline, 'w') as f:
+        json.dump(timeline, f)
+    scaled_match.write_bytes((MATCHES_DIR / f'{match_id}.json').read_bytes())
+    return scaled_timeline, scaled_match
+
+
+def encode_blocks(n_blocks: int, payload_size: int = 32, seed: int = 0) -> bytes:
+    """
+    Blocs au format de BlockParser: temps relatif (1 octet), longueur u8,
+    packet_id répété une fois sur deux, param relatif
+    """
+    rng = np.random.default_rng(seed)
+    out = bytearray()
+    for i in range(n_blocks):
+        reuse_packet = i % 2 == 1
+        marker = 0x80 | 0x10 | 0x20 | (0x40 if reuse_packet else 0)
+        out.append(marker)
+        out.append(int(rng.integers(0, 50)))          # delta temps (ms)
+        out.append(payload_size)                      # longueur
+        if not reuse_packet:
+            out += struct.pack('<H', int(rng.integers(0, 0x200)))
+        out.append(int(rng.integers(0, 4)))           # delta param
+        out += rng.bytes(payload_size)
+    return bytes(out)
+
+
+def encode_chunks(payloads: List[bytes]) -> bytes:
+    """Chunks au format de ChunkParser: en-tête 17 octets + payload zstd"""
+    import zstandard as zstd
+
+    compressor = zstd.ZstdCompressor(level=3)
+    out = bytearray()
+    for i, payload in enumerate(payloads):
+        compressed = compressor.compress(payload)
+        out += struct.pack('<IBIII', i + 1, 2, 0, len(payload), len(compressed))
+        out += compressed
+    return bytes(out)
+
+
+def encode_path_packet(entity_id: int, waypoints: np.ndarray, speed: float = 345.0) -> bytes:
+    """Packet de mouvement au format lu par parse_path_packet (en-tête, flags, coordonnées u16)"""
+    n = len(waypoints)
+    header = struct.pack('<HIf', n << 1, entity_id, speed)
+    flags = bytes(((n - 2) >> 2) + 1) if n > 1 else b''
+    coords = b''.join(
+        struct.pack('<hh', int((x - 7358.0) / 2), int((y - 7412.0) / 2)) for x, y in waypoints
+    )
+    return header + flags + coords
+
+
+# ============================================================================
+# Cas de benchmark: setup() → (fonction mesurée, items par exécution)
+# ============================================================================
+
+def bundled_matches() -> List[Tuple[Path, Path]]:
+    return [
+        (path, path.with_name(path.name.replace('_timeline', '')))
+        for path in sorted(MATCHES_DIR.glob('*_timeline.json'))
+    ]
+
+
+def setup_process_timeline(workdir: Path, synthetic: bool) -> Tuple[Callable, int]:
+    from lol_fog_predictor.api.timeline_processor import process_timeline_to_dataset
+
+    matches = [write_scaled_match(workdir)] if synthetic else bundled_matches()
+    rows = [0]
+
+    def run():
+        rows[0] = sum(process_timeline_to_dataset(t, m).height for t, m in matches)
+
+    run()  # Caches colonnaires construits hors mesure
+    return run, rows[0]
+
+
+def setup_ward_tracker(workdir: Path, synthetic: bool) -> Tuple[Callable, int]:
+    from lol_fog_predictor.api.timeline_cache import get_timeline_cache
+    from lol_fog_predictor.fog.wards import WardTracker
+
+    matches = [write_scaled_match(workdir)] if synthetic else bundled_matches()
+    caches = [get_timeline_cache(t) for t, _ in matches]
+
+    def run():
+        return [WardTracker(cache) for cache in caches]
+
+    wards = sum(len(tracker.wards) for tracker in run())
+    return run, wards
+
+
+def setup_webapp_frames(workdir: Path, synthetic: bool) -> Tuple[Callable, int]:
+    from lol_fog_predictor.api.dataset import scan_dataset
+    from lol_fog_predictor.api.timeline_processor import process_multiple_matches
+    import app as webapp
+
+    process_multiple_matches(MATCHES_DIR, workdir / 'fog_dataset', workers=1)
+    webapp.df = scan_dataset(workdir / 'fog_dataset')
+    client = webapp.app.test_client()
+    match_ids = [t.stem.replace('_timeline', '') for t, _ in bundled_matches()]
+
+    def run():
+        for match_id in match_ids:
+            response = client.get(f'/api/match/{match_id}/frames')
+            assert response.status_code == 200, response.status_code
+
+    return run, len(match_ids)
+
+
+def setup_chunk_parser(workdir: Path, synthetic: bool) -> Tuple[Callable, int]:
+    from lol_fog_predictor.parser.chunk_parser import ChunkParser
+
+    data = encode_chunks([encode_blocks(BLOCKS_PER_CHUNK, seed=i) for i in range(N_CHUNKS)])
+
+    def run():
+        chunks = ChunkParser(data).parse_all_chunks()
+        assert len(chunks) == N_CHUNKS
+
+    return run, len(data)
+
+
+def setup_block_parser(workdir: Path, synthetic: bool) -> Tuple[Callable, int]:
+    from lol_fog_predictor.parser.block_parser import BlockParser
+
+    payload = encode_blocks(BLOCKS_PER_CHUNK * 8)
+
+    def run():
+        blocks = BlockParser(payload).parse_all_blocks()
+        assert len(blocks) == BLOCKS_PER_CHUNK * 8
+
+    return run, BLOCKS_PER_CHUNK * 8
+
+
+def setup_parse_path_packet(workdir: Path, synthetic: bool) -> Tuple[Callable, int]:
+    from lol_fog_predictor.parser.position_extractor import parse_path_packet
+
+    rng = np.random.default_rng(0)
+    packets = [
+        encode_path_packet(int(entity), rng.uniform(500, 14000, (int(rng.integers(1, 8)), 2)))
+        for entity in rng.integers(0x40000000, 0x40000100, N_PATH_PACKETS)
+    ]
+
+    def run():
+        for i, payload in enumerate(packets):
+            packet = parse_path_packet(i * 0.01, payload)
+            assert packet is not None
+
+    return run, len(packets)
+
+
+# Nom → (setup, synthétique, unité des items)
+CASES: Dict[str, Tuple[Callable, bool, str]] = {
+    'process_timeline[bundled]': (setup_process_timeline, False, 'rows'),
+    f'process_timeline[synthetic x{SCALE}]': (setup_process_timeline, True, 'rows'),
+    'ward_tracker[bundled]': (setup_ward_tracker, False, 'wards'),
+    f'ward_tracker[synthetic x{SCALE}]': (setup_ward_tracker, True, 'wards'),
+    'webapp_frames[bundled]': (setup_webapp_frames, False, 'requests'),
+    'chunk_parser[synthetic]': (setup_chunk_parser, True, 'bytes'),
+    'block_parser[synthetic]': (setup_block_parser, True, 'blocks'),
+    'parse_path_packet[synthetic]': (setup_parse_path_packet, True, 'packets'),
+}
+
+
+# ============================================================================
+# Mesure
+# ============================================================================
+
+def run_case(name: str, min_time: float = MIN_TIME, min_runs: int = MIN_RUNS) -> Dict:
+    """Exécuter un cas (dans un processus dédié) et renvoyer ses métriques"""
+    setup, synthetic, unit = CASES[name]
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        fn, items = setup(Path(tmp), synthetic)
+
+        times = []
+        start = time.perf_counter()
+        while len(times) < min_runs or time.perf_counter() - start < min_time:
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+
+    times = np.array(times)
+    return {
+        'runs': len(times),
+        'ops_per_s': float(len(times) / times.sum()),
+        'items': int(items),
+        'unit': unit,
+        'items_per_s': float(items * len(times) / times.sum()),
+        'p50_ms': float(np.percentile(times, 50) * 1000),
+        'p99_ms': float(np.percentile(times, 99) * 1000),
+        # ru_maxrss: KB sous Linux, octets sous macOS
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = TOLERANCE, rss_tolerance: float = RSS_TOLERANCE) -> List[str]:
+    """Cas en régression par rapport à la baseline (messages)"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['ops_per_s'] < reference['ops_per_s'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['ops_per_s']:.2f} ops/s < baseline {reference['ops_per_s']:.2f}")
+        if result['peak_rss_mb'] > reference['peak_rss_mb'] * (1 + rss_tolerance):
+            regressions.append(f"{name}: RSS {result['peak_rss_mb']:.0f} MB > baseline {reference['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du pipeline (résultats JSON + comparaison baseline)")
+    parser.add_argument('--only', help="Ne lancer que les cas dont le nom contient ce texte")
+    parser.add_argument('--output', type=Path, default=RESULTS_PATH, help="Fichier de résultats JSON")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="Baseline JSON")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistrer les résultats comme baseline")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help="Durée minimale de mesure par cas (s)")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Baisse de débit tolérée (fraction)")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if not args.only or args.only in name]
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)['cases']
+
+    print(f"\n{'='*100}")
+    print(f"⏱️  BENCHMARKS ({len(names)} cas, ≥{args.min_time:g}s chacun)")
+    print(f"{'='*100}\n")
+    print(f"{'cas':<34} │ {'ops/s':>9} │ {'items/s':>18} │ {'p50 ms':>9} │ {'p99 ms':>9} │ {'RSS MB':>7} │ {'vs base':>7}")
+    print(f"{'─'*35}┼{'─'*11}┼{'─'*20}┼{'─'*11}┼{'─'*11}┼{'─'*9}┼{'─'*8}")
+
+    results = {}
+    for name in names:
+        # Un processus neuf par cas: pic de RSS propre au cas
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            result = pool.submit(run_case, name, args.min_time).result()
+        results[name] = result
+
+        reference = baseline.get(name)
+        ratio = f"{result['ops_per_s'] / reference['ops_per_s']:.2f}×" if reference else '—'
+        print(f"{name:<34} │ {result['ops_per_s']:>9.2f} │ {result['items_per_s']:>10.0f} {result['unit']:<7} │ "
+              f"{result['p50_ms']:>9.1f} │ {result['p99_ms']:>9.1f} │ {result['peak_rss_mb']:>7.0f} │ {ratio:>7}")
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cases': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Résultats: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline enregistrée: {args.baseline}")
+        return
+
+    if not baseline:
+        print("ℹ️  Pas de baseline (lancer avec --save-baseline)")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s):")
+        for message in regressions:
+            print(f"   - {message}")
+        sys.exit(1)
+    print("\n✅ Aucune régression")
+
+
+if __name__ == '__main__':
+    main()
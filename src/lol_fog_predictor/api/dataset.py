@@ -0,0 +1,182 @@
+"""
+Stockage du dataset fog of war en Parquet partitionné par match
+
+Layout (partitionnement hive):
+    data/processed/fog_dataset/
+        _manifest.json
+        match_id=EUW1_7596338656/part-0.parquet
+        ...
+
+Les lecteurs passent par scan_dataset(): un filtre sur match_id ne lit que
+la partition concernée (predicate pushdown sur le chemin).
+"""
+
+from pathlib import Path
+from typing import List, Union
+
+import polars as pl
+
+from lol_fog_predictor.fog.engine import (
+    SOURCE_CHAMPION_MASK,
+    SOURCE_CHAMPION_SHIFT,
+    SOURCE_MINION_BIT,
+    SOURCE_TURRET_MASK,
+    SOURCE_TURRET_SHIFT,
+    SOURCE_WARD_BIT,
+    TEAMS,
+)
+from lol_fog_predictor.fog.raster import COVERAGE_REGIONS
+from lol_fog_predictor.fog.structures import TURRET_POSITIONS
+
+DATASET_DIR = Path('data/processed/fog_dataset')
+PARTITION_FILE = 'part-0.parquet'
+
+# Schéma explicite d'une partition (match_id vient du chemin)
+DATASET_SCHEMA = {
+    'timestamp': pl.Int32,
+    'participant_id': pl.Int8,
+    'champion': pl.Categorical(),
+    'team': pl.Int16,
+    'position_x': pl.Int16,
+    'position_y': pl.Int16,
+    'visible_to_enemy': pl.Boolean,
+    'level': pl.Int8,
+    'total_gold': pl.Int32,
+    # Dernière observation par l'équipe adverse (null si jamais vu)
+    'last_visible_ts': pl.Int32,
+    'last_visible_x': pl.Int16,
+    'last_visible_y': pl.Int16,
+    'time_in_fog': pl.Int32,
+    # Bitset des sources qui voient le joueur (voir fog/engine.py, vision_source_columns)
+    'vision_sources': pl.UInt64,
+    # Ward adverse la plus proche qui le voit: index dans build_wards() /
+    # WardTracker.wards du match (ordre de placement), null si aucune
+    'spotter_ward': pl.Int16,
+    # Part de la map / de chaque région dans la vision de l'équipe du joueur
+    # au même timestamp (voir fog/raster.py, COVERAGE_REGIONS)
+    **{f'coverage_{region}': pl.Float32 for region in COVERAGE_REGIONS},
+}
+
+# Taille d'équipe des matchs Riot: participants 1-5 en équipe 100, 6-10 en 200
+TEAM_SIZE = 5
+
+
+def last_seen_columns() -> List[pl.Expr]:
+    """
+    Colonnes "dernière fois vu" par (match_id, participant_id)
+
+    Forward-fill des lignes visibles dans la fenêtre du joueur, en une passe
+    O(n). Les lignes doivent être triées par timestamp dans chaque match
+    (ordre des partitions). Chaque match ne dépend que de ses propres lignes:
+    ajouter des partitions ne demande pas de recalculer les autres.
+    """
+    visible = pl.col('visible_to_enemy')
+    window = ('match_id', 'participant_id')
+    last_ts = pl.when(visible).then(pl.col('timestamp')).forward_fill().over(*window)
+    return [
+        last_ts.alias('last_visible_ts'),
+        pl.when(visible).then(pl.col('position_x')).forward_fill().over(*window).alias('last_visible_x'),
+        pl.when(visible).then(pl.col('position_y')).forward_fill().over(*window).alias('last_visible_y'),
+        (pl.col('timestamp') - last_ts).alias('time_in_fog'),
+    ]
+
+
+def _has_bit(column: str, mask: int) -> pl.Expr:
+    return (pl.col(column) & pl.lit(mask, dtype=pl.UInt64)) != 0
+
+
+def vision_source_columns(column: str = 'vision_sources') -> List[pl.Expr]:
+    """
+    Décoder le bitset des sources de vision
+
+    Colonnes produites:
+        - seen_by_champion / seen_by_turret / seen_by_ward / seen_by_minion
+        - spotter_ids: participant_id des champions adverses qui voient le joueur
+          (rang dans l'équipe → participant_id, disposition Riot TEAM_SIZE)
+        - spotter_turrets: index des tourelles adverses qui le voient
+          (dans TURRET_POSITIONS[équipe adverse])
+
+    Le bitset ne dit que "au moins une ward" / "au moins un sbire": la
+    ward attribuée est dans la colonne spotter_ward du dataset (index de
+    la ward dans le match, voir DATASET_SCHEMA); les sbires synthétiques
+    n'ont pas d'identité.
+    """
+    # Équipe observatrice = l'autre équipe; son premier participant_id
+    first_spotter = pl.when(pl.col('team') == TEAMS[0]).then(TEAM_SIZE + 1).otherwise(1)
+    spotters = [
+        pl.when(_has_bit(column, 1 << (SOURCE_CHAMPION_SHIFT + rank))).then(first_spotter + rank)
+        for rank in range(TEAM_SIZE)
+    ]
+    n_turrets = max(len(positions) for positions in TURRET_POSITIONS.values())
+    turrets = [
+        pl.when(_has_bit(column, 1 << (SOURCE_TURRET_SHIFT + index))).then(pl.lit(index, dtype=pl.Int8))
+        for index in range(n_turrets)
+    ]
+    return [
+        _has_bit(column, SOURCE_CHAMPION_MASK).alias('seen_by_champion'),
+        _has_bit(column, SOURCE_TURRET_MASK).alias('seen_by_turret'),
+        _has_bit(column, 1 << SOURCE_WARD_BIT).alias('seen_by_ward'),
+        _has_bit(column, 1 << SOURCE_MINION_BIT).alias('seen_by_minion'),
+        pl.concat_list(spotters).list.drop_nulls().cast(pl.List(pl.Int8)).alias('spotter_ids'),
+        pl.concat_list(turrets).list.drop_nulls().alias('spotter_turrets'),
+    ]
+
+
+def to_dataset_schema(df: pl.DataFrame) -> pl.DataFrame:
+    """Caster les colonnes connues vers DATASET_SCHEMA (autres colonnes inchangées)"""
+    return df.with_columns(
+        pl.col(name).cast(dtype) for name, dtype in DATASET_SCHEMA.items() if name in df.columns
+    )
+
+
+def partition_path(dataset_dir: Path, match_id: str) -> Path:
+    """Chemin de la partition d'un match"""
+    return dataset_dir / f"match_id={match_id}" / PARTITION_FILE
+
+
+def write_partition(df: pl.DataFrame, dataset_dir: Path, match_id: str) -> Path:
+    """
+    Écrire la partition Parquet d'un match
+
+    Args:
+        df: Lignes du match (une éventuelle colonne match_id est retirée,
+            elle est portée par le nom du dossier)
+        dataset_dir: Racine du dataset
+        match_id: ID du match
+
+    Returns:
+        Chemin du fichier écrit
+    """
+    path = partition_path(dataset_dir, match_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    to_dataset_schema(df.drop('match_id', strict=False)).write_parquet(
+        path, compression='zstd', statistics=True
+    )
+    return path
+
+
+def scan_dataset(dataset_dir: Union[Path, str] = DATASET_DIR) -> pl.LazyFrame:
+    """
+    Scanner le dataset partitionné (lazy)
+
+    Si le dossier n'existe pas mais qu'un ancien fog_dataset.csv est présent
+    à côté, il est scanné à la place avec le même schéma.
+    """
+    dataset_dir = Path(dataset_dir)
+
+    if dataset_dir.is_dir():
+        return pl.scan_parquet(
+            dataset_dir / '**' / '*.parquet',
+            hive_partitioning=True,
+            hive_schema={'match_id': pl.String},
+        )
+
+    legacy_csv = dataset_dir.with_suffix('.csv')
+    if legacy_csv.exists():
+        lf = pl.scan_csv(legacy_csv)
+        columns = lf.collect_schema().names()
+        return lf.with_columns(
+            pl.col(name).cast(dtype) for name, dtype in DATASET_SCHEMA.items() if name in columns
+        )
+
+    raise FileNotFoundError(f"Dataset non trouvé: {dataset_dir}")
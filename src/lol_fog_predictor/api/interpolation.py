@@ -0,0 +1,137 @@
+"""
+Interpolation des trajectoires sous la minute
+
+Les frames de timeline arrivent toutes les 60s (frameInterval). On
+densifie les positions sur une grille régulière (1s, 5s, 10s...) à partir
+d'ancres horodatées:
+    - positions des participantFrames
+    - events avec position: CHAMPION_KILL (tueur + victime),
+      ELITE_MONSTER_KILL, BUILDING_KILL, TURRET_PLATE_DESTROYED (tueur)
+
+Entre deux ancres la position est interpolée linéairement, avec une
+vitesse de déplacement plafonnée à max_speed. Si deux ancres sont trop
+éloignées pour être reliées à cette vitesse (recall, mort, téléportation),
+le joueur avance à max_speed puis saute sur l'ancre suivante.
+
+Tout est vectorisé sur les 10 joueurs × tous les instants de la grille.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from lol_fog_predictor.api.timeline_cache import TimelineCache
+
+# Vitesse max plausible d'un champion (bottes + buffs), unités/s
+MAX_MOVEMENT_SPEED = 550
+
+# Events dont la position ancre le tueur (killerId)
+KILLER_ANCHOR_EVENTS = (
+    'CHAMPION_KILL',
+    'ELITE_MONSTER_KILL',
+    'BUILDING_KILL',
+    'TURRET_PLATE_DESTROYED',
+)
+
+
+def collect_anchors(cache: TimelineCache) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rassembler les ancres (joueur, temps, position) d'un match
+
+    Returns:
+        (player (A,) index 0..P-1, time (A,) ms, xy (A, 2)),
+        triés par joueur puis par temps
+    """
+    n_participants = cache.n_participants
+    positions = np.asarray(cache.positions, dtype=np.float64)
+
+    # Ancres des frames
+    frame_idx, player_idx = np.nonzero(~np.isnan(positions[..., 0]))
+    players = [player_idx]
+    times = [np.asarray(cache.timestamps, dtype=np.int64)[frame_idx]]
+    coords = [positions[frame_idx, player_idx]]
+
+    # Ancres des events
+    for event_type in KILLER_ANCHOR_EVENTS:
+        events = cache.events_of_type(event_type)
+        id_columns = ['killer_id', 'victim_id'] if event_type == 'CHAMPION_KILL' else ['killer_id']
+
+        for column in id_columns:
+            ids = events[column].astype(np.int64)
+            keep = (ids >= 1) & (ids <= n_participants) & ~np.isnan(events['x'])
+            players.append(ids[keep] - 1)
+            times.append(events['timestamp'][keep].astype(np.int64))
+            coords.append(np.stack([events['x'][keep], events['y'][keep]], axis=-1).astype(np.float64))
+
+    player = np.concatenate(players)
+    time = np.concatenate(times)
+    xy = np.concatenate(coords)
+
+    order = np.lexsort((time, player))
+    return player[order], time[order], xy[order]
+
+
+def time_grid(end_ms: int, step_ms: int) -> np.ndarray:
+    """Instants 0, step, 2·step, ... ≤ end_ms"""
+    return np.arange(0, end_ms + 1, step_ms, dtype=np.int64)
+
+
+def frame_index_at(frame_timestamps: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Index de la dernière frame ≤ t pour chaque t (0 avant la première frame)"""
+    idx = np.searchsorted(frame_timestamps, times, side='right') - 1
+    return np.clip(idx, 0, len(frame_timestamps) - 1)
+
+
+def interpolate_positions(
+    cache: TimelineCache,
+    step_ms: int = 1000,
+    max_speed: float = MAX_MOVEMENT_SPEED,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Densifier les positions d'un match sur une grille régulière
+
+    Args:
+        cache: Timeline du match
+        step_ms: Pas de la grille (ms), ex: 1000, 5000, 10000
+        max_speed: Vitesse de déplacement maximale (unités/s)
+
+    Returns:
+        (grid (T,) ms, positions (T, P, 2)), NaN pour un joueur sans ancre
+    """
+    n_participants = cache.n_participants
+    grid = time_grid(int(cache.timestamps[-1]) if cache.n_frames else 0, step_ms)
+    positions = np.full((len(grid), n_participants, 2), np.nan)
+
+    player, time, xy = collect_anchors(cache)
+    if not len(player):
+        return grid, positions
+
+    # Clé (joueur, temps) pour chercher tous les segments en un searchsorted
+    keys = (player << 32) | time
+    players = np.arange(n_participants, dtype=np.int64)
+    first = np.searchsorted(keys, players << 32)
+    last = np.searchsorted(keys, (players + 1) << 32) - 1
+    has_anchor = last >= first
+
+    queries = (players[None, :] << 32) | grid[:, None]          # (T, P)
+    idx = np.searchsorted(keys, queries, side='right') - 1
+    start = np.clip(idx, first, np.maximum(last, first))
+    end = np.clip(idx + 1, first, np.maximum(last, first))
+    start = np.minimum(start, len(keys) - 1)
+    end = np.minimum(end, len(keys) - 1)
+
+    t0, t1 = time[start], time[end]
+    p0, p1 = xy[start], xy[end]
+    dt = t1 - t0
+
+    # Fraction du segment parcourue, plafonnée par la vitesse max
+    alpha = np.where(dt > 0, (grid[:, None] - t0) / np.maximum(dt, 1), 0.0)
+    alpha = np.clip(alpha, 0.0, 1.0)
+    distance = np.linalg.norm(p1 - p0, axis=-1)
+    reachable = max_speed * dt / 1000
+    cap = np.where(distance > reachable, reachable / np.maximum(distance, 1e-9), 1.0)
+
+    positions[:] = p0 + (p1 - p0) * (alpha * cap)[..., None]
+    positions[:, ~has_anchor] = np.nan
+
+    return grid, positions
@@ -0,0 +1,153 @@
+"""
+Manifest des builds incrémentaux du dataset fog of war
+
+Enregistre pour chaque match l'empreinte des fichiers timeline et match
+(mtime, taille, sha256), la version du code de traitement et celles des
+caches fog utilisés (ligne de vue, masques...) qui ont produit sa partition.
+Un rebuild ne retraite que les matchs nouveaux ou modifiés.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class ManifestEntry:
+    """Empreinte d'un match déjà traité"""
+    timeline_mtime_ns: int
+    timeline_size: int
+    timeline_sha256: str
+    processor_version: int
+    partition: str  # Chemin relatif au dossier du manifest
+    rows: int
+    options: Dict = field(default_factory=dict)  # Options du traitement (ex: step_ms)
+    # Fichier match (champions, équipes); vide pour un manifest ancien → rebuild
+    match_mtime_ns: int = 0
+    match_size: int = 0
+    match_sha256: str = ''
+    cache_versions: Dict = field(default_factory=dict)  # Versions des caches fog (ex: line_of_sight)
+
+
+def file_sha256(path: Path) -> str:
+    """Hash sha256 d'un fichier (lecture par blocs de 1 MB)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetManifest:
+    """Manifest JSON {match_id: ManifestEntry} stocké à côté des partitions"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+
+        if path.exists():
+            with open(path) as f:
+                raw = json.load(f)
+            self.entries = {
+                match_id: ManifestEntry(**entry)
+                for match_id, entry in raw.get('matches', {}).items()
+            }
+
+    def is_up_to_date(
+        self,
+        match_id: str,
+        timeline_path: Path,
+        match_path: Path,
+        processor_version: int,
+        options: Optional[Dict] = None,
+        cache_versions: Optional[Dict] = None,
+    ) -> bool:
+        """
+        Vérifier si la partition d'un match est à jour (mêmes versions, mêmes
+        options, fichiers timeline et match inchangés)
+        """
+        entry = self.entries.get(match_id)
+        if entry is None or entry.processor_version != processor_version:
+            return False
+        if entry.options != (options or {}) or entry.cache_versions != (cache_versions or {}):
+            return False
+
+        partition = self.path.parent / entry.partition
+        if not partition.exists() or not match_path.exists():
+            return False
+
+        return self._file_unchanged(entry, 'timeline', timeline_path) and self._file_unchanged(entry, 'match', match_path)
+
+    @staticmethod
+    def _file_unchanged(entry: ManifestEntry, prefix: str, path: Path) -> bool:
+        """
+        Empreinte `<prefix>_*` de l'entrée identique au fichier
+
+        mtime + taille identiques suffisent; sinon on compare le sha256
+        (fichier re-téléchargé ou touché sans changement de contenu).
+        """
+        stat = path.stat()
+        mtime_field = f'{prefix}_mtime_ns'
+        size = getattr(entry, f'{prefix}_size')
+        if stat.st_mtime_ns == getattr(entry, mtime_field) and stat.st_size == size:
+            return True
+
+        if stat.st_size != size or file_sha256(path) != getattr(entry, f'{prefix}_sha256'):
+            return False
+
+        # Contenu identique: mettre à jour le mtime pour éviter de re-hasher
+        setattr(entry, mtime_field, stat.st_mtime_ns)
+        return True
+
+    def record(
+        self,
+        match_id: str,
+        timeline_path: Path,
+        match_path: Path,
+        processor_version: int,
+        partition: Path,
+        rows: int,
+        options: Optional[Dict] = None,
+        cache_versions: Optional[Dict] = None,
+    ):
+        """Enregistrer la partition produite pour un match"""
+        timeline_stat, match_stat = timeline_path.stat(), match_path.stat()
+        self.entries[match_id] = ManifestEntry(
+            timeline_mtime_ns=timeline_stat.st_mtime_ns,
+            timeline_size=timeline_stat.st_size,
+            timeline_sha256=file_sha256(timeline_path),
+            processor_version=processor_version,
+            partition=os.path.relpath(partition, self.path.parent),
+            rows=rows,
+            options=options or {},
+            match_mtime_ns=match_stat.st_mtime_ns,
+            match_size=match_stat.st_size,
+            match_sha256=file_sha256(match_path),
+            cache_versions=cache_versions or {},
+        )
+
+    def prune(self, keep: Iterable[str]) -> List[Path]:
+        """
+        Retirer les matchs absents de `keep` (timeline supprimée)
+
+        Returns:
+            Partitions des matchs retirés (à supprimer par l'appelant)
+        """
+        keep = set(keep)
+        removed = [match_id for match_id in self.entries if match_id not in keep]
+        return [self.path.parent / self.entries.pop(match_id).partition for match_id in removed]
+
+    def partitions(self) -> List[Path]:
+        """Chemins des partitions, triés par match_id"""
+        return [self.path.parent / self.entries[m].partition for m in sorted(self.entries)]
+
+    def save(self):
+        """Écriture atomique du manifest"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'matches': {m: asdict(e) for m, e in sorted(self.entries.items())}}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,523 @@
+"""
+Générateur de matchs synthétiques au format de l'API Riot (match-v5)
+
+Produit des paires {match_id}.json / {match_id}_timeline.json hors ligne,
+en n'importe quelle quantité et pour n'importe quelle durée, lisibles par
+timeline_processor et WardTracker comme les matchs téléchargés:
+    - Déplacements par rôle: laners sur leur lane (front de vague commun
+      aux deux équipes, marche aléatoire), supports avec le bot, junglers
+      de camp en camp, regroupements en fin de partie, retour en fontaine
+      pendant la mort
+    - Events: WARD_PLACED / WARD_KILL (mêmes types que WARD_DURATIONS),
+      CHAMPION_KILL, BUILDING_KILL (tourelles de TURRET_POSITIONS dans
+      l'ordre outer → inner → base → nexus, inhibiteurs),
+      ELITE_MONSTER_KILL (dragons, larves, héraut, baron), GAME_END
+    - participantFrames: position, level, totalGold, xp... toutes les 60s
+      et une dernière frame à la fin du match
+
+Chaque match est déterminé par (seed, index): regénérer donne les mêmes
+fichiers. Les champs non lus par le pipeline (stats détaillées, items) ne
+sont pas générés.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from lol_fog_predictor.fog.line_of_sight import FOUNTAIN_POSITIONS
+from lol_fog_predictor.fog.minions import LANE_PATHS, lane_length, lane_point
+from lol_fog_predictor.fog.spatial_index import MAP_SIZE
+from lol_fog_predictor.fog.structures import TURRET_POSITIONS
+from lol_fog_predictor.fog.wards import WARD_DURATIONS
+
+SYNTHETIC_DIR = Path('data/synthetic/matches')
+PLATFORM = 'SYN1'
+FIRST_GAME_ID = 9_000_000_000
+FRAME_INTERVAL_MS = 60000
+GAME_VERSION = '15.22.724.5161'
+
+ROLES = ('TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY')
+ROLE_LANES = {'TOP': 'TOP', 'MIDDLE': 'MID', 'BOTTOM': 'BOT', 'UTILITY': 'BOT'}
+TEAMS = (100, 200)
+
+CHAMPIONS = [
+    ('Aatrox', 266), ('Ahri', 103), ('Ashe', 22), ('Braum', 201), ('Briar', 233),
+    ('Caitlyn', 51), ('Darius', 122), ('Ezreal', 81), ('Garen', 86), ('Graves', 104),
+    ('Jinx', 222), ('Kaisa', 145), ('LeeSin', 64), ('Leona', 89), ('Lux', 99),
+    ('Morgana', 25), ('Nautilus', 111), ('Orianna', 61), ('Sylas', 517), ('Thresh', 412),
+    ('Viego', 234), ('Yasuo', 157), ('Zed', 238), ('Zeri', 221),
+]
+
+DRAGON_PIT = (9866, 4414)
+BARON_PIT = (5007, 10471)
+
+# Camps de la jungle bleue (approximatifs); ceux de la jungle rouge sont symétriques
+BLUE_JUNGLE_CAMPS = np.array([
+    (3800, 7900),    # Buff bleu
+    (7700, 4000),    # Buff rouge
+    (2100, 8400),    # Gromp
+    (6900, 5400),    # Raptors
+    (3800, 6500),    # Loups
+    (8400, 2700),    # Krugs
+    (10400, 5200),   # Scuttle bot
+], dtype=np.float64)
+
+INHIBITOR_POSITIONS = {
+    100: {'TOP_LANE': (1171, 3571), 'MID_LANE': (3203, 3208), 'BOT_LANE': (3452, 1236)},
+    200: {'TOP_LANE': (11261, 13676), 'MID_LANE': (11598, 11667), 'BOT_LANE': (13604, 11316)},
+}
+
+# Index dans TURRET_POSITIONS[team] des tourelles de chaque lane, de l'extérieur vers la base
+LANE_TURRETS = {'TOP_LANE': (0, 1, 2), 'MID_LANE': (3, 4, 5), 'BOT_LANE': (7, 8, 9)}
+NEXUS_TURRET = 6
+TOWER_TYPES = ('OUTER_TURRET', 'INNER_TURRET', 'BASE_TURRET')
+
+KILLS_PER_MINUTE = 3.0
+WARDS_PER_MINUTE = {'UTILITY': 1.6, 'JUNGLE': 0.9}
+DEFAULT_WARDS_PER_MINUTE = 0.5
+WARD_KILL_PROBABILITY = 0.2
+CONTROL_WARD_LIFETIME_MS = 600000  # Durée max avant destruction tirée pour une control ward
+DRAGON_TYPES = ('FIRE_DRAGON', 'WATER_DRAGON', 'EARTH_DRAGON', 'AIR_DRAGON', 'HEXTECH_DRAGON', 'CHEMTECH_DRAGON')
+
+POSITION_JITTER = 300
+LANE_OFFSET = 400          # Écart entre un laner et le front de vague, vers sa base
+GROUP_AFTER_MS = 25 * 60000
+GROUP_PROBABILITY = 0.3
+
+
+def team_of(participant_id: int) -> int:
+    return 100 if participant_id <= 5 else 200
+
+
+def role_of(participant_id: int) -> str:
+    return ROLES[(participant_id - 1) % 5]
+
+
+def mirror(points: np.ndarray) -> np.ndarray:
+    """Symétrie centrale de la map (côté bleu ↔ côté rouge)"""
+    return MAP_SIZE - np.asarray(points, dtype=np.float64)
+
+
+def interpolate_track(times: np.ndarray, track: np.ndarray, at: float) -> np.ndarray:
+    """Position (2,) d'une trajectoire (T, 2) à l'instant `at`"""
+    return np.array([np.interp(at, times, track[:, 0]), np.interp(at, times, track[:, 1])])
+
+
+def generate_tracks(rng: np.random.Generator, times: np.ndarray) -> np.ndarray:
+    """
+    Trajectoires des 10 joueurs vivants aux instants des frames
+
+    Returns:
+        (T, 10, 2) positions (fontaine à t=0)
+    """
+    n = len(times)
+    tracks = np.zeros((n, 10, 2))
+
+    # Front de vague par lane, commun aux deux équipes (distance depuis la base bleue)
+    fronts = {}
+    for lane, path in LANE_PATHS.items():
+        length = lane_length(path)
+        walk = np.cumsum(rng.normal(0, 500, n))
+        fronts[lane] = np.clip(length / 2 + walk, 0.2 * length, 0.8 * length)
+
+    for pid in range(1, 11):
+        team, role = team_of(pid), role_of(pid)
+        if role == 'JUNGLE':
+            camps = BLUE_JUNGLE_CAMPS if team == 100 else mirror(BLUE_JUNGLE_CAMPS)
+            enemy_camps = mirror(camps)
+            own = rng.random(n) < 0.75
+            picks = rng.integers(0, len(camps), n)
+            points = np.where(own[:, None], camps[picks], enemy_camps[picks])
+        else:
+            lane = ROLE_LANES[role]
+            path = LANE_PATHS[lane]
+            offset = -LANE_OFFSET if team == 100 else LANE_OFFSET
+            points = lane_point(path, np.clip(fronts[lane] + offset, 0, lane_length(path)))
+        tracks[:, pid - 1] = points + rng.normal(0, POSITION_JITTER, (n, 2))
+
+    # Fin de partie: une équipe se regroupe parfois sur un objectif
+    for f in np.flatnonzero(times >= GROUP_AFTER_MS):
+        if rng.random() < GROUP_PROBABILITY:
+            team_idx = rng.integers(0, 2)
+            target = np.array([DRAGON_PIT, BARON_PIT, (7400, 7400)][rng.integers(0, 3)], dtype=np.float64)
+            members = slice(team_idx * 5, team_idx * 5 + 5)
+            tracks[f, members] = target + rng.normal(0, 600, (5, 2))
+
+    tracks[0, :5] = FOUNTAIN_POSITIONS[100]
+    tracks[0, 5:] = FOUNTAIN_POSITIONS[200]
+    return np.clip(tracks, 0, MAP_SIZE)
+
+
+def level_curve(rng: np.random.Generator, times: np.ndarray) -> np.ndarray:
+    """(T, 10) niveaux croissants (supports et junglers un peu plus lents)"""
+    rates = rng.uniform(0.9, 1.1, 10) * np.array([0.85 if role_of(p) in ('UTILITY', 'JUNGLE') else 1.0
+                                                  for p in range(1, 11)])
+    minutes = times[:, None] / 60000
+    return np.clip(1 + np.floor(18 * (minutes / 35) ** 0.6 * rates), 1, 18).astype(np.int64)
+
+
+def poisson_times(rng: np.random.Generator, rate_per_minute: float, start: int, end: int) -> np.ndarray:
+    """Instants (ms, triés) d'un processus de Poisson sur [start, end)"""
+    if end <= start:
+        return np.zeros(0, dtype=np.int64)
+    count = rng.poisson(rate_per_minute * (end - start) / 60000)
+    return np.sort(rng.integers(start, end, count))
+
+
+def generate_kills(rng, times, tracks, winner: int, duration: int) -> List[Dict]:
+    events = []
+    for t in poisson_times(rng, KILLS_PER_MINUTE, 90000, duration):
+        killer_team = winner if rng.random() < 0.55 else TEAMS[1 - TEAMS.index(winner)]
+        killer_base = 1 if killer_team == 100 else 6
+        victim_base = 6 if killer_team == 100 else 1
+        killer = killer_base + int(rng.integers(0, 5))
+        victim = victim_base + int(rng.integers(0, 5))
+        assists = sorted(set(int(a) for a in killer_base + rng.integers(0, 5, rng.integers(0, 4))) - {killer})
+        x, y = np.clip(interpolate_track(times, tracks[:, victim - 1], t) + rng.normal(0, 200, 2), 0, MAP_SIZE)
+        event = {
+            'bounty': 300, 'killStreakLength': 0, 'killerId': killer,
+            'position': {'x': int(x), 'y': int(y)}, 'shutdownBounty': 0,
+            'timestamp': int(t), 'type': 'CHAMPION_KILL', 'victimId': victim,
+        }
+        if assists:
+            event['assistingParticipantIds'] = assists
+        events.append(event)
+    return events
+
+
+def generate_buildings(rng, winner: int, duration: int) -> List[Dict]:
+    """Tourelles et inhibiteurs détruits, lane par lane, le perdant plus tôt"""
+    events = []
+    for owner in TEAMS:
+        pace = 0.85 if owner != winner else 1.4
+        attackers = range(6, 11) if owner == 100 else range(1, 6)
+        first_inhibitor = None
+        for lane, turret_ids in LANE_TURRETS.items():
+            t = rng.uniform(12, 22) * 60000 * pace
+            for turret_id, tower_type in zip(turret_ids, TOWER_TYPES):
+                if t >= duration:
+                    break
+                x, y = TURRET_POSITIONS[owner][turret_id]
+                events.append({
+                    'bounty': 0, 'buildingType': 'TOWER_BUILDING', 'killerId': int(rng.choice(attackers)),
+                    'laneType': lane, 'position': {'x': int(x), 'y': int(y)}, 'teamId': owner,
+                    'timestamp': int(t), 'towerType': tower_type, 'type': 'BUILDING_KILL',
+                })
+                t += rng.uniform(4, 9) * 60000 * pace
+            else:
+                t = events[-1]['timestamp'] + rng.uniform(0.5, 2) * 60000
+                if t < duration:
+                    x, y = INHIBITOR_POSITIONS[owner][lane]
+                    events.append({
+                        'bounty': 0, 'buildingType': 'INHIBITOR_BUILDING', 'killerId': int(rng.choice(attackers)),
+                        'laneType': lane, 'position': {'x': int(x), 'y': int(y)}, 'teamId': owner,
+                        'timestamp': int(t), 'type': 'BUILDING_KILL',
+                    })
+                    first_inhibitor = t if first_inhibitor is None else min(first_inhibitor, t)
+
+        if first_inhibitor is not None:
+            t = first_inhibitor + rng.uniform(2, 4) * 60000
+            if t < duration:
+                x, y = TURRET_POSITIONS[owner][NEXUS_TURRET]
+                events.append({
+                    'bounty': 0, 'buildingType': 'TOWER_BUILDING', 'killerId': int(rng.choice(attackers)),
+                    'laneType': 'MID_LANE', 'position': {'x': int(x), 'y': int(y)}, 'teamId': owner,
+                    'timestamp': int(t), 'towerType': 'NEXUS_TURRET', 'type': 'BUILDING_KILL',
+                })
+    return events
+
+
+def generate_monsters(rng, winner: int, duration: int) -> List[Dict]:
+    """Dragons (toutes les 5 min), larves (6 min), héraut (14 min), baron (20 min puis 6 min)"""
+    spawns = []
+    t = 5 * 60000
+    while t < duration:
+        t += rng.uniform(0, 2) * 60000
+        spawns.append((t, 'DRAGON', DRAGON_PIT))
+        t += 5 * 60000
+    spawns += [(6 * 60000 + i * 20000 + rng.uniform(0, 60000), 'HORDE', BARON_PIT) for i in range(3)]
+    spawns.append((14 * 60000 + rng.uniform(0, 3) * 60000, 'RIFTHERALD', BARON_PIT))
+    t = 20 * 60000
+    while t < duration:
+        t += rng.uniform(0, 4) * 60000
+        spawns.append((t, 'BARON_NASHOR', BARON_PIT))
+        t += 6 * 60000
+
+    events = []
+    for t, monster, (x, y) in spawns:
+        if t >= duration:
+            continue
+        team = winner if rng.random() < 0.6 else TEAMS[1 - TEAMS.index(winner)]
+        jungler = 2 if team == 100 else 7
+        event = {
+            'bounty': 0, 'killerId': jungler, 'killerTeamId': team, 'monsterType': monster,
+            'position': {'x': int(x), 'y': int(y)}, 'timestamp': int(t), 'type': 'ELITE_MONSTER_KILL',
+        }
+        if monster == 'DRAGON':
+            event['monsterSubType'] = str(rng.choice(DRAGON_TYPES))
+        events.append(event)
+    return events
+
+
+def generate_wards(rng, duration: int) -> List[Dict]:
+    """WARD_PLACED par joueur (supports plus souvent) et WARD_KILL d'une partie d'entre elles"""
+    events = []
+    for pid in range(1, 11):
+        role = role_of(pid)
+        rate = WARDS_PER_MINUTE.get(role, DEFAULT_WARDS_PER_MINUTE)
+        if role == 'UTILITY':
+            types, weights = ('SIGHT_WARD', 'CONTROL_WARD', 'YELLOW_TRINKET', 'UNDEFINED'), (0.4, 0.25, 0.3, 0.05)
+        else:
+            types, weights = ('YELLOW_TRINKET', 'CONTROL_WARD', 'UNDEFINED'), (0.75, 0.15, 0.1)
+        enemies = range(6, 11) if pid <= 5 else range(1, 6)
+
+        for t in poisson_times(rng, rate, 30000, duration):
+            ward_type = str(rng.choice(types, p=weights))
+            events.append({'creatorId': pid, 'timestamp': int(t), 'type': 'WARD_PLACED', 'wardType': ward_type})
+            if ward_type == 'UNDEFINED' or rng.random() >= WARD_KILL_PROBABILITY:
+                continue
+            lifetime = WARD_DURATIONS[ward_type] or CONTROL_WARD_LIFETIME_MS
+            killed_at = int(t + rng.uniform(5000, lifetime))
+            if killed_at < duration and killed_at < t + lifetime:
+                events.append({'killerId': int(rng.choice(enemies)), 'timestamp': killed_at,
+                               'type': 'WARD_KILL', 'wardType': ward_type})
+    return events
+
+
+def apply_deaths(times: np.ndarray, tracks: np.ndarray, levels: np.ndarray, kills: List[Dict]):
+    """Victimes en fontaine aux frames qui tombent pendant leur temps de mort (en place)"""
+    for kill in kills:
+        victim, t = kill['victimId'], kill['timestamp']
+        f = min(np.searchsorted(times, t), len(times) - 1)
+        death_timer = 6000 + 2500 * levels[f, victim - 1]
+        dead = (times >= t) & (times < t + death_timer)
+        tracks[dead, victim - 1] = FOUNTAIN_POSITIONS[team_of(victim)]
+
+
+def generate_match(match_index: int, duration_ms: int, seed: int = 0) -> Tuple[Dict, Dict]:
+    """
+    Générer un match et sa timeline
+
+    Args:
+        match_index: Index du match (détermine match_id et le tirage avec seed)
+        duration_ms: Durée du match
+        seed: Graine du corpus
+
+    Returns:
+        (match, timeline) au format match-v5
+    """
+    rng = np.random.default_rng([seed, match_index])
+    game_id = FIRST_GAME_ID + match_index
+    match_id = f'{PLATFORM}_{game_id}'
+    puuids = [f'synthetic-{game_id}-{pid}' for pid in range(1, 11)]
+    champions = [CHAMPIONS[i] for i in rng.choice(len(CHAMPIONS), 10, replace=False)]
+    winner = TEAMS[int(rng.integers(0, 2))]
+
+    times = np.r_[np.arange(0, duration_ms, FRAME_INTERVAL_MS), duration_ms].astype(np.int64)
+    tracks = generate_tracks(rng, times)
+    levels = level_curve(rng, times)
+    kills = generate_kills(rng, times, tracks, winner, duration_ms)
+    apply_deaths(times, tracks, levels, kills)
+    buildings = generate_buildings(rng, winner, duration_ms)
+    monsters = generate_monsters(rng, winner, duration_ms)
+    wards = generate_wards(rng, duration_ms)
+
+    # Or: revenu passif par rôle + primes des kills
+    gold_rates = np.array([220 if role_of(p) == 'UTILITY' else rng.uniform(330, 450) for p in range(1, 11)])
+    gold = 500 + np.outer(times / 60000, gold_rates)
+    kill_times = np.array([k['timestamp'] for k in kills], dtype=np.int64)
+    for pid in range(1, 11):
+        own = kill_times[[k['killerId'] == pid for k in kills]] if kills else kill_times
+        gold[:, pid - 1] += 300 * np.searchsorted(np.sort(own), times, side='right')
+    gold = gold.astype(np.int64)
+
+    # Events répartis dans les frames: frame k = events de ]times[k-1], times[k]]
+    events = sorted(kills + buildings + monsters + wards, key=lambda e: e['timestamp'])
+    events.append({'gameId': game_id, 'timestamp': int(duration_ms), 'type': 'GAME_END', 'winningTeam': winner})
+    frame_events: List[List[Dict]] = [[{'timestamp': 0, 'type': 'PAUSE_END'}]] + [[] for _ in times[1:]]
+    for event in events:
+        frame_events[max(1, int(np.searchsorted(times, event['timestamp'])))].append(event)
+
+    frames = []
+    for f, t in enumerate(times):
+        participant_frames = {}
+        for pid in range(1, 11):
+            x, y = tracks[f, pid - 1]
+            participant_frames[str(pid)] = {
+                'currentGold': int(gold[f, pid - 1] % 1500),
+                'goldPerSecond': 0,
+                'jungleMinionsKilled': int(t // 60000 * (4 if role_of(pid) == 'JUNGLE' else 0)),
+                'level': int(levels[f, pid - 1]),
+                'minionsKilled': int(t // 60000 * (0 if role_of(pid) in ('JUNGLE', 'UTILITY') else 7)),
+                'participantId': pid,
+                'position': {'x': int(x), 'y': int(y)},
+                'timeEnemySpentControlled': 0,
+                'totalGold': int(gold[f, pid - 1]),
+                'xp': int(280 * levels[f, pid - 1] ** 1.5),
+            }
+        frames.append({'events': frame_events[f], 'participantFrames': participant_frames, 'timestamp': int(t)})
+
+    timeline = {
+        'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': puuids},
+        'info': {
+            'endOfGameResult': 'GameComplete',
+            'frameInterval': FRAME_INTERVAL_MS,
+            'frames': frames,
+            'gameId': game_id,
+            'participants': [{'participantId': pid, 'puuid': puuids[pid - 1]} for pid in range(1, 11)],
+        },
+    }
+
+    # Statistiques de fin de partie (match-v5) dérivées des events
+    def count(event_type: str, key: str, pid: int) -> int:
+        return sum(1 for e in events if e['type'] == event_type and e.get(key) == pid)
+
+    participants = []
+    for pid in range(1, 11):
+        team, role = team_of(pid), role_of(pid)
+        name, champion_id = champions[pid - 1]
+        participants.append({
+            'assists': sum(1 for k in kills if pid in k.get('assistingParticipantIds', [])),
+            'champLevel': int(levels[-1, pid - 1]),
+            'championId': champion_id,
+            'championName': name,
+            'deaths': count('CHAMPION_KILL', 'victimId', pid),
+            'goldEarned': int(gold[-1, pid - 1]),
+            'individualPosition': role,
+            'kills': count('CHAMPION_KILL', 'killerId', pid),
+            'participantId': pid,
+            'puuid': puuids[pid - 1],
+            'riotIdGameName': f'Synthetic{pid}',
+            'teamId': team,
+            'teamPosition': role,
+            'wardsKilled': count('WARD_KILL', 'killerId', pid),
+            'wardsPlaced': count('WARD_PLACED', 'creatorId', pid),
+            'win': team == winner,
+        })
+
+    def objective(team: int, predicate) -> Dict:
+        matching = [e for e in events if predicate(e)]
+        first = min(matching, key=lambda e: e['timestamp']) if matching else None
+        return {'first': bool(first) and credited_team(first) == team,
+                'kills': sum(1 for e in matching if credited_team(e) == team)}
+
+    def credited_team(event: Dict) -> int:
+        if event['type'] == 'BUILDING_KILL':
+            return TEAMS[1 - TEAMS.index(event['teamId'])]
+        if event['type'] == 'ELITE_MONSTER_KILL':
+            return event['killerTeamId']
+        return team_of(event['killerId'])
+
+    def monster(kind: str):
+        return lambda e: e['type'] == 'ELITE_MONSTER_KILL' and e['monsterType'] == kind
+
+    teams = [{
+        'bans': [],
+        'objectives': {
+            'baron': objective(team, monster('BARON_NASHOR')),
+            'champion': objective(team, lambda e: e['type'] == 'CHAMPION_KILL'),
+            'dragon': objective(team, monster('DRAGON')),
+            'horde': objective(team, monster('HORDE')),
+            'inhibitor': objective(team, lambda e: e.get('buildingType') == 'INHIBITOR_BUILDING'),
+            'riftHerald': objective(team, monster('RIFTHERALD')),
+            'tower': objective(team, lambda e: e.get('buildingType') == 'TOWER_BUILDING'),
+        },
+        'teamId': team,
+        'win': team == winner,
+    } for team in TEAMS]
+
+    match = {
+        'metadata': {'dataVersion': '2', 'matchId': match_id, 'participants': puuids},
+        'info': {
+            'endOfGameResult': 'GameComplete',
+            'gameCreation': 1_700_000_000_000 + match_index * 3_600_000,
+            'gameDuration': int(duration_ms // 1000),
+            'gameId': game_id,
+            'gameMode': 'CLASSIC',
+            'gameType': 'MATCHED_GAME',
+            'gameVersion': GAME_VERSION,
+            'mapId': 11,
+            'participants': participants,
+            'platformId': PLATFORM,
+            'queueId': 420,
+            'teams': teams,
+        },
+    }
+    return match, timeline
+
+
+def write_match(output_dir: Path, match_index: int, duration_ms: int, seed: int = 0) -> Path:
+    """Écrire {match_id}.json et {match_id}_timeline.json, renvoie le chemin de la timeline"""
+    match, timeline = generate_match(match_index, duration_ms, seed)
+    match_id = match['metadata']['matchId']
+    with open(output_dir / f'{match_id}.json', 'w') as f:
+        json.dump(match, f, separators=(',', ':'))
+    timeline_path = output_dir / f'{match_id}_timeline.json'
+    with open(timeline_path, 'w') as f:
+        json.dump(timeline, f, separators=(',', ':'))
+    return timeline_path
+
+
+def _write_range(args: Tuple[Path, int, int, Tuple[int, int], int]) -> int:
+    """Worker: écrire les matchs [start, stop) (durées tirées par match)"""
+    output_dir, start, stop, (min_minutes, max_minutes), seed = args
+    for index in range(start, stop):
+        minutes = np.random.default_rng([seed, index, 1]).uniform(min_minutes, max_minutes)
+        write_match(output_dir, index, int(minutes * 60000), seed)
+    return stop - start
+
+
+def generate_corpus(
+    output_dir: Path = SYNTHETIC_DIR,
+    count: int = 100,
+    minutes: Tuple[int, int] = (20, 40),
+    seed: int = 0,
+    workers: int = 1,
+    start: int = 0,
+) -> int:
+    """
+    Générer `count` matchs (index start..start+count) dans output_dir
+
+    Args:
+        minutes: Durée (min, max) en minutes, tirée uniformément par match
+        workers: Nombre de processus
+
+    Returns:
+        Nombre de matchs écrits
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    batch = max(1, min(256, count // max(1, workers * 4)))
+    ranges = [(output_dir, i, min(i + batch, start + count), minutes, seed)
+              for i in range(start, start + count, batch)]
+
+    if workers <= 1:
+        return sum(_write_range(r) for r in ranges)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        return sum(pool.map(_write_range, ranges))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générer des matchs synthétiques (format API Riot)")
+    parser.add_argument('--output', type=Path, default=SYNTHETIC_DIR, help="Dossier de sortie")
+    parser.add_argument('--count', type=int, default=100, help="Nombre de matchs")
+    parser.add_argument('--min-minutes', type=float, default=20, help="Durée minimale d'un match")
+    parser.add_argument('--max-minutes', type=float, default=40, help="Durée maximale d'un match")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du corpus")
+    parser.add_argument('--start', type=int, default=0, help="Index du premier match (ajout à un corpus)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Nombre de processus")
+    args = parser.parse_args()
+
+    written = generate_corpus(args.output, args.count, (args.min_minutes, args.max_minutes),
+                              args.seed, args.workers, args.start)
+    print(f"✅ {written:,} matchs synthétiques dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
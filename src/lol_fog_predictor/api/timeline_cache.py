@@ -0,0 +1,251 @@
+"""
+Cache colonnaire compact des timelines API Riot
+
+Une timeline (~1.5-2 MB de JSON indenté) est convertie une seule fois en
+`{match_id}_timeline.npz` à côté du JSON:
+    - timestamps (F,), positions (F, P, 2), levels (F, P), gold (F, P)
+    - table d'events typée (une colonne par champ, codes vers `vocab`),
+      regroupée par type en une passe: chaque type (WARD_PLACED, WARD_KILL,
+      CHAMPION_KILL, BUILDING_KILL, ELITE_MONSTER_KILL, ...) est une tranche
+      contiguë [event_offsets[code], event_offsets[code + 1])
+
+Le .npz est écrit sans compression: chaque tableau est lu directement par
+memory map (np.memmap à l'offset du membre dans le zip), sans json.load.
+"""
+
+import json
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# ⚠️ Incrémenter à chaque changement du format pour invalider les caches
+CACHE_VERSION = 2
+
+# Colonnes de la table d'events
+EVENT_COLUMNS = {
+    'type': np.int16,            # Code dans vocab (WARD_PLACED, BUILDING_KILL, ...)
+    'timestamp': np.int32,       # ms
+    'frame': np.int16,           # Index de la frame contenant l'event
+    'participant_id': np.int8,   # participantId ou creatorId (0 si absent)
+    'killer_id': np.int8,
+    'victim_id': np.int8,
+    'team_id': np.int16,         # teamId ou killerTeamId (0 si absent)
+    'x': np.float32,             # NaN si l'event n'a pas de position
+    'y': np.float32,
+    'subtype': np.int16,         # wardType / towerType / buildingType / monsterType
+    'lane': np.int16,            # laneType
+}
+
+
+@dataclass
+class TimelineCache:
+    """Timeline d'un match sous forme de tableaux (memory-mapped)"""
+    version: int
+    frame_interval: int
+    timestamps: np.ndarray  # (F,) int32
+    positions: np.ndarray   # (F, P, 2) float32, NaN si absente
+    levels: np.ndarray      # (F, P) int8
+    gold: np.ndarray        # (F, P) int32
+    events: Dict[str, np.ndarray]  # Colonnes EVENT_COLUMNS, longueur E, triées par type
+    vocab: np.ndarray       # Chaînes des colonnes codées (index 0 = '')
+    event_offsets: np.ndarray  # (len(vocab) + 1,) début des events de chaque code de type
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def n_participants(self) -> int:
+        return self.positions.shape[1]
+
+    def code(self, name: str) -> int:
+        """Code d'une chaîne du vocabulaire (-1 si absente)"""
+        matches = np.flatnonzero(self.vocab == name)
+        return int(matches[0]) if len(matches) else -1
+
+    def events_of_type(self, event_type: str) -> Dict[str, np.ndarray]:
+        """
+        Table colonnaire des events d'un type, dans l'ordre de la timeline
+
+        Tranche (vue memory-mapped) de la table regroupée par type: ni
+        parcours ni masque sur l'ensemble des events.
+        """
+        code = self.code(event_type)
+        start, end = (self.event_offsets[code], self.event_offsets[code + 1]) if code >= 0 else (0, 0)
+        return {name: column[start:end] for name, column in self.events.items()}
+
+    def event_tables(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Toutes les tables par type présent: {type: colonnes}"""
+        counts = np.diff(self.event_offsets)
+        return {str(self.vocab[code]): self.events_of_type(str(self.vocab[code])) for code in np.flatnonzero(counts)}
+
+
+def cache_path_for(timeline_path: Path) -> Path:
+    """{match_id}_timeline.json → {match_id}_timeline.npz"""
+    return timeline_path.with_suffix('.npz')
+
+
+def build_timeline_cache(timeline_path: Path) -> Path:
+    """
+    Convertir une timeline JSON en cache .npz
+
+    Seul endroit où le JSON de la timeline est décodé.
+
+    Returns:
+        Chemin du .npz écrit
+    """
+    with open(timeline_path) as f:
+        timeline_data = json.load(f)
+
+    info = timeline_data['info']
+    frames = info['frames']
+    n_frames = len(frames)
+    n_participants = max(
+        (int(pid) for frame in frames for pid in frame['participantFrames']),
+        default=0,
+    )
+
+    timestamps = np.empty(n_frames, dtype=np.int32)
+    positions = np.full((n_frames, n_participants, 2), np.nan, dtype=np.float32)
+    levels = np.zeros((n_frames, n_participants), dtype=np.int8)
+    gold = np.zeros((n_frames, n_participants), dtype=np.int32)
+
+    vocab: Dict[str, int] = {'': 0}
+    events: Dict[str, List] = {name: [] for name in EVENT_COLUMNS}
+
+    def code(value) -> int:
+        return vocab.setdefault(value or '', len(vocab))
+
+    for f, frame in enumerate(frames):
+        timestamps[f] = frame['timestamp']
+
+        for participant_id_str, pf in frame['participantFrames'].items():
+            p = int(participant_id_str) - 1
+            if 'position' in pf:
+                positions[f, p] = (pf['position']['x'], pf['position']['y'])
+            levels[f, p] = pf.get('level', 0)
+            gold[f, p] = pf.get('totalGold', 0)
+
+        for event in frame.get('events', []):
+            position = event.get('position', {})
+            events['type'].append(code(event.get('type')))
+            events['timestamp'].append(event.get('timestamp', 0))
+            events['frame'].append(f)
+            events['participant_id'].append(event.get('participantId', event.get('creatorId', 0)) or 0)
+            events['killer_id'].append(event.get('killerId', 0) or 0)
+            events['victim_id'].append(event.get('victimId', 0) or 0)
+            events['team_id'].append(event.get('teamId', event.get('killerTeamId', 0)) or 0)
+            events['x'].append(position.get('x', np.nan))
+            events['y'].append(position.get('y', np.nan))
+            events['subtype'].append(code(
+                event.get('wardType') or event.get('towerType')
+                or event.get('buildingType') or event.get('monsterType')
+            ))
+            events['lane'].append(code(event.get('laneType')))
+
+    arrays = {
+        'meta': np.array([CACHE_VERSION, info.get('frameInterval', 60000)], dtype=np.int64),
+        'timestamps': timestamps,
+        'positions': positions,
+        'levels': levels,
+        'gold': gold,
+        'vocab': np.array(list(vocab), dtype=str),
+    }
+    # Regroupement par type (tri stable: ordre de la timeline conservé dans
+    # chaque type), puis offsets de chaque code: une table par type
+    types = np.array(events['type'], dtype=EVENT_COLUMNS['type'])
+    order = np.argsort(types, kind='stable')
+    for name, dtype in EVENT_COLUMNS.items():
+        arrays[f'event_{name}'] = np.array(events[name], dtype=dtype)[order]
+    arrays['event_offsets'] = np.searchsorted(types[order], np.arange(len(vocab) + 1)).astype(np.int64)
+
+    # Écriture atomique (fichier temporaire propre au processus: le webapp,
+    # le processeur et les benchmarks peuvent construire le même cache),
+    # sans compression (ZIP_STORED) pour le memory map
+    cache_path = cache_path_for(timeline_path)
+    tmp_path = cache_path.with_name(f'{cache_path.stem}.{os.getpid()}.tmp.npz')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, cache_path)
+
+    return cache_path
+
+
+def _mmap_npz(path: Path) -> Dict[str, np.ndarray]:
+    """Ouvrir chaque tableau d'un .npz non compressé par memory map"""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as raw:
+        for member in zf.infolist():
+            if member.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: membre compressé {member.filename}")
+
+            # Local file header: 30 octets + nom + extra, puis le .npy brut
+            raw.seek(member.header_offset)
+            header = raw.read(30)
+            name_len, extra_len = struct.unpack('<HH', header[26:30])
+            npy_offset = member.header_offset + 30 + name_len + extra_len
+
+            raw.seek(npy_offset)
+            major, _ = np.lib.format.read_magic(raw)
+            if major == 1:
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(raw)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(raw)
+
+            name = member.filename[:-len('.npy')]
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode='r', offset=raw.tell(),
+                    shape=shape, order='F' if fortran else 'C',
+                )
+    return arrays
+
+
+def load_timeline_cache(cache_path: Path) -> TimelineCache:
+    """Charger un cache .npz (memory-mapped)"""
+    arrays = _mmap_npz(cache_path)
+    return TimelineCache(
+        version=int(arrays['meta'][0]),
+        frame_interval=int(arrays['meta'][1]),
+        timestamps=arrays['timestamps'],
+        positions=arrays['positions'],
+        levels=arrays['levels'],
+        gold=arrays['gold'],
+        events={name: arrays[f'event_{name}'] for name in EVENT_COLUMNS},
+        vocab=np.asarray(arrays['vocab']),
+        event_offsets=np.asarray(arrays['event_offsets']),
+    )
+
+
+def get_timeline_cache(timeline_path: Path) -> TimelineCache:
+    """
+    Point d'entrée des consommateurs: cache à jour, construit si besoin
+
+    Le cache est reconstruit s'il est absent, plus ancien que le JSON ou
+    d'une autre CACHE_VERSION.
+
+    Args:
+        timeline_path: Chemin vers {match_id}_timeline.json
+
+    Returns:
+        TimelineCache memory-mapped
+    """
+    cache_path = cache_path_for(timeline_path)
+
+    if cache_path.exists() and cache_path.stat().st_mtime_ns >= timeline_path.stat().st_mtime_ns:
+        try:
+            cache = load_timeline_cache(cache_path)
+            if cache.version == CACHE_VERSION:
+                return cache
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            pass  # Cache corrompu: reconstruire
+
+    build_timeline_cache(timeline_path)
+    return load_timeline_cache(cache_path)
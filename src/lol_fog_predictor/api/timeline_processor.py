@@ -3,63 +3,56 @@ Processeur de timelines API Riot pour créer dataset ML fog of war
 Extrait positions + calcule visibilité pour entraînement
 """
 
+import argparse
 import json
-import math
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 import polars as pl
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from lol_fog_predictor.api.dataset import DATASET_DIR, last_seen_columns, scan_dataset, write_partition
+from lol_fog_predictor.api.interpolation import frame_index_at, interpolate_positions
+from lol_fog_predictor.api.manifest import DatasetManifest
+from lol_fog_predictor.api.timeline_cache import CACHE_VERSION, get_timeline_cache
+from lol_fog_predictor.api.timing import (
+    Span,
+    StageTimer,
+    print_timing_report,
+    timed,
+    timing_report,
+    write_chrome_trace,
+    write_timing_report,
+)
+from lol_fog_predictor.fog.engine import (
+    CHAMPION_VISION_RADIUS,
+    MINION_VISION_RADIUS,
+    TEAMS,
+    WARD_VISION_RADIUS,
+    compute_visible_to_enemy,
+)
+from lol_fog_predictor.fog.brushes import get_brush_index
+from lol_fog_predictor.fog.line_of_sight import LOS_VERSION, get_line_of_sight
+from lol_fog_predictor.fog.minions import minion_sources
+from lol_fog_predictor.fog.raster import COVERAGE_REGIONS, RASTER_CELL_SIZE, RASTER_VERSION, VisionMasks, rasterize_vision
+from lol_fog_predictor.fog.structures import STRUCTURES_VERSION, get_turret_timeline
+from lol_fog_predictor.fog.wards import WardIndex, build_wards
 
-@dataclass
-class Position:
-    """Position sur la carte"""
-    x: float
-    y: float
-    
-    def distance_to(self, other: 'Position') -> float:
-        """Calculer distance euclidienne"""
-        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
-
-
-# Constantes de vision League of Legends (correctes)
-CHAMPION_VISION_RADIUS = 1350  # Champions, pets, super minions, tourelles
-WARD_VISION_RADIUS = 900  # Totem/Stealth/Control/Zombie Wards, Effigies
-MAP_SIZE = 14820  # Taille de la map (0-14820 sur x et y)
-
-# Positions fixes des tourelles (Blue team) - DEPUIS API RIOT
-BLUE_TURRET_POSITIONS = [
-    # Top lane
-    Position(981, 10441),   # Top Outer
-    Position(1512, 6699),   # Top Inner
-    Position(1169, 4287),   # Top Inhibitor
-    # Mid lane
-    Position(5846, 6396),   # Mid Outer
-    Position(5048, 4812),   # Mid Inner
-    Position(3651, 3696),   # Mid Inhibitor
-    Position(1748, 2270),   # Mid Nexus
-    # Bot lane
-    Position(10504, 1029),  # Bot Outer
-    Position(6919, 1483),   # Bot Inner
-    Position(4281, 1253),   # Bot Inhibitor
-]
-
-# Positions fixes des tourelles (Red team) - DEPUIS API RIOT
-RED_TURRET_POSITIONS = [
-    # Top lane
-    Position(4318, 13875),  # Top Outer
-    Position(7943, 13411),  # Top Inner
-    Position(10481, 13650), # Top Inhibitor
-    # Mid lane
-    Position(8955, 8510),   # Mid Outer
-    Position(9767, 10113),  # Mid Inner
-    Position(11134, 11207), # Mid Inhibitor
-    Position(12611, 13084), # Mid Nexus
-    # Bot lane
-    Position(13866, 4505),  # Bot Outer
-    Position(13327, 8226),  # Bot Inner
-    Position(13624, 10572), # Bot Inhibitor
-]
+
+# Version du traitement, enregistrée dans le manifest des partitions.
+# ⚠️ Incrémenter à chaque changement de la sortie pour forcer le rebuild.
+PROCESSOR_VERSION = 10
+MANIFEST_NAME = '_manifest.json'
+TIMINGS_NAME = '_timings.json'  # Rapport des temps par étape du dernier run
+
+# Constantes de vision: voir lol_fog_predictor.fog.engine
+# Tourelles (positions fixes et encore debout): voir lol_fog_predictor.fog.structures
 
 
 def load_timeline(timeline_path: Path) -> Dict:
@@ -85,92 +78,169 @@ def get_team_mapping(match_data: Dict) -> Dict[int, int]:
     return {i+1: p['teamId'] for i, p in enumerate(participants)}
 
 
-def extract_ward_positions(frame: Dict, team_id: int) -> List[Position]:
+@dataclass
+class MatchArrays:
+    """Tableaux d'un match (index joueur 0 = participant 1), partagés par le dataset et les masques"""
+    timestamps: np.ndarray       # (T,) ms
+    positions: np.ndarray        # (T, P, 2) NaN si absente
+    participant_ids: np.ndarray  # (P,)
+    teams: np.ndarray            # (P,)
+    champions: np.ndarray        # (P,)
+    levels: np.ndarray           # (T, P)
+    gold: np.ndarray             # (T, P)
+    ward_positions: Dict[int, np.ndarray]  # team → (T, K, 2)
+    ward_ids: Dict[int, np.ndarray]  # team → (T, K) index dans build_wards(), -1 si slot vide
+    turret_positions: Dict[int, np.ndarray]  # team → (T, n, 2), NaN si détruite
+
+
+def load_match_arrays(
+    timeline_path: Path,
+    match_path: Path,
+    step_ms: Optional[int] = None,
+    timer: Optional[StageTimer] = None,
+) -> MatchArrays:
     """
-    Extraire positions des wards placées par une équipe
-    
-    Les events WARD_PLACED donnent la position des wards actives
-    
+    Charger positions, équipes, wards actives et tourelles debout d'un match
+
     Args:
-        frame: Frame de timeline
-        team_id: 100 (blue) ou 200 (red)
-    
-    Returns:
-        Liste des positions de wards actives
+        timeline_path: Chemin vers match_timeline.json
+        match_path: Chemin vers match.json
+        step_ms: Si donné, positions densifiées sur une grille de step_ms
+        timer: Si donné, chronomètre les étapes (voir api/timing.py)
     """
-    ward_positions = []
-    
-    events = frame.get('events', [])
-    
-    for event in events:
-        # Types de wards qui donnent de la vision
-        if event.get('type') == 'WARD_PLACED':
-            # Vérifier que c'est une ward de l'équipe
-            creator_id = event.get('creatorId')
-            if creator_id:
-                # Les IDs 1-5 = blue (100), 6-10 = red (200)
-                event_team = 100 if creator_id <= 5 else 200
-                
-                if event_team == team_id:
-                    pos = event.get('position', {})
-                    if 'x' in pos and 'y' in pos:
-                        ward_positions.append(Position(x=pos['x'], y=pos['y']))
+    # Charger données (timeline via le cache colonnaire, sans json.load)
+    with timed(timer, 'json_load'):
+        cache = get_timeline_cache(timeline_path)
+        match_data = load_match(match_path)
+    
+    # Mapping participant → team / champion (index 0 = participant 1)
+    with timed(timer, 'mapping'):
+        team_mapping = get_team_mapping(match_data)
+        participants = match_data['info']['participants']
+        participant_ids = np.arange(1, len(participants) + 1)
+        teams = np.array([team_mapping[pid] for pid in participant_ids])
+        champions = np.array([p['championName'] for p in participants])
+    
+    with timed(timer, 'positions'):
+        if step_ms:
+            # Grille dense: level/gold de la dernière frame ≤ t
+            timestamps, positions = interpolate_positions(cache, step_ms)
+            frame_of_sample = frame_index_at(np.asarray(cache.timestamps), timestamps)
+            levels = cache.levels[frame_of_sample]
+            gold = cache.gold[frame_of_sample]
+        else:
+            timestamps = cache.timestamps
+            positions = np.asarray(cache.positions, dtype=np.float64)
+            levels = cache.levels
+            gold = cache.gold
+    
+    with timed(timer, 'wards'):
+        # Wards actives à chaque instant (expiration + WARD_KILL), par équipe
+        ward_index = WardIndex(build_wards(cache))
+        ward_ids = {team_id: ward_index.active_slots(team_id, timestamps) for team_id in (100, 200)}
+        ward_positions = {team_id: ward_index.slot_positions(ids) for team_id, ids in ward_ids.items()}
         
-        # Les wards peuvent être détruites
-        elif event.get('type') == 'WARD_KILL':
-            # TODO: tracker destruction de wards pour précision
-            # Pour l'instant on utilise snapshot par frame
-            pass
-    
-    return ward_positions
+        # Tourelles encore debout (BUILDING_KILL), timeline en cache par match
+        turret_timeline = get_turret_timeline(timeline_path)
+        turret_positions = {team_id: turret_timeline.positions_at(team_id, timestamps) for team_id in (100, 200)}
+
+    return MatchArrays(
+        timestamps, positions, participant_ids, teams, champions, levels, gold,
+        ward_positions, ward_ids, turret_positions,
+    )
 
 
-def is_enemy_visible(
-    enemy_pos: Position,
-    ally_positions: List[Position],
-    ally_turrets: List[Position],
-    ward_positions: List[Position] = None,
-) -> bool:
+def vision_masks_path(
+    timeline_path: Path,
+    cell_size: int,
+    step_ms: Optional[int] = None,
+    line_of_sight: bool = False,
+    brushes: bool = False,
+    minions: bool = False,
+) -> Path:
     """
-    Vérifier si un ennemi est visible par l'équipe alliée
-    
-    Prend en compte:
-    - Vision des champions alliés (1350 unités)
-    - Vision des tourelles alliées (1350 unités)
-    - Vision des wards alliées (900 unités)
-    
-    Args:
-        enemy_pos: Position de l'ennemi
-        ally_positions: Positions de tous les champions alliés
-        ally_turrets: Positions des tourelles alliées (fixes)
-        ward_positions: Positions des wards alliées
-    
-    Returns:
-        True si l'ennemi est visible, False si dans fog
+    Masques de vision à côté de la timeline:
+    <match_id>_vision_c<cell>[_s<step>][_los<version>][_brushes][_minions].npz
     """
-    # Vision des champions (1350 unités)
-    for ally_pos in ally_positions:
-        if enemy_pos.distance_to(ally_pos) <= CHAMPION_VISION_RADIUS:
-            return True
-    
-    # Vision des tourelles (1350 unités)
-    for turret_pos in ally_turrets:
-        if enemy_pos.distance_to(turret_pos) <= CHAMPION_VISION_RADIUS:
-            return True
-    
-    # Vision des wards (900 unités)
-    if ward_positions:
-        for ward_pos in ward_positions:
-            if enemy_pos.distance_to(ward_pos) <= WARD_VISION_RADIUS:
-                return True
+    match_id = timeline_path.stem.replace('_timeline', '')
+    suffix = f'_c{cell_size}' + (f'_s{step_ms}' if step_ms else '')
+    if line_of_sight:
+        suffix += f'_los{LOS_VERSION}'
+    if brushes:
+        suffix += '_brushes'
+    if minions:
+        suffix += '_minions'
+    return timeline_path.with_name(f'{match_id}_vision{suffix}.npz')
+
+
+def get_vision_masks(
+    timeline_path: Path,
+    match_path: Optional[Path] = None,
+    step_ms: Optional[int] = None,
+    cell_size: int = RASTER_CELL_SIZE,
+    arrays: Optional[MatchArrays] = None,
+    line_of_sight: bool = False,
+    brushes: bool = False,
+    minions: bool = False,
+) -> VisionMasks:
+    """
+    Masques de vision rasterisés d'un match (voir fog/raster.py)
+
+    Calculés une fois avec les mêmes sources et filtres que
+    visible_to_enemy (champions, tourelles, wards, sbires si `minions`;
+    murs et buissons si `line_of_sight` / `brushes`) puis mis en cache
+    bit-packés et compressés à côté de la timeline, un fichier par jeu
+    d'options. Reconstruits si la timeline est plus récente ou si
+    RASTER_VERSION a changé. `arrays` (déjà chargés avec le même step_ms)
+    évite de relire le match.
+    """
+    timeline_path = Path(timeline_path)
+    if match_path is None:
+        match_path = timeline_path.with_name(timeline_path.name.replace('_timeline', ''))
+    path = vision_masks_path(timeline_path, cell_size, step_ms, line_of_sight, brushes, minions)
     
-    return False
+    if path.exists() and path.stat().st_mtime_ns >= timeline_path.stat().st_mtime_ns:
+        try:
+            return VisionMasks.load(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            pass  # Cache ancien ou corrompu (écriture interrompue): reconstruire
+    
+    if arrays is None:
+        arrays = load_match_arrays(timeline_path, match_path, step_ms)
+    sources = {
+        team_id: [
+            (arrays.positions[:, arrays.teams == team_id], CHAMPION_VISION_RADIUS),
+            (arrays.turret_positions[team_id], CHAMPION_VISION_RADIUS),
+            (arrays.ward_positions[team_id], WARD_VISION_RADIUS),
+        ]
+        for team_id in (100, 200)
+    }
+    if minions:
+        for team_id, positions in minion_sources(arrays.timestamps).items():
+            sources[team_id].append((positions, MINION_VISION_RADIUS))
+    masks = rasterize_vision(
+        arrays.timestamps, sources, cell_size,
+        line_of_sight=get_line_of_sight() if line_of_sight else None,
+        brushes=get_brush_index() if brushes else None,
+    )
+    
+    # Écriture atomique: un worker tué ne laisse pas de .npz tronqué
+    tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp.npz')
+    masks.save(tmp_path)
+    os.replace(tmp_path, path)
+    return masks
 
 
 def process_timeline_to_dataset(
     timeline_path: Path,
     match_path: Path,
-    blue_team_perspective: bool = True
+    blue_team_perspective: bool = True,
+    step_ms: Optional[int] = None,
+    line_of_sight: bool = False,
+    brushes: bool = False,
+    minions: bool = False,
+    coverage: bool = False,
+    timer: Optional[StageTimer] = None,
 ) -> pl.DataFrame:
     """
     Convertir timeline en dataset ML
@@ -183,10 +253,25 @@ def process_timeline_to_dataset(
             - Est-il visible par l'équipe BLEUE ? (fog of war)
             - Champion, timestamp, etc.
     
+    Les frames sont lues depuis le cache colonnaire de la timeline
+    (tableaux frames × joueurs × 2, voir api/timeline_cache.py) et la
+    visibilité de tout le match est calculée par le moteur vectorisé.
+    
     Args:
         timeline_path: Chemin vers match_timeline.json
         match_path: Chemin vers match.json
         blue_team_perspective: Si True, calcule fog depuis perspective bleue
+        step_ms: Si donné, positions densifiées sur une grille de step_ms
+            (voir api/interpolation.py) au lieu des frames de 60s
+        line_of_sight: Si True, les murs bloquent la vision
+            (table précalculée, voir fog/line_of_sight.py)
+        brushes: Si True, un joueur dans un buisson n'est vu que depuis
+            ce buisson (voir fog/brushes.py)
+        minions: Si True, les vagues de sbires synthétiques donnent de la
+            vision (voir fog/minions.py)
+        coverage: Si True, part de chaque région en vision (masques
+            rasterisés, voir fog/raster.py); sinon colonnes coverage_* nulles
+        timer: Si donné, chronomètre les étapes (voir api/timing.py)
     
     Returns:
         DataFrame avec colonnes:
@@ -199,224 +284,422 @@ def process_timeline_to_dataset(
         - visible_to_enemy: True si visible par l'équipe adverse
         - level: Niveau du champion
         - gold: Or total
+        - vision_sources: Bitset uint64 des sources qui le voient
+          (voir fog/engine.py, api/dataset.vision_source_columns)
+        - spotter_ward: Index (build_wards / WardTracker.wards) de la ward
+          adverse la plus proche qui le voit, null si aucune
+        - coverage_<région>: Part de la région en vision de l'équipe du
+          joueur (voir fog/raster.py, COVERAGE_REGIONS), null sans coverage
     """
     
-    # Charger données
-    timeline_data = load_timeline(timeline_path)
-    match_data = load_match(match_path)
-    
-    # Mapping participant → team
-    team_mapping = get_team_mapping(match_data)
-    
-    # Mapping participant → champion
-    participants = match_data['info']['participants']
-    champion_mapping = {i+1: p['championName'] for i, p in enumerate(participants)}
-    
-    # Liste pour stocker toutes les lignes
-    rows = []
-    
-    # Parcourir chaque frame (toutes les 60s)
-    frames = timeline_data['info']['frames']
-    
-    for frame in frames:
-        timestamp = frame['timestamp']
-        participant_frames = frame['participantFrames']
-        
-        # Extraire positions de tous les joueurs
-        all_positions = {}
-        
-        for participant_id_str, pf in participant_frames.items():
-            participant_id = int(participant_id_str)
-            
-            # Certaines frames n'ont pas de position (joueur mort, etc.)
-            if 'position' not in pf:
-                continue
-            
-            pos = Position(
-                x=pf['position']['x'],
-                y=pf['position']['y']
+    arrays = load_match_arrays(timeline_path, match_path, step_ms, timer)
+    timestamps, positions = arrays.timestamps, arrays.positions
+    participant_ids, teams = arrays.participant_ids, arrays.teams
+    champions, levels, gold = arrays.champions, arrays.levels, arrays.gold
+    ward_positions, turret_positions = arrays.ward_positions, arrays.turret_positions
+    
+    # Visibilité de tout le match en une passe: (frames × joueurs)
+    # + bitset des sources qui voient chaque joueur, dans la même passe
+    with timed(timer, 'visibility'):
+        visible, sources, spotter_ward = compute_visible_to_enemy(
+            positions, teams, turret_positions, ward_positions,
+            minion_positions=minion_sources(timestamps) if minions else None,
+            line_of_sight=get_line_of_sight() if line_of_sight else None,
+            brushes=get_brush_index() if brushes else None,
+            return_sources=True,
+            ward_ids=arrays.ward_ids,
+        )
+    
+    # Part de la map / des régions en vision de chaque équipe (masques
+    # rasterisés en cache + tables de sommes cumulées): (équipes, T, régions).
+    # Optionnel: la rasterisation coûte plus que tout le reste du match.
+    regions = list(COVERAGE_REGIONS)
+    shares = None
+    if coverage:
+        with timed(timer, 'coverage'):
+            masks = get_vision_masks(
+                timeline_path, match_path, step_ms, arrays=arrays,
+                line_of_sight=line_of_sight, brushes=brushes, minions=minions,
             )
-            
-            all_positions[participant_id] = {
-                'position': pos,
-                'team': team_mapping[participant_id],
-                'champion': champion_mapping[participant_id],
-                'level': pf.get('level', 0),
-                'totalGold': pf.get('totalGold', 0),
+            per_team = {team: masks.coverage(team) for team in TEAMS}
+            shares = np.stack([np.stack([per_team[team][r] for r in regions], axis=1) for team in TEAMS])
+    
+    with timed(timer, 'dataframe'):
+        # Une ligne par (frame, joueur) ayant une position, ordre frame puis joueur
+        frame_idx, player_idx = np.nonzero(~np.isnan(positions[..., 0]))
+        if shares is not None:
+            row_shares = shares[(teams[player_idx] == TEAMS[1]).astype(np.int64), frame_idx]
+            coverage_columns = {f'coverage_{region}': row_shares[:, i] for i, region in enumerate(regions)}
+        else:
+            coverage_columns = {
+                f'coverage_{region}': pl.repeat(None, len(frame_idx), dtype=pl.Float32, eager=True)
+                for region in regions
             }
         
-        # Séparer équipes
-        blue_positions = []
-        red_positions = []
-        
-        for pid, data in all_positions.items():
-            if data['team'] == 100:
-                blue_positions.append(data['position'])
-            else:
-                red_positions.append(data['position'])
+        # Colonnes directement aux types de DATASET_SCHEMA (pas d'int64 intermédiaire)
+        return pl.DataFrame({
+            'timestamp': timestamps[frame_idx].astype(np.int32),
+            'participant_id': participant_ids[player_idx].astype(np.int8),
+            'champion': champions[player_idx],
+            'team': teams[player_idx].astype(np.int16),
+            'position_x': np.rint(positions[frame_idx, player_idx, 0]).astype(np.int16),
+            'position_y': np.rint(positions[frame_idx, player_idx, 1]).astype(np.int16),
+            'visible_to_enemy': visible[frame_idx, player_idx],
+            'level': levels[frame_idx, player_idx].astype(np.int8),
+            'total_gold': gold[frame_idx, player_idx].astype(np.int32),
+            'vision_sources': sources[frame_idx, player_idx],
+            'spotter_ward': pl.Series(spotter_ward[frame_idx, player_idx].astype(np.int16)).replace(-1, None),
+            **coverage_columns,
+        })
+
+
+@dataclass
+class MatchResult:
+    """Résultat du traitement d'un match (renvoyé par les workers)"""
+    match_id: str
+    df: Optional[pl.DataFrame] = None
+    error: Optional[str] = None
+    enemy_positions: int = 0
+    visible_enemies: int = 0
+    spans: List[Span] = field(default_factory=list)  # Étapes chronométrées (api/timing.py)
+
+
+def process_match(
+    timeline_path: Path,
+    step_ms: Optional[int] = None,
+    line_of_sight: bool = False,
+    brushes: bool = False,
+    minions: bool = False,
+    coverage: bool = False,
+) -> MatchResult:
+    """
+    Traiter un match à partir de son fichier timeline
+    
+    Ne lève jamais d'exception: une erreur est enregistrée dans
+    MatchResult.error pour que le pool de workers continue.
+    
+    Args:
+        timeline_path: Chemin vers {match_id}_timeline.json
+        step_ms: Pas de la grille densifiée (None = frames de 60s)
+        line_of_sight: Murs pris en compte dans la visibilité
+        brushes: Règle des buissons prise en compte dans la visibilité
+        minions: Vision des sbires synthétiques prise en compte
+        coverage: Colonnes de couverture de vision calculées
+    
+    Returns:
+        MatchResult avec le DataFrame (colonne match_id incluse) ou l'erreur,
+        et les étapes chronométrées
+    """
+    # Déduire le chemin du match correspondant
+    match_id = timeline_path.stem.replace('_timeline', '')
+    match_path = timeline_path.parent / f"{match_id}.json"
+    
+    if not match_path.exists():
+        return MatchResult(match_id, error='Match file manquant')
+    
+    timer = StageTimer()
+    try:
+        df = process_timeline_to_dataset(
+            timeline_path, match_path, step_ms=step_ms,
+            line_of_sight=line_of_sight, brushes=brushes, minions=minions,
+            coverage=coverage, timer=timer,
+        )
         
-        # Extraire positions des wards
-        blue_wards = extract_ward_positions(frame, team_id=100)
-        red_wards = extract_ward_positions(frame, team_id=200)
+        # Ajouter colonne match_id pour tracking, puis "dernière fois vu"
+        with timer.stage('dataframe'):
+            df = df.with_columns(pl.lit(match_id).alias('match_id')).with_columns(last_seen_columns())
         
-        # Pour chaque joueur, calculer visibilité
-        for participant_id, data in all_positions.items():
-            team = data['team']
-            pos = data['position']
-            
-            # Calculer si visible par l'équipe adverse
-            # visible_to_enemy = True si l'ennemi peut voir ce joueur
-            if team == 100:  # Joueur Blue
-                # Blue est-il visible par Red ?
-                visible = is_enemy_visible(pos, red_positions, RED_TURRET_POSITIONS, red_wards)
-            else:  # Joueur Red (team == 200)
-                # Red est-il visible par Blue ?
-                visible = is_enemy_visible(pos, blue_positions, BLUE_TURRET_POSITIONS, blue_wards)
-            
-            # Ajouter ligne au dataset
-            rows.append({
-                'timestamp': timestamp,
-                'participant_id': participant_id,
-                'champion': data['champion'],
-                'team': team,
-                'position_x': pos.x,
-                'position_y': pos.y,
-                'visible_to_enemy': visible,
-                'level': data['level'],
-                'total_gold': data['totalGold'],
-            })
-    
-    # Créer DataFrame Polars
-    df = pl.DataFrame(rows)
-    
-    return df
+        # Stats en une seule passe
+        enemies = pl.col('team') == 200
+        enemy_positions, visible_enemies = df.select(
+            enemies.sum().alias('enemies'),
+            (enemies & pl.col('visible_to_enemy')).sum().alias('visible'),
+        ).row(0)
+    except Exception as e:
+        return MatchResult(match_id, error=f"{type(e).__name__}: {e}", spans=timer.spans)
+    
+    return MatchResult(match_id, df, None, enemy_positions, visible_enemies, timer.spans)
+
+
+def process_matches(
+    timeline_files: List[Path],
+    workers: int = 1,
+    step_ms: Optional[int] = None,
+    line_of_sight: bool = False,
+    brushes: bool = False,
+    minions: bool = False,
+    coverage: bool = False,
+) -> List[MatchResult]:
+    """
+    Traiter une liste de timelines, en parallèle si workers > 1
+    
+    Chaque worker parse et calcule un match entier. Les résultats sont
+    renvoyés dans l'ordre de timeline_files, quel que soit l'ordre de fin.
+    
+    Args:
+        timeline_files: Fichiers *_timeline.json à traiter
+        workers: Nombre de processus (1 = séquentiel, sans pool)
+        step_ms: Pas de la grille densifiée (None = frames de 60s)
+        line_of_sight: Murs pris en compte dans la visibilité
+        brushes: Règle des buissons prise en compte dans la visibilité
+        minions: Vision des sbires synthétiques prise en compte
+        coverage: Colonnes de couverture de vision calculées
+    
+    Returns:
+        Un MatchResult par timeline, dans le même ordre
+    """
+    worker = partial(
+        process_match, step_ms=step_ms, line_of_sight=line_of_sight, brushes=brushes, minions=minions,
+        coverage=coverage,
+    )
+    
+    if workers <= 1 or len(timeline_files) <= 1:
+        return [worker(path) for path in timeline_files]
+    
+    # spawn plutôt que fork: polars est multi-threadé
+    chunksize = max(1, len(timeline_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        return list(pool.map(worker, timeline_files, chunksize=chunksize))
 
 
 def process_multiple_matches(
     matches_dir: Path,
-    output_path: Path = Path('data/processed/fog_dataset.csv')
-) -> pl.DataFrame:
+    output_dir: Path = DATASET_DIR,
+    workers: int = 1,
+    force: bool = False,
+    step_ms: Optional[int] = None,
+    line_of_sight: bool = False,
+    brushes: bool = False,
+    minions: bool = False,
+    coverage: bool = False,
+    timings_path: Optional[Path] = None,
+    trace_path: Optional[Path] = None,
+) -> Optional[pl.LazyFrame]:
     """
     Traiter plusieurs matchs et combiner en un seul dataset
     
+    Build incrémental: chaque match est écrit dans sa propre partition
+    Parquet typée (voir api/dataset.py) et un manifest (empreinte de la
+    timeline et du match, PROCESSOR_VERSION, versions des caches fog
+    utilisés) permet de ne retraiter que les matchs nouveaux ou modifiés.
+    
     Args:
         matches_dir: Dossier contenant match.json + match_timeline.json
-        output_path: Chemin de sortie du dataset combiné
+        output_dir: Dossier du dataset partitionné (partitions + manifest)
+        workers: Nombre de processus pour traiter les matchs en parallèle
+        force: Retraiter tous les matchs en ignorant le manifest
+        step_ms: Pas de la grille densifiée (None = frames de 60s)
+        line_of_sight: Murs pris en compte dans la visibilité
+        brushes: Règle des buissons prise en compte dans la visibilité
+        minions: Vision des sbires synthétiques prise en compte
+        coverage: Colonnes coverage_* calculées (masques rasterisés);
+            sinon nulles
+        timings_path: Rapport JSON des temps par étape (par match et
+            agrégés); défaut: TIMINGS_NAME dans output_dir
+        trace_path: Si donné, export Chrome trace des étapes
     
     Returns:
-        DataFrame combiné de tous les matchs
+        LazyFrame du dataset combiné (scan_dataset), None si aucun match.
+        Le résumé n'agrège que quelques colonnes: le dataset n'est jamais
+        chargé en entier.
     """
-    all_dfs = []
-    
-    # Trouver tous les fichiers timeline
-    timeline_files = list(matches_dir.glob('*_timeline.json'))
+    manifest = DatasetManifest(output_dir / MANIFEST_NAME)
+    options = {'step_ms': step_ms}
+    if line_of_sight:
+        options['line_of_sight'] = True
+    if brushes:
+        options['brushes'] = True
+    if minions:
+        options['minions'] = True
+    if coverage:
+        options['coverage'] = True
+    
+    # Caches fog dont dépend la sortie: un changement de version force le rebuild
+    cache_versions = {'timeline': CACHE_VERSION, 'structures': STRUCTURES_VERSION}
+    if line_of_sight:
+        cache_versions['line_of_sight'] = LOS_VERSION
+    if coverage:
+        cache_versions['raster'] = RASTER_VERSION
+    
+    # Trouver tous les fichiers timeline (ordre fixe pour un dataset reproductible)
+    timeline_files = sorted(matches_dir.glob('*_timeline.json'))
+    match_ids = [path.stem.replace('_timeline', '') for path in timeline_files]
+    
+    # Matchs dont la timeline a disparu
+    for partition in manifest.prune(match_ids):
+        partition.unlink(missing_ok=True)
+    
+    todo = [
+        path for path, match_id in zip(timeline_files, match_ids)
+        if force or not manifest.is_up_to_date(
+            match_id, path, path.with_name(f'{match_id}.json'), PROCESSOR_VERSION, options, cache_versions,
+        )
+    ]
     
     print(f"\n{'='*80}")
     print(f"📊 TRAITEMENT TIMELINES → DATASET ML")
     print(f"{'='*80}\n")
-    
-    for i, timeline_path in enumerate(timeline_files, 1):
-        # Déduire le chemin du match correspondant
-        match_id = timeline_path.stem.replace('_timeline', '')
-        match_path = timeline_path.parent / f"{match_id}.json"
-        
-        if not match_path.exists():
-            print(f"⚠️  {i}/{len(timeline_files)}: Match file manquant pour {match_id}")
+    print(f"🧵 Workers: {workers}")
+    print(f"⏱️  Pas: {f'{step_ms} ms (interpolé)' if step_ms else 'frames 60s'}")
+    print(f"🧱 Murs: {'oui (ligne de vue)' if line_of_sight else 'non (rayon seul)'}")
+    print(f"🌿 Buissons: {'oui' if brushes else 'non'}")
+    print(f"🪖 Sbires: {'oui (vagues synthétiques)' if minions else 'non'}")
+    print(f"🗺️  Couverture: {'oui (masques rasterisés)' if coverage else 'non'}")
+    print(f"♻️  À jour: {len(timeline_files) - len(todo)}, à traiter: {len(todo)}\n")
+    
+    if line_of_sight and todo:
+        # Table construite (ou chargée) une fois avant de lancer les workers
+        get_line_of_sight()
+    
+    run_start = time.perf_counter()
+    results = process_matches(
+        todo, workers=workers, step_ms=step_ms,
+        line_of_sight=line_of_sight, brushes=brushes, minions=minions, coverage=coverage,
+    )
+    
+    for i, (path, result) in enumerate(zip(todo, results), 1):
+        if result.error:
+            print(f"❌ {i}/{len(results)}: {result.match_id} ({result.error})")
             continue
         
-        print(f"🎮 {i}/{len(timeline_files)}: {match_id}")
+        previous = manifest.entries.get(result.match_id)
+        write_start = time.time(), time.perf_counter()
+        partition = write_partition(result.df, output_dir, result.match_id)
+        result.spans.append(Span('write', write_start[0], time.perf_counter() - write_start[1], os.getpid()))
+        if previous and output_dir / previous.partition != partition:
+            (output_dir / previous.partition).unlink(missing_ok=True)
+        manifest.record(
+            result.match_id, path, path.with_name(f'{result.match_id}.json'), PROCESSOR_VERSION,
+            partition, result.df.height, options, cache_versions,
+        )
         
-        try:
-            df = process_timeline_to_dataset(timeline_path, match_path)
-            
-            # Ajouter colonne match_id pour tracking
-            df = df.with_columns(pl.lit(match_id).alias('match_id'))
-            
-            all_dfs.append(df)
-            
-            # Stats
-            total_positions = len(df)
-            enemy_positions = df.filter(pl.col('team') == 200).height
-            visible_enemies = df.filter((pl.col('team') == 200) & (pl.col('visible_to_enemy'))).height
-            hidden_enemies = enemy_positions - visible_enemies
-            
-            print(f"   ✅ {total_positions} positions extraites")
-            print(f"   👁️  Ennemis: {visible_enemies} visibles, {hidden_enemies} dans fog")
-            print()
-            
-        except Exception as e:
-            print(f"   ❌ Erreur: {e}\n")
-            continue
+        hidden_enemies = result.enemy_positions - result.visible_enemies
+        print(f"🎮 {i}/{len(results)}: {result.match_id}")
+        print(f"   ✅ {result.df.height} positions extraites")
+        print(f"   👁️  Ennemis: {result.visible_enemies} visibles, {hidden_enemies} dans fog")
     
-    if not all_dfs:
-        print("❌ Aucun match traité avec succès")
-        return pl.DataFrame()
+    manifest.save()
     
-    # Combiner tous les DataFrames
-    combined_df = pl.concat(all_dfs)
+    failures = {r.match_id: r.error for r in results if r.error}
     
-    # Sauvegarder
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    combined_df.write_csv(output_path)
+    if results:
+        timed_matches = [(r.match_id, r.spans) for r in results]
+        report = timing_report(timed_matches, time.perf_counter() - run_start, min(workers, len(results)))
+        write_timing_report(report, timings_path or output_dir / TIMINGS_NAME)
+        if trace_path:
+            write_chrome_trace(timed_matches, trace_path)
+    partitions = manifest.partitions()
+    
+    if not partitions:
+        print("❌ Aucun match traité avec succès")
+        return None
+    
+    # Toutes les partitions (nouvelles + déjà à jour), en lazy: seuls les
+    # agrégats du résumé sont collectés
+    combined = scan_dataset(output_dir)
+    enemies_mask = pl.col('team') == 200
+    total, enemies, visible = combined.select(
+        pl.len().alias('positions'),
+        enemies_mask.sum().alias('enemies'),
+        (enemies_mask & pl.col('visible_to_enemy')).sum().alias('visible'),
+    ).collect().row(0)
     
     print(f"\n{'='*80}")
     print(f"✅ DATASET CRÉÉ")
     print(f"{'='*80}\n")
-    print(f"📁 Fichier: {output_path}")
-    print(f"📊 Total: {len(combined_df):,} positions")
-    print(f"🎮 Matchs: {len(all_dfs)}")
+    print(f"📁 Dataset: {output_dir}")
+    print(f"📊 Total: {total:,} positions")
+    print(f"🎮 Matchs: {len(partitions)} ({len(results) - len(failures)} traités)")
+    
+    if failures:
+        print(f"⚠️  Échecs: {len(failures)}")
+        for match_id, error in failures.items():
+            print(f"   - {match_id}: {error}")
+    
     print(f"\n📈 Statistiques fog of war:")
     
-    enemies = combined_df.filter(pl.col('team') == 200)
-    visible = enemies.filter(pl.col('visible_to_enemy') == True)
-    hidden = enemies.filter(pl.col('visible_to_enemy') == False)
+    hidden = enemies - visible
+    
+    if enemies:
+        print(f"   Positions ennemies: {enemies:,}")
+        print(f"   ✅ Visibles: {visible:,} ({visible/enemies*100:.1f}%)")
+        print(f"   🌫️  Dans fog: {hidden:,} ({hidden/enemies*100:.1f}%)")
     
-    print(f"   Positions ennemies: {enemies.height:,}")
-    print(f"   ✅ Visibles: {visible.height:,} ({visible.height/enemies.height*100:.1f}%)")
-    print(f"   🌫️  Dans fog: {hidden.height:,} ({hidden.height/enemies.height*100:.1f}%)")
+    if results:
+        print()
+        print_timing_report(report)
+        print(f"   📝 Rapport: {timings_path or output_dir / TIMINGS_NAME}"
+              + (f", trace: {trace_path}" if trace_path else ""))
     print()
     
-    return combined_df
+    return combined
 
 
-def analyze_dataset(df: pl.DataFrame):
-    """Afficher statistiques détaillées du dataset"""
+def analyze_dataset(lf: pl.LazyFrame):
+    """Afficher statistiques détaillées du dataset (agrégats lazy, jamais le dataset entier)"""
     
     print(f"\n{'='*80}")
     print(f"📊 ANALYSE DATASET")
     print(f"{'='*80}\n")
     
-    print(f"Dimensions: {df.height:,} lignes × {df.width} colonnes")
-    print(f"\nColonnes: {', '.join(df.columns)}")
+    columns = lf.collect_schema().names()
+    rows = lf.select(pl.len()).collect().item()
+    print(f"Dimensions: {rows:,} lignes × {len(columns)} colonnes")
+    print(f"\nColonnes: {', '.join(columns)}")
     
     print(f"\n{'─'*80}")
     print("Distribution des équipes:")
-    print(df.group_by('team').agg(pl.count()).sort('team'))
+    print(lf.group_by('team').agg(pl.len()).sort('team').collect())
     
     print(f"\n{'─'*80}")
     print("Top 10 champions:")
-    print(df.group_by('champion').agg(pl.count().alias('count')).sort('count', descending=True).head(10))
+    print(lf.group_by('champion').agg(pl.len().alias('count')).sort('count', descending=True).head(10).collect())
     
     print(f"\n{'─'*80}")
     print("Visibilité ennemis (team 200):")
-    enemies = df.filter(pl.col('team') == 200)
-    print(enemies.group_by('visible_to_enemy').agg(pl.count()))
+    enemies = lf.filter(pl.col('team') == 200)
+    print(enemies.group_by('visible_to_enemy').agg(pl.len()).collect())
     
     print(f"\n{'─'*80}")
     print("Statistiques positions:")
-    print(df.select(['position_x', 'position_y']).describe())
+    print(lf.select(['position_x', 'position_y']).describe())
     
     print(f"\n{'─'*80}")
     print("Échantillon de données:")
-    print(df.head(10))
+    print(lf.head(10).collect())
     print()
 
 
 def main():
     """Test du processeur"""
     
-    # Dossier contenant les matchs téléchargés
-    matches_dir = Path('data/riot_api/matches')
+    parser = argparse.ArgumentParser(description="Timelines API Riot → dataset fog of war")
+    parser.add_argument('--matches', type=Path, default=Path('data/riot_api/matches'),
+                        help="Dossier des matchs (ex: data/synthetic/matches)")
+    parser.add_argument('--output', type=Path, default=DATASET_DIR,
+                        help="Dossier du dataset partitionné")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus (défaut: nombre de cœurs)")
+    parser.add_argument('--force', action='store_true',
+                        help="Retraiter tous les matchs (ignorer le manifest)")
+    parser.add_argument('--step-ms', type=int, default=None,
+                        help="Densifier les positions sur une grille (ex: 1000, 5000, 10000)")
+    parser.add_argument('--line-of-sight', action='store_true',
+                        help="Les murs bloquent la vision (table de ligne de vue précalculée)")
+    parser.add_argument('--brushes', action='store_true',
+                        help="Un joueur dans un buisson n'est vu que depuis ce buisson")
+    parser.add_argument('--minions', action='store_true',
+                        help="Vision des vagues de sbires (positions synthétiques)")
+    parser.add_argument('--coverage', action='store_true',
+                        help="Part de la map / des régions en vision (colonnes coverage_*)")
+    parser.add_argument('--timings', type=Path, default=None,
+                        help=f"Rapport JSON des temps par étape (défaut: <output>/{TIMINGS_NAME})")
+    parser.add_argument('--trace', type=Path, default=None,
+                        help="Exporter une trace Chrome des étapes (chrome://tracing, Perfetto)")
+    args = parser.parse_args()
+    
+    # Dossier contenant les matchs téléchargés (ou générés)
+    matches_dir = args.matches
     
     if not matches_dir.exists():
         print(f"❌ Dossier {matches_dir} non trouvé")
@@ -424,11 +707,15 @@ def main():
         return
     
     # Traiter tous les matchs
-    df = process_multiple_matches(matches_dir)
+    dataset = process_multiple_matches(
+        matches_dir, args.output, workers=args.workers, force=args.force, step_ms=args.step_ms,
+        line_of_sight=args.line_of_sight, brushes=args.brushes, minions=args.minions,
+        coverage=args.coverage, timings_path=args.timings, trace_path=args.trace,
+    )
     
-    if df.height > 0:
+    if dataset is not None:
         # Analyser le dataset
-        analyze_dataset(df)
+        analyze_dataset(dataset)
 
 
 if __name__ == '__main__':
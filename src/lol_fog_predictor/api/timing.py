@@ -0,0 +1,167 @@
+"""
+Chronométrage par étape du build du dataset fog of war
+
+Chaque match traité (dans un worker ou non) enregistre des spans
+(étape, début, durée, pid) avec un StageTimer. Le process principal les
+agrège par match et sur tout le run:
+
+    - rapport JSON: total / moyenne / p50 / p99 / part du temps par étape,
+      et le détail de chaque match
+    - trace Chrome optionnelle (chrome://tracing, Perfetto): un événement
+      "X" par span, une ligne par worker
+
+Étapes de process_match, dans l'ordre:
+    json_load   cache colonnaire de la timeline + match.json
+    mapping     participant → équipe / champion
+    positions   positions (interpolées si step_ms), level, gold
+    wards       wards actives par équipe (+ tourelles debout)
+    visibility  compute_visible_to_enemy
+    coverage    masques de vision rasterisés + part des régions en vision
+    dataframe   construction du DataFrame + colonnes "dernière fois vu"
+    write       écriture de la partition (process principal)
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import ContextManager, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+STAGES = ('json_load', 'mapping', 'positions', 'wards', 'visibility', 'coverage', 'dataframe')
+
+
+@dataclass
+class Span:
+    """Une étape chronométrée"""
+    stage: str
+    start: float  # Epoch (s): comparable entre processus pour la trace
+    duration: float  # Secondes (perf_counter)
+    pid: int
+
+
+@dataclass
+class StageTimer:
+    """Collecte les spans d'un match (picklable: renvoyé par les workers)"""
+    spans: List[Span] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Chronométrer le bloc `with` sous le nom d'étape `name`"""
+        start, t0 = time.time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append(Span(name, start, time.perf_counter() - t0, os.getpid()))
+
+    def totals(self) -> Dict[str, float]:
+        """Durée cumulée (s) par étape"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.stage] = totals.get(span.stage, 0.0) + span.duration
+        return totals
+
+
+def timed(timer: Optional[StageTimer], name: str) -> ContextManager:
+    """timer.stage(name), ou un contexte vide si pas de timer"""
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+def timing_report(
+    matches: Sequence[Tuple[str, List[Span]]],
+    wall_s: float,
+    workers: int = 1,
+) -> Dict:
+    """
+    Agréger les spans par match et sur tout le run
+
+    Args:
+        matches: (match_id, spans) de chaque match traité
+        wall_s: Durée totale du run (horloge murale)
+        workers: Nombre de processus du run
+
+    Returns:
+        {'wall_s', 'workers', 'matches', 'cpu_s',
+         'stages': {stage: {'total_s', 'mean_ms', 'p50_ms', 'p99_ms', 'share'}},
+         'per_match': {match_id: {stage: s, ..., 'total': s}}}
+    """
+    per_match = {}
+    for match_id, spans in matches:
+        totals = StageTimer(list(spans)).totals()
+        per_match[match_id] = {**totals, 'total': sum(totals.values())}
+
+    cpu_s = sum(entry['total'] for entry in per_match.values())
+    names = list(STAGES) + sorted({s for e in per_match.values() for s in e} - set(STAGES) - {'total'})
+
+    stages = {}
+    for name in names:
+        values = np.array([entry[name] for entry in per_match.values() if name in entry])
+        if not len(values):
+            continue
+        stages[name] = {
+            'total_s': float(values.sum()),
+            'mean_ms': float(values.mean() * 1000),
+            'p50_ms': float(np.percentile(values, 50) * 1000),
+            'p99_ms': float(np.percentile(values, 99) * 1000),
+            'share': float(values.sum() / cpu_s) if cpu_s else 0.0,
+        }
+
+    return {
+        'wall_s': wall_s,
+        'workers': workers,
+        'matches': len(per_match),
+        'cpu_s': cpu_s,
+        'stages': stages,
+        'per_match': per_match,
+    }
+
+
+def write_timing_report(report: Dict, path: Path):
+    """Écrire le rapport JSON (dossier parent créé si besoin)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def write_chrome_trace(matches: Sequence[Tuple[str, List[Span]]], path: Path):
+    """
+    Exporter les spans au format Chrome trace (chrome://tracing, Perfetto)
+
+    Un événement complet ("X") par étape plus un par match englobant ses
+    étapes STAGES (hors écriture, faite après coup par le process principal);
+    pid = 0 et tid = pid du processus, pour une ligne par worker.
+    """
+    events = []
+    origin = min((span.start for _, spans in matches for span in spans), default=0.0)
+
+    def event(name: str, category: str, start: float, duration: float, pid: int, match_id: str) -> Dict:
+        return {
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': (start - origin) * 1e6, 'dur': duration * 1e6,
+            'pid': 0, 'tid': pid, 'args': {'match_id': match_id},
+        }
+
+    for match_id, spans in matches:
+        if not spans:
+            continue
+        worker = [span for span in spans if span.stage in STAGES] or spans
+        start = min(span.start for span in worker)
+        end = max(span.start + span.duration for span in worker)
+        events.append(event(match_id, 'match', start, end - start, worker[0].pid, match_id))
+        events.extend(event(s.stage, 'stage', s.start, s.duration, s.pid, match_id) for s in spans)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def print_timing_report(report: Dict):
+    """Tableau des étapes (temps cumulé, moyenne et p99 par match, part du total)"""
+    print(f"⏱️  Temps par étape ({report['matches']} matchs, {report['wall_s']:.2f}s mur, "
+          f"{report['cpu_s']:.2f}s cumulés sur {report['workers']} worker(s)):")
+    for name, stats in report['stages'].items():
+        print(f"   {name:<11} {stats['total_s']:8.2f}s  moy {stats['mean_ms']:8.1f} ms  "
+              f"p99 {stats['p99_ms']:8.1f} ms  {stats['share']*100:5.1f}%")
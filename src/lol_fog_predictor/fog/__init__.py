@@ -1,5 +1,62 @@
 """Fog of War module."""
 
 from .vision_calculator import calculate_fog_of_war, distance, VISION_RADIUS
+from .engine import (
+    CHAMPION_VISION_RADIUS,
+    WARD_VISION_RADIUS,
+    MINION_VISION_RADIUS,
+    SOURCE_CHAMPION_MASK,
+    SOURCE_TURRET_MASK,
+    SOURCE_WARD_BIT,
+    SOURCE_MINION_BIT,
+    any_source_visible,
+    compute_visible_to_enemy,
+    pack_sources,
+    sources_visible,
+    within_radius,
+)
+from .spatial_index import VisionGrid, any_within_radius
+from .line_of_sight import LineOfSight, get_line_of_sight
+from .brushes import BrushIndex, get_brush_index
+from .minions import LANE_PATHS, minion_positions, minion_sources
+from .structures import TURRET_POSITIONS, TurretTimeline, get_turret_timeline
+from .raster import RASTER_CELL_SIZE, VisionMasks, rasterize_vision
+from .wards import WARD_DURATIONS, Ward, WardIndex, WardTracker, build_wards
 
-__all__ = ['calculate_fog_of_war', 'distance', 'VISION_RADIUS']
+__all__ = [
+    'calculate_fog_of_war',
+    'distance',
+    'VISION_RADIUS',
+    'CHAMPION_VISION_RADIUS',
+    'WARD_VISION_RADIUS',
+    'MINION_VISION_RADIUS',
+    'SOURCE_CHAMPION_MASK',
+    'SOURCE_TURRET_MASK',
+    'SOURCE_WARD_BIT',
+    'SOURCE_MINION_BIT',
+    'any_source_visible',
+    'compute_visible_to_enemy',
+    'pack_sources',
+    'sources_visible',
+    'within_radius',
+    'VisionGrid',
+    'any_within_radius',
+    'LineOfSight',
+    'get_line_of_sight',
+    'BrushIndex',
+    'get_brush_index',
+    'LANE_PATHS',
+    'minion_positions',
+    'minion_sources',
+    'TURRET_POSITIONS',
+    'TurretTimeline',
+    'get_turret_timeline',
+    'RASTER_CELL_SIZE',
+    'VisionMasks',
+    'rasterize_vision',
+    'WARD_DURATIONS',
+    'Ward',
+    'WardIndex',
+    'WardTracker',
+    'build_wards',
+]
@@ -0,0 +1,136 @@
+"""
+Buissons (brush) et vision asymétrique
+
+Règle: une unité dans un buisson n'est visible que par les sources situées
+dans le même buisson (champions ou wards posées dedans). Hors buisson, la
+règle de rayon habituelle s'applique.
+
+Les polygones sont rasterisés une fois en une grille d'étiquettes
+(cellules de 50 unités, 0 = hors buisson): "dans quel buisson est ce
+point ?" est une lecture de tableau en O(1), vectorisée sur des millions
+de positions.
+"""
+
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from lol_fog_predictor.fog.spatial_index import MAP_SIZE
+
+BRUSH_CELL_SIZE = 50
+
+# Buissons côté bleu (approximatifs, en coordonnées de jeu).
+# Le côté rouge est obtenu par symétrie centrale (x, y) → (MAP_SIZE - x, MAP_SIZE - y).
+BLUE_SIDE_BRUSHES: List[List[Tuple[float, float]]] = [
+    # Top lane (entrée de rivière)
+    [(1100, 11800), (1700, 11800), (1700, 12400), (1100, 12400)],
+    [(2100, 12900), (2700, 12900), (2700, 13500), (2100, 13500)],
+    # Tri-brush
+    [(1900, 9400), (2700, 9300), (2800, 9900), (2300, 10200), (1900, 10000)],
+    # Blue buff / gromp
+    [(2700, 7500), (3300, 7500), (3400, 8100), (2800, 8200)],
+    # Loups
+    [(4200, 6700), (4800, 6700), (4800, 7300), (4200, 7300)],
+    # Mid (côté rivière haute)
+    [(5900, 7900), (6500, 7900), (6500, 8500), (5900, 8500)],
+    # Raptors
+    [(6300, 4500), (6900, 4500), (6900, 5100), (6300, 5100)],
+    # Red buff
+    [(7300, 3000), (7900, 3000), (7900, 3600), (7300, 3600)],
+    # Entrée de rivière bot
+    [(9200, 1900), (9800, 1900), (9800, 2500), (9200, 2500)],
+    # Rivière (pixel brush)
+    [(8800, 5400), (9300, 5500), (9200, 6000), (8700, 5900)],
+]
+
+BRUSH_POLYGONS: List[List[Tuple[float, float]]] = BLUE_SIDE_BRUSHES + [
+    [(MAP_SIZE - x, MAP_SIZE - y) for x, y in polygon] for polygon in BLUE_SIDE_BRUSHES
+]
+
+
+def points_in_polygon(points: np.ndarray, polygon: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """
+    Test pair-impair (ray casting) vectorisé sur les points
+
+    Args:
+        points: (N, 2)
+        polygon: Sommets (x, y), fermeture implicite
+
+    Returns:
+        (N,) bool
+    """
+    vertices = np.asarray(polygon, dtype=np.float64)
+    x, y = points[:, 0:1], points[:, 1:2]
+    x0, y0 = vertices[:, 0], vertices[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+
+    # Arêtes traversées par la demi-droite horizontale partant du point vers +x
+    straddles = (y0 <= y) != (y1 <= y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    crossings = straddles & (x < x_cross)
+    return crossings.sum(axis=1) % 2 == 1
+
+
+class BrushIndex:
+    """
+    Grille d'étiquettes des buissons
+
+    Args:
+        polygons: Polygones des buissons (étiquette = index + 1)
+        cell_size: Taille d'une cellule (unités)
+    """
+
+    def __init__(
+        self,
+        polygons: Sequence[Sequence[Tuple[float, float]]] = BRUSH_POLYGONS,
+        cell_size: int = BRUSH_CELL_SIZE,
+    ):
+        self.polygons = polygons
+        self.cell_size = cell_size
+        self.size = int(np.ceil(MAP_SIZE / cell_size))
+
+        # Étiquette de chaque cellule = buisson contenant son centre
+        centers = (np.arange(self.size) + 0.5) * cell_size
+        grid_x, grid_y = np.meshgrid(centers, centers)
+        points = np.stack([grid_x.ravel(), grid_y.ravel()], axis=-1)
+        labels = np.zeros(len(points), dtype=np.int16)
+        for label, polygon in enumerate(polygons, 1):
+            labels[points_in_polygon(points, polygon)] = label
+        self.labels = labels.reshape(self.size, self.size)
+
+    def brush_at(self, points: np.ndarray) -> np.ndarray:
+        """
+        Buisson de chaque point (0 = hors buisson, NaN ou hors map → 0)
+
+        Args:
+            points: (..., 2)
+
+        Returns:
+            (...) int16
+        """
+        points = np.asarray(points, dtype=np.float64)
+        cells = np.floor(points / self.cell_size)
+        inside = ((cells >= 0) & (cells < self.size)).all(axis=-1)
+        cells = np.where(inside[..., None], cells, 0).astype(np.int64)
+        return np.where(inside, self.labels[cells[..., 1], cells[..., 0]], 0).astype(np.int16)
+
+    def can_see(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Règle des buissons pour des paires (source_i, cible_i)
+
+        Une cible hors buisson est toujours visible (à portée); une cible
+        dans un buisson seulement depuis le même buisson.
+
+        Returns:
+            (N,) bool
+        """
+        target_brush = self.brush_at(targets)
+        return (target_brush == 0) | (self.brush_at(sources) == target_brush)
+
+
+@lru_cache(maxsize=None)
+def get_brush_index(cell_size: int = BRUSH_CELL_SIZE) -> BrushIndex:
+    """Grille des buissons de Summoner's Rift, construite une fois par processus"""
+    return BrushIndex(BRUSH_POLYGONS, cell_size)
@@ -0,0 +1,258 @@
+"""
+Moteur de fog of war vectorisé (NumPy)
+
+Calcule `visible_to_enemy` pour toutes les frames d'un match d'un coup,
+à partir de tableaux (frames × joueurs × 2), au lieu de tester chaque
+ennemi un par un avec des boucles Python.
+
+Optionnellement, la même passe produit le bitset des sources qui voient
+chaque joueur (colonne `vision_sources`, uint64):
+    bits 0-15   champion allié de l'observateur (rang dans son équipe)
+    bits 16-47  tourelle (index dans TURRET_POSITIONS[équipe])
+    bit 48      au moins une ward
+    bit 49      au moins un sbire
+
+Les wards actives changent tout le match: elles n'ont pas de bit chacune.
+La ward attribuée (la plus proche parmi celles qui voient le joueur) est
+renvoyée à part, par son index stable dans le match (WardIndex.active_slots).
+"""
+
+from functools import partial
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from lol_fog_predictor.fog.brushes import BrushIndex
+from lol_fog_predictor.fog.line_of_sight import LineOfSight
+from lol_fog_predictor.fog.spatial_index import any_within_radius
+
+# Constantes de vision League of Legends
+CHAMPION_VISION_RADIUS = 1350  # Champions, pets, super minions, tourelles
+WARD_VISION_RADIUS = 900  # Totem/Stealth/Control/Zombie Wards, Effigies
+MINION_VISION_RADIUS = 1200  # Melee/Caster/Siege Minions
+
+TEAMS = (100, 200)
+
+# Au-delà de ce nombre de sources par frame, passer par la grille spatiale
+# plutôt que par la matrice de distances complète (F × P × S)
+INDEX_MIN_SOURCES = 64
+
+# Disposition du bitset des sources de vision
+SOURCE_CHAMPION_SHIFT = 0
+SOURCE_CHAMPION_BITS = 16
+SOURCE_TURRET_SHIFT = 16
+SOURCE_TURRET_BITS = 32
+SOURCE_WARD_BIT = 48
+SOURCE_MINION_BIT = 49
+SOURCE_CHAMPION_MASK = ((1 << SOURCE_CHAMPION_BITS) - 1) << SOURCE_CHAMPION_SHIFT
+SOURCE_TURRET_MASK = ((1 << SOURCE_TURRET_BITS) - 1) << SOURCE_TURRET_SHIFT
+
+
+def within_radius(targets: np.ndarray, sources: np.ndarray, radius: float) -> np.ndarray:
+    """
+    Matrice "source à portée de cible" pour toutes les frames
+
+    Args:
+        targets: (F, P, 2) positions des cibles, NaN si absente
+        sources: (F, S, 2) positions des sources par frame, ou (S, 2) si fixes
+        radius: Rayon de vision des sources
+
+    Returns:
+        (F, P, S) bool, False dès qu'une des deux positions est NaN
+    """
+    if sources.ndim == 2:
+        sources = sources[None]
+    diff = targets[:, :, None, :] - sources[:, None, :, :]
+    dist_sq = np.einsum('...k,...k->...', diff, diff)
+    return dist_sq <= radius * radius
+
+
+def any_source_in_range(targets: np.ndarray, sources: np.ndarray, radius: float) -> np.ndarray:
+    """
+    (F, P) bool: au moins une source à portée de chaque cible
+
+    Matrice de distances dense pour quelques sources, grille spatiale
+    (fog/spatial_index.py) quand elles sont nombreuses.
+    """
+    if sources.shape[-2] >= INDEX_MIN_SOURCES:
+        return any_within_radius(targets, sources, radius)
+    return within_radius(targets, sources, radius).any(axis=-1)
+
+
+def any_source_visible(
+    targets: np.ndarray,
+    sources: np.ndarray,
+    radius: float,
+    line_of_sight: Optional[LineOfSight] = None,
+    brushes: Optional[BrushIndex] = None,
+) -> np.ndarray:
+    """
+    (F, P) bool: au moins une source à portée qui voit réellement la cible
+
+    Sans murs ni buissons, équivaut à any_source_in_range(). Sinon les
+    paires (source, cible) à portée sont filtrées par lecture de table:
+    ligne de vue (fog/line_of_sight.py) puis règle des buissons
+    (fog/brushes.py).
+    """
+    if line_of_sight is None and brushes is None:
+        return any_source_in_range(targets, sources, radius)
+    return sources_visible(targets, sources, radius, line_of_sight, brushes).any(axis=-1)
+
+
+def sources_visible(
+    targets: np.ndarray,
+    sources: np.ndarray,
+    radius: float,
+    line_of_sight: Optional[LineOfSight] = None,
+    brushes: Optional[BrushIndex] = None,
+) -> np.ndarray:
+    """
+    (F, P, S) bool: source à portée qui voit réellement la cible
+
+    within_radius() dont les paires à portée sont filtrées par la ligne de
+    vue puis la règle des buissons, si données.
+    """
+    in_range = within_radius(targets, sources, radius)
+    if line_of_sight is None and brushes is None:
+        return in_range
+    if sources.ndim == 2:
+        sources = np.broadcast_to(sources, (targets.shape[0],) + sources.shape)
+
+    frame, target, source = np.nonzero(in_range)
+    pair_sources = sources[frame, source]
+    pair_targets = targets[frame, target]
+
+    seen = np.ones(len(frame), dtype=bool)
+    if line_of_sight is not None:
+        seen &= line_of_sight.visible(pair_sources, pair_targets)
+    if brushes is not None:
+        seen &= brushes.can_see(pair_sources, pair_targets)
+
+    result = np.zeros(in_range.shape, dtype=bool)
+    result[frame[seen], target[seen], source[seen]] = True
+    return result
+
+
+def pack_sources(seen: np.ndarray, shift: int = 0, width: int = 64) -> np.ndarray:
+    """
+    (F, P, S) bool → (F, P) uint64, bit shift + s pour la source s
+
+    packbits little-endian puis vue uint64: pas de boucle sur les sources.
+    Lève ValueError si S dépasse les `width` bits réservés.
+    """
+    if seen.shape[-1] > width or shift + width > 64:
+        raise ValueError(f"{seen.shape[-1]} sources pour {width} bits à partir du bit {shift}")
+    packed = np.packbits(seen, axis=-1, bitorder='little')
+    words = np.zeros(seen.shape[:-1] + (8,), dtype=np.uint8)
+    words[..., :packed.shape[-1]] = packed
+    return words.view('<u8')[..., 0].astype(np.uint64) << np.uint64(shift)
+
+
+def compute_visible_to_enemy(
+    positions: np.ndarray,
+    teams: np.ndarray,
+    turret_positions: Dict[int, np.ndarray],
+    ward_positions: Optional[Dict[int, np.ndarray]] = None,
+    minion_positions: Optional[Dict[int, np.ndarray]] = None,
+    line_of_sight: Optional[LineOfSight] = None,
+    brushes: Optional[BrushIndex] = None,
+    return_sources: bool = False,
+    ward_ids: Optional[Dict[int, np.ndarray]] = None,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Calculer la visibilité de chaque joueur par l'équipe adverse
+
+    Prend en compte:
+    - Vision des champions alliés (1350 unités)
+    - Vision des tourelles alliées (1350 unités)
+    - Vision des wards alliées (900 unités)
+    - Vision des sbires alliés (1200 unités), si fournie
+
+    Args:
+        positions: (F, P, 2) positions des joueurs, NaN si absente de la frame
+        teams: (P,) équipe de chaque joueur (100 ou 200)
+        turret_positions: {team: (T, 2)} tourelles de chaque équipe, ou
+            (F, T, 2) par frame avec NaN pour une tourelle détruite
+        ward_positions: {team: (F, W, 2)} wards de chaque équipe, NaN-padded
+        minion_positions: {team: (F, M, 2)} sbires de chaque équipe, NaN-padded
+            (voir fog/minions.py)
+        line_of_sight: Si donné, les murs bloquent la vision (fog/line_of_sight.py)
+        brushes: Si donné, une cible dans un buisson n'est vue que depuis
+            ce buisson (fog/brushes.py)
+        return_sources: Si True, renvoie aussi le bitset des sources (voir
+            SOURCE_*), calculé dans la même passe: champions et tourelles
+            par source, wards et sbires par catégorie, et la ward attribuée
+        ward_ids: {team: (F, W)} index stable de la ward de chaque slot de
+            ward_positions (WardIndex.active_slots); sinon la ward attribuée
+            est son slot
+
+    Returns:
+        (F, P) bool, True si le joueur est vu par l'équipe adverse;
+        avec return_sources, (visible, (F, P) uint64, (F, P) int32 index de
+        la ward la plus proche qui voit le joueur, -1 si aucune)
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    teams = np.asarray(teams)
+    visible = np.zeros(positions.shape[:2], dtype=bool)
+    sources = np.zeros(positions.shape[:2], dtype=np.uint64)
+    spotter_ward = np.full(positions.shape[:2], -1, dtype=np.int32)
+    in_range = partial(any_source_visible, line_of_sight=line_of_sight, brushes=brushes)
+    each_in_range = partial(sources_visible, line_of_sight=line_of_sight, brushes=brushes)
+
+    for team in TEAMS:
+        allies = teams == team
+        enemies = ~allies
+        if not enemies.any():
+            continue
+
+        enemy_positions = positions[:, enemies]
+        turrets = turret_positions.get(team)
+        has_turrets = turrets is not None and len(turrets)
+
+        if return_sources:
+            # Champions et tourelles: une ligne par source, puis packing en bits
+            bits = pack_sources(
+                each_in_range(enemy_positions, positions[:, allies], CHAMPION_VISION_RADIUS),
+                SOURCE_CHAMPION_SHIFT, SOURCE_CHAMPION_BITS,
+            )
+            if has_turrets:
+                bits |= pack_sources(
+                    each_in_range(enemy_positions, np.asarray(turrets), CHAMPION_VISION_RADIUS),
+                    SOURCE_TURRET_SHIFT, SOURCE_TURRET_BITS,
+                )
+            seen = bits != 0
+        else:
+            seen = in_range(enemy_positions, positions[:, allies], CHAMPION_VISION_RADIUS)
+            if has_turrets:
+                seen |= in_range(enemy_positions, turrets, CHAMPION_VISION_RADIUS)
+
+        wards = (ward_positions or {}).get(team)
+        if wards is not None and wards.shape[1]:
+            if return_sources:
+                # Une ligne par ward: la plus proche de celles qui voient est attribuée
+                seen_each = each_in_range(enemy_positions, wards, WARD_VISION_RADIUS)
+                seen_by_ward = seen_each.any(axis=-1)
+                diff = enemy_positions[:, :, None, :] - wards[:, None, :, :]
+                dist_sq = np.where(seen_each, np.einsum('...k,...k->...', diff, diff), np.inf)
+                slot = dist_sq.argmin(axis=-1)
+                ids = slot if ward_ids is None else np.take_along_axis(ward_ids[team], slot, axis=1)
+                spotter_ward[:, enemies] = np.where(seen_by_ward, ids, -1)
+                bits |= seen_by_ward.astype(np.uint64) << np.uint64(SOURCE_WARD_BIT)
+            else:
+                seen_by_ward = in_range(enemy_positions, wards, WARD_VISION_RADIUS)
+            seen |= seen_by_ward
+
+        minions = (minion_positions or {}).get(team)
+        if minions is not None and minions.shape[1]:
+            seen_by_minion = in_range(enemy_positions, minions, MINION_VISION_RADIUS)
+            seen |= seen_by_minion
+            if return_sources:
+                bits |= seen_by_minion.astype(np.uint64) << np.uint64(SOURCE_MINION_BIT)
+
+        visible[:, enemies] = seen
+        if return_sources:
+            sources[:, enemies] = bits
+
+    if return_sources:
+        return visible, sources, spotter_ward
+    return visible
@@ -0,0 +1,329 @@
+"""
+Ligne de vue avec murs (Summoner's Rift)
+
+Les murs sont extraits de la minimap du webapp (pixels sombres = terrain
+infranchissable), échantillonnés sur une grille de cellules de 100 unités.
+Les icônes de la minimap (tourelles, plaques, inhibiteurs, nexus) sont
+sombres aussi: les zones des structures, des bases et les couloirs des
+lanes sont dégagés d'office (open_area_mask).
+
+Pour chaque cellule source et chaque décalage (dx, dy) à portée de vision,
+la visibilité est précalculée une fois (marche de rayon à travers les
+cellules intermédiaires) et stockée en bits: une requête source → cible
+est ensuite une lecture de table, sans marche de rayon à l'exécution.
+La table est mise en cache sur disque (.npz compressé).
+"""
+
+import os
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from lol_fog_predictor.fog.minions import LANE_PATHS
+from lol_fog_predictor.fog.spatial_index import MAP_SIZE
+
+LOS_CELL_SIZE = 100
+LOS_RADIUS = 1350  # Rayon max des sources (champions, tourelles)
+
+# À incrémenter si l'extraction des murs ou le calcul de la table change
+LOS_VERSION = 2
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+MINIMAP_PATH = PROJECT_ROOT / 'webapp' / 'static' / 'img' / 'minimap.png'
+LOS_CACHE_DIR = PROJECT_ROOT / 'data' / 'processed'
+
+# Zone utile de la minimap en fraction de l'image: (gauche, haut, droite, bas)
+# (0, MAP_SIZE) en haut à gauche, (MAP_SIZE, 0) en bas à droite
+MINIMAP_BOUNDS = (0.051, 0.046, 0.961, 0.963)
+
+# Un pixel est un mur si sa composante RGB max est sous ce seuil
+WALL_MAX_BRIGHTNESS = 0.3
+
+# Points échantillonnés par côté de cellule pour décider "mur" (majorité)
+WALL_SAMPLES = 4
+
+# Structures et bases (icônes sombres sur la minimap), en plus des tourelles.
+# FOUNTAIN_POSITIONS est aussi la référence de ml/features.py et api/synthetic.py
+FOUNTAIN_POSITIONS = {100: (394, 461), 200: (14340, 14391)}
+NEXUS_POSITIONS = {100: (1551, 1659), 200: (13142, 12964)}
+INHIBITOR_POSITIONS = {
+    100: ((1171, 3571), (3203, 3208), (3452, 1236)),
+    200: ((11261, 13676), (11598, 11667), (13604, 11316)),
+}
+
+# Zones dégagées: disque autour de chaque structure, couloir le long des
+# lanes (LANE_PATHS) et des chemins de base fontaine → nexus → inhibiteurs
+STRUCTURE_CLEAR_RADIUS = 450
+LANE_HALF_WIDTH = 400
+
+
+def open_paths() -> List[np.ndarray]:
+    """Chemins jamais bloqués: lanes, puis fontaine → nexus → chaque inhibiteur de chaque base"""
+    paths = list(LANE_PATHS.values())
+    for team in (100, 200):
+        for inhibitor in INHIBITOR_POSITIONS[team]:
+            paths.append(np.array([FOUNTAIN_POSITIONS[team], NEXUS_POSITIONS[team], inhibitor], dtype=np.float64))
+    return paths
+
+
+def open_points() -> np.ndarray:
+    """(N, 2) structures jamais bloquées: tourelles, inhibiteurs, nexus, fontaines"""
+    from lol_fog_predictor.fog.structures import TURRET_POSITIONS  # structures → engine → ce module
+
+    points = [TURRET_POSITIONS[team] for team in (100, 200)]
+    for team in (100, 200):
+        points.append(np.array([*INHIBITOR_POSITIONS[team], NEXUS_POSITIONS[team], FOUNTAIN_POSITIONS[team]]))
+    return np.concatenate(points).astype(np.float64)
+
+
+def segment_distance(points: np.ndarray, path: np.ndarray) -> np.ndarray:
+    """(N,) distance de chaque point au chemin (V, 2), segment par segment"""
+    start, end = path[:-1], path[1:]
+    direction = end - start
+    length2 = np.maximum((direction ** 2).sum(axis=1), 1e-9)
+    t = ((points[:, None, :] - start[None]) * direction[None]).sum(axis=-1) / length2
+    nearest = start[None] + np.clip(t, 0, 1)[..., None] * direction[None]
+    return np.linalg.norm(points[:, None, :] - nearest, axis=-1).min(axis=1)
+
+
+def open_area_mask(size: int, cell_size: int) -> np.ndarray:
+    """(size, size) bool, True pour les cellules dégagées (centre dans une zone ouverte)"""
+    centers = (np.arange(size) + 0.5) * cell_size
+    grid = np.stack(np.meshgrid(centers, centers), axis=-1).reshape(-1, 2)  # (x, y), ligne = y
+
+    structures = open_points()
+    near = np.zeros(len(grid), dtype=bool)
+    for x, y in structures:
+        near |= (grid[:, 0] - x) ** 2 + (grid[:, 1] - y) ** 2 <= STRUCTURE_CLEAR_RADIUS ** 2
+    for path in open_paths():
+        near |= segment_distance(grid, path) <= LANE_HALF_WIDTH
+    return near.reshape(size, size)
+
+
+def load_wall_bitmap(
+    minimap_path: Path = MINIMAP_PATH,
+    cell_size: int = LOS_CELL_SIZE,
+) -> np.ndarray:
+    """
+    Extraire les murs de la minimap
+
+    Pixels sombres à la majorité des sous-échantillons de la cellule, puis
+    zones des structures et couloirs des lanes dégagés (open_area_mask):
+    les icônes de tourelles et d'inhibiteurs ne sont pas du terrain.
+
+    Returns:
+        (H, W) bool, walls[cy, cx] True si la cellule est un mur
+        (cy croît avec y en coordonnées de jeu)
+    """
+    from matplotlib.image import imread
+
+    image = imread(str(minimap_path))
+    height, width = image.shape[:2]
+    dark = image[..., :3].max(axis=-1) < WALL_MAX_BRIGHTNESS
+
+    size = int(np.ceil(MAP_SIZE / cell_size))
+    # Points d'échantillonnage de chaque cellule, en coordonnées de jeu
+    sub = (np.arange(size * WALL_SAMPLES) + 0.5) * cell_size / WALL_SAMPLES
+    left, top, right, bottom = MINIMAP_BOUNDS
+    px = ((left + sub / MAP_SIZE * (right - left)) * width).astype(np.int64)
+    py = ((bottom - sub / MAP_SIZE * (bottom - top)) * height).astype(np.int64)
+    px = np.clip(px, 0, width - 1)
+    py = np.clip(py, 0, height - 1)
+
+    samples = dark[py[:, None], px[None, :]]  # (y, x) en sous-échantillons
+    votes = samples.reshape(size, WALL_SAMPLES, size, WALL_SAMPLES).mean(axis=(1, 3))
+    return (votes > 0.5) & ~open_area_mask(size, cell_size)
+
+
+def offset_kernel(radius: float, cell_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Décalages (dy, dx) de cellule pouvant séparer deux points à ≤ radius
+
+    Marge d'une diagonale de cellule: deux points à distance ≤ radius
+    peuvent être dans des cellules dont les centres sont un peu plus loin.
+    """
+    reach = int(np.ceil(radius / cell_size)) + 1
+    dy, dx = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+    limit = radius + cell_size * np.sqrt(2)
+    inside = (dx * cell_size) ** 2 + (dy * cell_size) ** 2 <= limit ** 2
+    return dy[inside].astype(np.int64), dx[inside].astype(np.int64)
+
+
+def build_visibility_table(walls: np.ndarray, dy: np.ndarray, dx: np.ndarray) -> np.ndarray:
+    """
+    Table de visibilité cellule → décalage, par marche de rayon
+
+    Un décalage est visible si aucune cellule intermédiaire du segment
+    (centres arrondis, extrémités exclues) n'est un mur: une unité collée
+    à un mur reste visible et peut voir.
+
+    Returns:
+        (H * W, ceil(K / 8)) uint8, bit k de la ligne source = décalage k visible
+    """
+    height, width = walls.shape
+    # Une cellule de mur tout autour: un rayon qui sort de la map est bloqué
+    padded = np.pad(walls, 1, constant_values=True).reshape(-1)
+    cy, cx = np.divmod(np.arange(height * width), width)
+    cy, cx = cy + 1, cx + 1
+
+    table = np.ones((height * width, len(dy)), dtype=bool)
+    for k, (off_y, off_x) in enumerate(zip(dy, dx)):
+        steps = int(max(abs(off_y), abs(off_x)))
+        if steps <= 1:
+            continue
+        t = np.arange(1, steps) / steps
+        ray_y = np.floor(cy[:, None] + t * off_y + 0.5).astype(np.int64)
+        ray_x = np.floor(cx[:, None] + t * off_x + 0.5).astype(np.int64)
+        ray_y = np.clip(ray_y, 0, height + 1)
+        ray_x = np.clip(ray_x, 0, width + 1)
+        table[:, k] = ~padded[ray_y * (width + 2) + ray_x].any(axis=1)
+
+    return np.packbits(table, axis=1)
+
+
+class LineOfSight:
+    """
+    Table de visibilité précalculée
+
+    Args:
+        walls: (H, W) bool, murs par cellule
+        cell_size: Taille d'une cellule (unités)
+        radius: Rayon max couvert par la table
+        table: Table déjà calculée (build_visibility_table), sinon calculée
+    """
+
+    def __init__(
+        self,
+        walls: np.ndarray,
+        cell_size: int = LOS_CELL_SIZE,
+        radius: float = LOS_RADIUS,
+        table: Optional[np.ndarray] = None,
+    ):
+        self.walls = np.asarray(walls, dtype=bool)
+        self.cell_size = cell_size
+        self.radius = radius
+        self.dy, self.dx = offset_kernel(radius, cell_size)
+        self.table = build_visibility_table(self.walls, self.dy, self.dx) if table is None else table
+
+        # Décalage (dy, dx) → index k dans la table, -1 hors noyau
+        self.reach = int(max(np.abs(self.dy).max(), np.abs(self.dx).max()))
+        side = 2 * self.reach + 1
+        self.offset_index = np.full((side, side), -1, dtype=np.int64)
+        self.offset_index[self.dy + self.reach, self.dx + self.reach] = np.arange(len(self.dy))
+
+    def _cells(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        height, width = self.walls.shape
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        return np.clip(cells[:, 1], 0, height - 1), np.clip(cells[:, 0], 0, width - 1)
+
+    def visible(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Ligne de vue entre paires (source_i, cible_i), par lecture de table
+
+        Ne teste pas la distance: les paires au-delà du rayon de la table
+        sont False.
+
+        Args:
+            sources: (N, 2) positions des sources
+            targets: (N, 2) positions des cibles
+
+        Returns:
+            (N,) bool
+        """
+        sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        src_y, src_x = self._cells(sources)
+        dst_y, dst_x = self._cells(targets)
+
+        off_y, off_x = dst_y - src_y, dst_x - src_x
+        in_kernel = (np.abs(off_y) <= self.reach) & (np.abs(off_x) <= self.reach)
+        k = self.offset_index[
+            np.where(in_kernel, off_y + self.reach, 0),
+            np.where(in_kernel, off_x + self.reach, 0),
+        ]
+        in_kernel &= k >= 0
+        k = np.maximum(k, 0)
+
+        row = src_y * self.walls.shape[1] + src_x
+        bit = (self.table[row, k >> 3] >> (7 - (k & 7))) & 1
+        return in_kernel & (bit == 1)
+
+    def visible_offsets(self, sources: np.ndarray, dy: np.ndarray, dx: np.ndarray) -> np.ndarray:
+        """
+        Ligne de vue de chaque source vers les cellules à (dy, dx) de la sienne
+
+        Pour un noyau de décalages fixe (disques de fog/raster.py, même
+        taille de cellule): index k calculés une fois pour le noyau, puis
+        une lecture de bit par paire.
+
+        Args:
+            sources: (N, 2) positions des sources
+            dy, dx: (K,) décalages de cellule
+
+        Returns:
+            (N, K) bool, False hors du rayon de la table
+        """
+        sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+        src_y, src_x = self._cells(sources)
+
+        in_kernel = (np.abs(dy) <= self.reach) & (np.abs(dx) <= self.reach)
+        k = self.offset_index[
+            np.where(in_kernel, dy + self.reach, 0),
+            np.where(in_kernel, dx + self.reach, 0),
+        ]
+        in_kernel &= k >= 0
+        k = np.maximum(k, 0)
+
+        row = src_y * self.walls.shape[1] + src_x
+        bit = (self.table[row[:, None], k[None, :] >> 3] >> (7 - (k & 7))) & 1
+        return in_kernel & (bit == 1)
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path,
+            walls=self.walls,
+            table=self.table,
+            meta=np.array([LOS_VERSION, self.cell_size, self.radius], dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> 'LineOfSight':
+        with np.load(path) as data:
+            version, cell_size, radius = (int(v) for v in data['meta'])
+            if version != LOS_VERSION:
+                raise ValueError(f"Table version {version}, attendu {LOS_VERSION}")
+            return cls(data['walls'], cell_size, radius, table=data['table'])
+
+
+@lru_cache(maxsize=None)
+def get_line_of_sight(
+    cell_size: int = LOS_CELL_SIZE,
+    radius: int = LOS_RADIUS,
+    cache_dir: Path = LOS_CACHE_DIR,
+    minimap_path: Path = MINIMAP_PATH,
+) -> LineOfSight:
+    """
+    Table de ligne de vue, depuis le cache disque si à jour
+
+    Reconstruite si la minimap est plus récente que le cache ou si
+    LOS_VERSION a changé. Mémorisée par processus.
+    """
+    path = Path(cache_dir) / f'line_of_sight_c{cell_size}_r{radius}.npz'
+    if path.exists() and path.stat().st_mtime_ns >= Path(minimap_path).stat().st_mtime_ns:
+        try:
+            return LineOfSight.load(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            pass  # Cache ancien ou corrompu (écriture interrompue): reconstruire
+
+    walls = load_wall_bitmap(minimap_path, cell_size)
+    line_of_sight = LineOfSight(walls, cell_size, radius)
+
+    # Écriture atomique: plusieurs workers peuvent construire la table
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp.npz')
+    line_of_sight.save(tmp_path)
+    tmp_path.replace(path)
+    return line_of_sight
@@ -0,0 +1,98 @@
+"""
+Vagues de sbires synthétiques (vision 1200 unités)
+
+Les timelines ne contiennent pas les sbires: leurs positions sont
+reconstruites en forme close à partir du calendrier des vagues.
+    - Première vague à 1:05, puis une toutes les 30s, sur les 3 lanes
+    - Déplacement le long du chemin de la lane à vitesse constante
+    - Les vagues adverses se rencontrent au milieu de la lane, y combattent
+      FIGHT_DURATION_MS puis disparaissent
+
+Approximation: pas de poussée de lane, de sbires canon/super ni d'arrêt aux
+tourelles. Pour chaque instant, les vagues vivantes sont calculées
+directement (pas de simulation pas à pas), vectorisé sur tous les instants.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+FIRST_WAVE_MS = 65000
+WAVE_INTERVAL_MS = 30000
+MINION_SPEED = 325  # unités/s
+MINIONS_PER_WAVE = 6
+MINION_SPACING = 100  # Écart entre deux sbires d'une vague, le long de la lane
+FIGHT_DURATION_MS = 20000
+
+# Chemins des lanes, de la base bleue vers la base rouge (tourelles d'inhibiteur)
+LANE_PATHS = {
+    'TOP': np.array([(1169, 4287), (981, 10441), (1600, 13300), (4318, 13875), (10481, 13650)], dtype=np.float64),
+    'MID': np.array([(3651, 3696), (11134, 11207)], dtype=np.float64),
+    'BOT': np.array([(4281, 1253), (10504, 1029), (13300, 1600), (13866, 4505), (13624, 10572)], dtype=np.float64),
+}
+
+
+def lane_point(path: np.ndarray, distance: np.ndarray) -> np.ndarray:
+    """
+    Point du chemin à une distance donnée depuis son début
+
+    Args:
+        path: (V, 2) sommets du chemin
+        distance: (...) distance curviligne (bornée au chemin)
+
+    Returns:
+        (..., 2)
+    """
+    cumulative = np.r_[0.0, np.cumsum(np.linalg.norm(np.diff(path, axis=0), axis=1))]
+    x = np.interp(distance, cumulative, path[:, 0])
+    y = np.interp(distance, cumulative, path[:, 1])
+    return np.stack([x, y], axis=-1)
+
+
+def lane_length(path: np.ndarray) -> float:
+    return float(np.linalg.norm(np.diff(path, axis=0), axis=1).sum())
+
+
+def minion_positions(team: int, timestamps: np.ndarray) -> np.ndarray:
+    """
+    Positions des sbires de `team` à chaque instant (forme close)
+
+    Args:
+        team: 100 (départ base bleue) ou 200 (départ base rouge)
+        timestamps: (T,) ms
+
+    Returns:
+        (T, S, 2) NaN-padded, S = lanes × vagues simultanées × MINIONS_PER_WAVE
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    per_lane = []
+
+    for path in LANE_PATHS.values():
+        length = lane_length(path)
+        meet = length / 2
+        lifetime = meet / MINION_SPEED * 1000 + FIGHT_DURATION_MS
+        slots = int(np.ceil(lifetime / WAVE_INTERVAL_MS)) + 1
+
+        # Vagues candidates: la dernière apparue et les `slots - 1` précédentes
+        latest = np.floor((timestamps - FIRST_WAVE_MS) / WAVE_INTERVAL_MS).astype(np.int64)
+        wave = latest[:, None] - np.arange(slots)[None, :]                    # (T, W)
+        age = timestamps[:, None] - (FIRST_WAVE_MS + wave * WAVE_INTERVAL_MS)
+        alive = (wave >= 0) & (age >= 0) & (age < lifetime)
+
+        # Distance parcourue par chaque sbire (le premier en tête), arrêt au point de rencontre
+        front = np.minimum(age * MINION_SPEED / 1000, meet)
+        distance = front[..., None] - np.arange(MINIONS_PER_WAVE) * MINION_SPACING  # (T, W, M)
+        distance = np.clip(distance, 0, meet)
+        if team != 100:
+            distance = length - distance
+
+        points = lane_point(path, distance)
+        points[~alive] = np.nan
+        per_lane.append(points.reshape(len(timestamps), -1, 2))
+
+    return np.concatenate(per_lane, axis=1)
+
+
+def minion_sources(timestamps: np.ndarray) -> Dict[int, np.ndarray]:
+    """{team: (T, S, 2)} sources de vision des sbires, pour le moteur"""
+    return {team: minion_positions(team, timestamps) for team in (100, 200)}
@@ -0,0 +1,357 @@
+"""
+Masques de vision rasterisés par équipe et par timestamp
+
+La map 14820×14820 est découpée en cellules (100 unités par défaut, soit
+149×149). Pour chaque timestamp et chaque équipe, on tamponne un disque
+précalculé par source de vision:
+    - champions: 1350, tourelles: 1350, wards: 900, sbires: 1200
+
+Avec les mêmes options que visible_to_enemy, chaque cellule du disque est
+filtrée comme une cible placée en son centre: ligne de vue depuis la source
+(fog/line_of_sight.py) et règle des buissons (fog/brushes.py).
+
+Les masques sont stockés bit-packés (np.packbits sur l'axe x) et compressés
+par match. Une requête "ce point est-il vu par l'équipe T ?" est ensuite une
+lecture de bit en O(1), sans recalculer de distances.
+
+Couverture par région (part de la surface en vision): tables de sommes
+cumulées (summed-area tables) des masques, puis 4 lectures par rectangle,
+O(1) par région et par timestamp quel que soit sa taille.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from lol_fog_predictor.fog.brushes import BrushIndex
+from lol_fog_predictor.fog.engine import TEAMS
+from lol_fog_predictor.fog.line_of_sight import LineOfSight
+from lol_fog_predictor.fog.spatial_index import MAP_SIZE
+
+RASTER_CELL_SIZE = 100
+
+# À incrémenter si le format ou le calcul des masques change
+RASTER_VERSION = 3
+
+# Nombre max de cellules tamponnées à la fois (borne la mémoire)
+STAMP_CHUNK = 1 << 22
+
+# Timestamps par lot pour les tables de sommes cumulées (T × H × W/8 int32)
+COVERAGE_CHUNK = 512
+
+# Nombre de bits à 1 de chaque octet
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+# Régions de couverture (x0, y0, x1, y1) en unités de map, base bleue en bas
+# à gauche. Quadrants: découpage aux axes du milieu. Jungles: rectangles
+# approximatifs autour des camps (bleue côté top: gromp/blue/wolves, côté
+# bot: raptors/red/krugs), miroir par le centre pour l'équipe rouge.
+COVERAGE_REGIONS = {
+    'map': (0, 0, MAP_SIZE, MAP_SIZE),
+    'quadrant_nw': (0, MAP_SIZE // 2, MAP_SIZE // 2, MAP_SIZE),
+    'quadrant_ne': (MAP_SIZE // 2, MAP_SIZE // 2, MAP_SIZE, MAP_SIZE),
+    'quadrant_sw': (0, 0, MAP_SIZE // 2, MAP_SIZE // 2),
+    'quadrant_se': (MAP_SIZE // 2, 0, MAP_SIZE, MAP_SIZE // 2),
+    'jungle_blue_top': (1600, 5400, 5400, 9600),
+    'jungle_blue_bot': (5200, 1600, 9600, 5600),
+    'jungle_red_top': (MAP_SIZE - 9600, MAP_SIZE - 5600, MAP_SIZE - 5200, MAP_SIZE - 1600),
+    'jungle_red_bot': (MAP_SIZE - 5400, MAP_SIZE - 9600, MAP_SIZE - 1600, MAP_SIZE - 5400),
+}
+
+
+def raster_size(cell_size: int) -> int:
+    """Nombre de cellules par côté"""
+    return int(np.ceil(MAP_SIZE / cell_size))
+
+
+@lru_cache(maxsize=None)
+def disc_kernel(radius: float, cell_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Décalages (dy, dx) des cellules couvertes par un disque de vision
+
+    Une cellule est couverte si son centre est à ≤ radius du centre de la
+    cellule de la source.
+    """
+    reach = int(np.ceil(radius / cell_size))
+    dy, dx = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+    inside = (dx * cell_size) ** 2 + (dy * cell_size) ** 2 <= radius ** 2
+    return dy[inside].astype(np.int64), dx[inside].astype(np.int64)
+
+
+def cell_centers(height: int, width: int, cell_size: int) -> np.ndarray:
+    """(H, W, 2) positions (x, y) des centres de cellules"""
+    grid_x, grid_y = np.meshgrid((np.arange(width) + 0.5) * cell_size, (np.arange(height) + 0.5) * cell_size)
+    return np.stack([grid_x, grid_y], axis=-1)
+
+
+def stamp_discs(
+    masks: np.ndarray,
+    sample_idx: np.ndarray,
+    points: np.ndarray,
+    radius: float,
+    cell_size: int,
+    line_of_sight: Optional[LineOfSight] = None,
+    brushes: Optional[BrushIndex] = None,
+):
+    """
+    Tamponner un disque par point dans masks (T, H, W), en place
+
+    Args:
+        masks: (T, H, W) bool
+        sample_idx: (N,) index du timestamp de chaque point
+        points: (N, 2) positions (lignes NaN ignorées)
+        radius: Rayon de vision
+        cell_size: Taille d'une cellule
+        line_of_sight: Si donnée, seules les cellules dont le centre est en
+            ligne de vue du point sont tamponnées (même cell_size)
+        brushes: Si donné, règle des buissons entre le point et le centre
+            de chaque cellule
+    """
+    keep = ~np.isnan(points).any(axis=1)
+    sample_idx, points = sample_idx[keep], points[keep]
+    if not len(points):
+        return
+
+    n_samples, height, width = masks.shape
+    dy, dx = disc_kernel(float(radius), cell_size)
+    cells = np.floor(points / cell_size).astype(np.int64)
+    flat = masks.reshape(-1)
+
+    if line_of_sight is not None and line_of_sight.cell_size != cell_size:
+        raise ValueError(f"Ligne de vue en cellules de {line_of_sight.cell_size}, masques en {cell_size}")
+    if brushes is not None:
+        # Buisson du centre de chaque cellule, et de chaque source
+        cell_brush = brushes.brush_at(cell_centers(height, width, cell_size))
+        source_brush = brushes.brush_at(points)
+
+    per_chunk = max(1, STAMP_CHUNK // len(dy))
+    for start in range(0, len(points), per_chunk):
+        cx = cells[start:start + per_chunk, 0, None] + dx[None, :]
+        cy = cells[start:start + per_chunk, 1, None] + dy[None, :]
+        t = np.broadcast_to(sample_idx[start:start + per_chunk, None], cx.shape)
+        inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+        if line_of_sight is not None:
+            inside &= line_of_sight.visible_offsets(points[start:start + per_chunk], dy, dx)
+        if brushes is not None:
+            target_brush = cell_brush[np.clip(cy, 0, height - 1), np.clip(cx, 0, width - 1)]
+            inside &= (target_brush == 0) | (target_brush == source_brush[start:start + per_chunk, None])
+        flat[(t[inside] * height + cy[inside]) * width + cx[inside]] = True
+
+
+def summed_area(
+    packed: np.ndarray,
+    width: int,
+    rows: Optional[np.ndarray] = None,
+    cols: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Tables de sommes cumulées de masques bit-packés (T, H, ceil(W/8))
+
+    Directement sur les octets, sans dépaqueter: popcount par octet, octets
+    entiers avant chaque borne de colonne sommés par un produit avec une
+    matrice indicatrice de préfixe (BLAS), plus l'octet partiel de la borne;
+    enfin cumul le long des lignes. Restreintes aux bornes `rows` × `cols`
+    si données (les seules lues par region_sums).
+
+    Returns:
+        (T, len(rows), len(cols)) int32 (par défaut (T, H + 1, W + 1)),
+        sat[t, i, j] = cellules vues dans [0, rows[i]) × [0, cols[j])
+    """
+    n_samples, height, n_bytes = packed.shape
+    rows = np.arange(height + 1) if rows is None else np.asarray(rows, dtype=np.int64)
+    cols = np.arange(width + 1) if cols is None else np.asarray(cols, dtype=np.int64)
+
+    # Cellules vues dans les octets entiers [0, cols // 8) de chaque ligne
+    # (sommes entières exactes en float32: au plus W par ligne)
+    full, rest = cols // 8, cols % 8
+    prefix = (np.arange(n_bytes)[:, None] < full[None, :]).astype(np.float32)
+    whole = POPCOUNT[packed].reshape(-1, n_bytes).astype(np.float32) @ prefix
+
+    # + bits de tête de l'octet partiel (packbits: première cellule = bit de poids fort)
+    head = ((0xFF << (8 - rest)) & 0xFF).astype(np.uint8)
+    partial = POPCOUNT[packed[:, :, np.minimum(full, n_bytes - 1)] & head]
+    by_cols = whole.reshape(n_samples, height, -1).astype(np.int32) + partial
+
+    sat = np.zeros((n_samples, height + 1, len(cols)), dtype=np.int32)
+    np.cumsum(by_cols, axis=1, out=sat[:, 1:])
+    return sat[:, rows]
+
+
+def region_boxes(regions: Dict[str, Tuple[int, int, int, int]], cell_size: int, size: int) -> np.ndarray:
+    """
+    Rectangles en unités de map → cellules (R, 4) (y0, y1, x0, x1), bornes exclusives
+
+    Une cellule appartient à la région si son centre y est.
+    """
+    bounds = np.array(list(regions.values()), dtype=np.float64).reshape(-1, 4)
+    cells = np.clip(np.ceil(bounds / cell_size - 0.5), 0, size).astype(np.int64)
+    x0, y0, x1, y1 = cells.T
+    return np.stack([y0, y1, x0, x1], axis=1)
+
+
+def region_sums(sat: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    (T, R) cellules vues dans chaque rectangle: 4 lectures par (t, région)
+
+    boxes: (R, 4) (y0, y1, x0, x1) en index de lignes/colonnes de sat
+    """
+    y0, y1, x0, x1 = boxes.T
+    return sat[:, y1, x1] - sat[:, y0, x1] - sat[:, y1, x0] + sat[:, y0, x0]
+
+
+@dataclass
+class VisionMasks:
+    """Masques de vision bit-packés d'un match: (T, équipes, H, ceil(W/8))"""
+    timestamps: np.ndarray  # (T,) ms
+    packed: np.ndarray      # (T, 2, H, ceil(W/8)) uint8, ordre des équipes = TEAMS
+    cell_size: int
+    size: int               # H = W
+
+    def team_index(self, team: int) -> int:
+        return TEAMS.index(team)
+
+    def sample_index(self, timestamps: np.ndarray) -> np.ndarray:
+        """Index du dernier masque ≤ t pour chaque t"""
+        idx = np.searchsorted(self.timestamps, timestamps, side='right') - 1
+        return np.clip(idx, 0, len(self.timestamps) - 1)
+
+    def mask(self, team: int, sample: int) -> np.ndarray:
+        """(H, W) bool de l'équipe à l'index de timestamp `sample`"""
+        bits = np.unpackbits(self.packed[sample, self.team_index(team)], axis=-1)
+        return bits[:, :self.size].astype(bool)
+
+    def lookup(self, team: int, timestamps: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Le point (x, y) est-il dans la vision de `team` à t ? (batch)
+
+        Une lecture de bit par point; les points hors map sont False.
+        """
+        samples = self.sample_index(np.asarray(timestamps))
+        cx = np.floor(np.asarray(x, dtype=np.float64) / self.cell_size)
+        cy = np.floor(np.asarray(y, dtype=np.float64) / self.cell_size)
+        inside = (cx >= 0) & (cx < self.size) & (cy >= 0) & (cy < self.size)
+        cx = np.where(inside, cx, 0).astype(np.int64)
+        cy = np.where(inside, cy, 0).astype(np.int64)
+
+        byte = self.packed[samples, self.team_index(team), cy, cx >> 3]
+        bit = (byte >> (7 - (cx & 7))) & 1
+        return inside & (bit == 1)
+
+    def pool(self, team: int, grid_size: int = 50) -> np.ndarray:
+        """
+        Fraction de chaque zone d'une grille grid_size×grid_size en vision
+
+        Cible "présence par zone" (ML_ROADMAP Option A) sans recalculer
+        de distances.
+
+        Returns:
+            (T, grid_size, grid_size) float32 dans [0, 1]
+        """
+        bits = np.unpackbits(self.packed[:, self.team_index(team)], axis=-1)[..., :self.size]
+        edges = np.linspace(0, self.size, grid_size + 1).astype(np.int64)
+        # Somme par bandes de lignes puis de colonnes (reduceat), puis normalisation
+        rows = np.add.reduceat(bits.astype(np.int32), edges[:-1], axis=1)
+        zones = np.add.reduceat(rows, edges[:-1], axis=2)
+        area = np.diff(edges)[:, None] * np.diff(edges)[None, :]
+        return (zones / area).astype(np.float32)
+
+    def coverage(
+        self,
+        team: int,
+        regions: Dict[str, Tuple[int, int, int, int]] = COVERAGE_REGIONS,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Part de chaque région dans la vision de `team`, à chaque timestamp
+
+        Tables de sommes cumulées sur les masques bit-packés, par lots de
+        COVERAGE_CHUNK timestamps (mémoire bornée), puis O(1) par région.
+
+        Returns:
+            {région: (T,) float32 dans [0, 1]}
+        """
+        boxes = region_boxes(regions, self.cell_size, self.size)
+        area = np.maximum((boxes[:, 1] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 2]), 1)
+        shares = np.zeros((len(self.timestamps), len(boxes)), dtype=np.float32)
+
+        # Table restreinte aux bornes des régions, rectangles en index de ces bornes
+        rows, cols = np.unique(boxes[:, :2]), np.unique(boxes[:, 2:])
+        lattice = np.stack([
+            np.searchsorted(rows, boxes[:, 0]), np.searchsorted(rows, boxes[:, 1]),
+            np.searchsorted(cols, boxes[:, 2]), np.searchsorted(cols, boxes[:, 3]),
+        ], axis=1)
+
+        packed = self.packed[:, self.team_index(team)]
+        for start in range(0, len(packed), COVERAGE_CHUNK):
+            sat = summed_area(packed[start:start + COVERAGE_CHUNK], self.size, rows, cols)
+            shares[start:start + COVERAGE_CHUNK] = region_sums(sat, lattice) / area
+
+        return {name: shares[:, i] for i, name in enumerate(regions)}
+
+    def save(self, path: Path):
+        """Écrire les masques compressés (.npz)"""
+        np.savez_compressed(
+            path,
+            timestamps=self.timestamps,
+            packed=self.packed,
+            meta=np.array([RASTER_VERSION, self.cell_size, self.size], dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> 'VisionMasks':
+        with np.load(path) as data:
+            version, cell_size, size = (int(v) for v in data['meta'])
+            if version != RASTER_VERSION:
+                raise ValueError(f"Masques version {version}, attendu {RASTER_VERSION}")
+            return cls(data['timestamps'], data['packed'], cell_size, size)
+
+
+def rasterize_vision(
+    timestamps: np.ndarray,
+    sources: Dict[int, List[Tuple[np.ndarray, float]]],
+    cell_size: int = RASTER_CELL_SIZE,
+    line_of_sight: Optional[LineOfSight] = None,
+    brushes: Optional[BrushIndex] = None,
+) -> VisionMasks:
+    """
+    Construire les masques de vision de chaque équipe
+
+    Args:
+        timestamps: (T,) instants des masques
+        sources: {team: [(positions, radius), ...]}, positions de forme
+            (T, S, 2) par timestamp ou (S, 2) si fixes
+        cell_size: Taille d'une cellule (unités)
+        line_of_sight: Murs bloquant la vision (voir stamp_discs)
+        brushes: Règle des buissons (voir stamp_discs)
+
+    Returns:
+        VisionMasks bit-packés
+    """
+    n_samples = len(timestamps)
+    size = raster_size(cell_size)
+    packed = np.zeros((n_samples, len(TEAMS), size, (size + 7) // 8), dtype=np.uint8)
+
+    for team_idx, team in enumerate(TEAMS):
+        masks = np.zeros((n_samples, size, size), dtype=bool)
+        static = np.zeros((1, size, size), dtype=bool)
+        for positions, radius in sources.get(team, []):
+            positions = np.asarray(positions, dtype=np.float64)
+            if positions.ndim == 2:
+                # Sources fixes: un seul tampon, appliqué à tous les timestamps
+                stamp_discs(
+                    static, np.zeros(len(positions), dtype=np.int64), positions, radius, cell_size,
+                    line_of_sight, brushes,
+                )
+                continue
+            n_sources = positions.shape[1]
+            sample_idx = np.repeat(np.arange(n_samples), n_sources)
+            stamp_discs(
+                masks, sample_idx, positions.reshape(-1, 2), radius, cell_size,
+                line_of_sight, brushes,
+            )
+        masks |= static
+        packed[:, team_idx] = np.packbits(masks, axis=-1)
+
+    return VisionMasks(np.asarray(timestamps, dtype=np.int64), packed, cell_size, size)
@@ -0,0 +1,152 @@
+"""
+Index spatial des sources de vision (grille uniforme)
+
+Les sources sont rangées dans des cellules de côté = rayon max (1350 pour
+champions et tourelles): une cible
+ne peut être vue que par une source de sa cellule ou des 8 voisines.
+Les requêtes sont faites en batch ("une source à portée de chaque cible ?"),
+éventuellement par groupe (ex: index de frame) pour indexer tout un match
+dans une seule grille.
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+
+MAP_SIZE = 14820  # Taille de la map (0-14820 sur x et y)
+
+# Nombre max de paires (cible, source candidate) évaluées à la fois
+PAIR_CHUNK = 1 << 22
+
+
+class VisionGrid:
+    """
+    Grille uniforme de sources de vision
+
+    Args:
+        sources: (S, 2) positions des sources (lignes NaN ignorées)
+        radius: Rayon commun ou (S,) rayon par source
+        groups: (S,) groupe de chaque source (ex: frame), 0 par défaut
+        cell_size: Côté d'une cellule (défaut et minimum: rayon max)
+    """
+
+    def __init__(
+        self,
+        sources: np.ndarray,
+        radius: Union[float, np.ndarray],
+        groups: Optional[np.ndarray] = None,
+        cell_size: Optional[float] = None,
+    ):
+        sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+        radii = np.broadcast_to(np.asarray(radius, dtype=np.float64), (len(sources),))
+        groups = np.zeros(len(sources), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+
+        self.cell_size = float(max(cell_size or 0.0, radii.max(initial=1.0)))
+        # Une cellule de marge de chaque côté pour les positions hors map
+        self.n_cells = int(np.ceil(MAP_SIZE / self.cell_size)) + 2
+
+        keep = ~np.isnan(sources).any(axis=1)
+        sources, radii, groups = sources[keep], radii[keep], groups[keep]
+
+        keys = self._keys(sources, groups)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.sources = sources[order]
+        self.radii_sq = radii[order] ** 2
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """(N, 2) → (N, 2) coordonnées de cellule, bornées à la grille"""
+        cells = np.floor(points / self.cell_size).astype(np.int64) + 1
+        return np.clip(cells, 0, self.n_cells - 1)
+
+    def _keys(self, points: np.ndarray, groups: np.ndarray) -> np.ndarray:
+        cells = self._cells(points)
+        return (groups * self.n_cells + cells[:, 1]) * self.n_cells + cells[:, 0]
+
+    def any_within(self, targets: np.ndarray, groups: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Pour chaque cible, existe-t-il une source (du même groupe) à portée ?
+
+        Args:
+            targets: (N, 2) positions (NaN → False)
+            groups: (N,) groupe de chaque cible, 0 par défaut
+
+        Returns:
+            (N,) bool
+        """
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        groups = np.zeros(len(targets), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        result = np.zeros(len(targets), dtype=bool)
+
+        valid = np.flatnonzero(~np.isnan(targets).any(axis=1))
+        if not len(valid) or not len(self.keys):
+            return result
+
+        cells = self._cells(targets[valid])
+        base = groups[valid] * self.n_cells
+
+        # Plage [start, end) des sources de chacune des 9 cellules voisines
+        neighbours = np.stack([
+            (base + np.clip(cells[:, 1] + dy, 0, self.n_cells - 1)) * self.n_cells
+            + np.clip(cells[:, 0] + dx, 0, self.n_cells - 1)
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+        ], axis=1)  # (V, 9)
+        starts = np.searchsorted(self.keys, neighbours, side='left')
+        counts = np.searchsorted(self.keys, neighbours, side='right') - starts
+        # Hors map, les cellules bornées peuvent se répéter: ne compter qu'une fois
+        for j in range(1, 9):
+            counts[(neighbours[:, :j] == neighbours[:, j:j + 1]).any(axis=1), j] = 0
+
+        per_target = counts.sum(axis=1)
+        cumulative = np.cumsum(per_target)
+        start = 0
+        while start < len(valid):
+            # Tranche de cibles dont le nombre de paires (cible, source) ≤ PAIR_CHUNK
+            done = cumulative[start - 1] if start else 0
+            end = max(start + 1, int(np.searchsorted(cumulative, done + PAIR_CHUNK, side='right')))
+            chunk = np.arange(start, end)
+            start = end
+
+            flat_starts = starts[chunk].ravel()
+            flat_counts = counts[chunk].ravel()
+            n_pairs = int(flat_counts.sum())
+            if not n_pairs:
+                continue
+
+            # Index de source de chaque paire: début de la cellule + rang dans la cellule
+            pair_target = np.repeat(chunk, per_target[chunk])
+            offsets = np.repeat(np.cumsum(flat_counts) - flat_counts, flat_counts)
+            pair_source = np.repeat(flat_starts, flat_counts) + np.arange(n_pairs) - offsets
+
+            diff = targets[valid[pair_target]] - self.sources[pair_source]
+            hit = np.einsum('ij,ij->i', diff, diff) <= self.radii_sq[pair_source]
+            result[valid[pair_target[hit]]] = True
+
+        return result
+
+
+def any_within_radius(
+    targets: np.ndarray,
+    sources: np.ndarray,
+    radius: float,
+) -> np.ndarray:
+    """
+    Version indexée de within_radius(...).any(-1) pour tout un match
+
+    Args:
+        targets: (F, P, 2) cibles par frame
+        sources: (F, S, 2) sources par frame, ou (S, 2) si fixes
+        radius: Rayon de vision
+
+    Returns:
+        (F, P) bool
+    """
+    n_frames, n_targets = targets.shape[:2]
+    if sources.ndim == 2:
+        grid = VisionGrid(sources, radius)
+        return grid.any_within(targets.reshape(-1, 2)).reshape(n_frames, n_targets)
+
+    source_groups = np.repeat(np.arange(sources.shape[0]), sources.shape[1])
+    target_groups = np.repeat(np.arange(n_frames), n_targets)
+    grid = VisionGrid(sources.reshape(-1, 2), radius, groups=source_groups)
+    return grid.any_within(targets.reshape(-1, 2), groups=target_groups).reshape(n_frames, n_targets)
@@ -0,0 +1,173 @@
+"""
+Tourelles: positions et état au cours du match
+
+Une tourelle détruite (BUILDING_KILL) ne donne plus de vision. L'état des
+tourelles est stocké en masque de bits par équipe (bit i = tourelle i de
+TURRET_POSITIONS vivante), un masque par instant de changement:
+"tourelles vivantes à t" est un searchsorted sur ces instants.
+
+Les events TURRET_PLATE_DESTROYED ne changent pas la vision (la tourelle
+reste debout) et sont ignorés.
+
+La timeline est calculée une fois par match et mise en cache à côté de la
+timeline JSON ({match_id}_structures.npz), comme le cache colonnaire.
+"""
+
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from lol_fog_predictor.api.timeline_cache import TimelineCache, get_timeline_cache
+from lol_fog_predictor.fog.engine import TEAMS
+
+# Positions fixes des tourelles - DEPUIS API RIOT (positions des BUILDING_KILL)
+TURRET_POSITIONS = {
+    100: np.array([
+        # Top lane
+        (981, 10441),    # Top Outer
+        (1512, 6699),    # Top Inner
+        (1169, 4287),    # Top Inhibitor
+        # Mid lane
+        (5846, 6396),    # Mid Outer
+        (5048, 4812),    # Mid Inner
+        (3651, 3696),    # Mid Inhibitor
+        (1748, 2270),    # Mid Nexus
+        # Bot lane
+        (10504, 1029),   # Bot Outer
+        (6919, 1483),    # Bot Inner
+        (4281, 1253),    # Bot Inhibitor
+    ], dtype=np.float64),
+    200: np.array([
+        # Top lane
+        (4318, 13875),   # Top Outer
+        (7943, 13411),   # Top Inner
+        (10481, 13650),  # Top Inhibitor
+        # Mid lane
+        (8955, 8510),    # Mid Outer
+        (9767, 10113),   # Mid Inner
+        (11134, 11207),  # Mid Inhibitor
+        (12611, 13084),  # Mid Nexus
+        # Bot lane
+        (13866, 4505),   # Bot Outer
+        (13327, 8226),   # Bot Inner
+        (13624, 10572),  # Bot Inhibitor
+    ], dtype=np.float64),
+}
+
+# Distance max entre un BUILDING_KILL et la tourelle à laquelle on l'attribue
+TURRET_MATCH_DISTANCE = 500
+
+# À incrémenter si le calcul ou le format de la timeline change
+STRUCTURES_VERSION = 1
+
+
+@dataclass
+class TurretTimeline:
+    """État des tourelles d'un match, un masque de bits par instant de changement"""
+    times: np.ndarray  # (C,) ms, times[0] = 0
+    alive: np.ndarray  # (C, 2) uint32, ordre des équipes = TEAMS
+
+    def alive_mask(self, team: int, timestamps: np.ndarray) -> np.ndarray:
+        """(T,) masque de bits des tourelles de `team` vivantes à chaque t"""
+        idx = np.searchsorted(self.times, np.asarray(timestamps), side='right') - 1
+        return self.alive[np.maximum(idx, 0), TEAMS.index(team)]
+
+    def alive_at(self, team: int, timestamps: np.ndarray) -> np.ndarray:
+        """(T, n) bool, tourelle i de `team` vivante à t"""
+        bits = np.arange(len(TURRET_POSITIONS[team]), dtype=np.uint32)
+        return (self.alive_mask(team, timestamps)[:, None] >> bits) & 1 == 1
+
+    def positions_at(self, team: int, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Positions des tourelles de `team` à chaque t, source de vision du moteur
+
+        Returns:
+            (T, n, 2), NaN pour une tourelle détruite
+        """
+        alive = self.alive_at(team, timestamps)
+        positions = np.broadcast_to(TURRET_POSITIONS[team], alive.shape + (2,))
+        return np.where(alive[..., None], positions, np.nan)
+
+    def save(self, path: Path):
+        np.savez(path, times=self.times, alive=self.alive, version=np.array(STRUCTURES_VERSION))
+
+    @classmethod
+    def load(cls, path: Path) -> 'TurretTimeline':
+        with np.load(path) as data:
+            if int(data['version']) != STRUCTURES_VERSION:
+                raise ValueError(f"Structures version {int(data['version'])}, attendu {STRUCTURES_VERSION}")
+            return cls(data['times'], data['alive'])
+
+
+def build_turret_timeline(cache: TimelineCache) -> TurretTimeline:
+    """
+    Construire la timeline des tourelles depuis les BUILDING_KILL
+
+    Chaque BUILDING_KILL de type *_TURRET est attribué à la tourelle la plus
+    proche de l'équipe détruite (teamId = équipe propriétaire), si elle est
+    à moins de TURRET_MATCH_DISTANCE. Les tourelles absentes de
+    TURRET_POSITIONS (ex: seconde tourelle du nexus) sont ignorées.
+    """
+    kills = cache.events_of_type('BUILDING_KILL')
+    is_turret = np.char.endswith(cache.vocab, '_TURRET')[kills['subtype']]
+
+    times = [np.zeros(1, dtype=np.int64)]
+    killed_bits = [np.zeros((1, len(TEAMS)), dtype=np.uint32)]
+
+    for team_idx, team in enumerate(TEAMS):
+        keep = is_turret & (kills['team_id'] == team)
+        xy = np.stack([kills['x'][keep], kills['y'][keep]], axis=-1).astype(np.float64)
+        distances = np.linalg.norm(xy[:, None, :] - TURRET_POSITIONS[team][None, :, :], axis=-1)
+        if not len(distances):
+            continue
+        nearest = distances.argmin(axis=1)
+        matched = distances[np.arange(len(nearest)), nearest] <= TURRET_MATCH_DISTANCE
+
+        bits = np.zeros((int(matched.sum()), len(TEAMS)), dtype=np.uint32)
+        bits[:, team_idx] = np.uint32(1) << nearest[matched].astype(np.uint32)
+        times.append(kills['timestamp'][keep][matched].astype(np.int64))
+        killed_bits.append(bits)
+
+    times = np.concatenate(times)
+    killed_bits = np.concatenate(killed_bits)
+    order = np.argsort(times, kind='stable')
+    times, killed_bits = times[order], killed_bits[order]
+
+    # Tourelles détruites cumulées, puis un seul masque par instant (le dernier)
+    killed = np.bitwise_or.accumulate(killed_bits, axis=0)
+    last = np.r_[times[1:] != times[:-1], True]
+    full = np.array([(1 << len(TURRET_POSITIONS[team])) - 1 for team in TEAMS], dtype=np.uint32)
+    return TurretTimeline(times[last], full & ~killed[last])
+
+
+def structures_path(timeline_path: Path) -> Path:
+    """Timeline des tourelles à côté de la timeline: <match_id>_structures.npz"""
+    match_id = timeline_path.stem.replace('_timeline', '')
+    return timeline_path.with_name(f'{match_id}_structures.npz')
+
+
+def get_turret_timeline(timeline_path: Path) -> TurretTimeline:
+    """
+    Timeline des tourelles d'un match, depuis le cache si à jour
+
+    Reconstruite si la timeline est plus récente que le cache ou si
+    STRUCTURES_VERSION a changé.
+    """
+    timeline_path = Path(timeline_path)
+    path = structures_path(timeline_path)
+    if path.exists() and path.stat().st_mtime_ns >= timeline_path.stat().st_mtime_ns:
+        try:
+            return TurretTimeline.load(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            pass  # Cache ancien ou corrompu (écriture interrompue): reconstruire
+
+    timeline = build_turret_timeline(get_timeline_cache(timeline_path))
+
+    # Écriture atomique: un worker tué ne laisse pas de .npz tronqué
+    tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp.npz')
+    timeline.save(tmp_path)
+    os.replace(tmp_path, path)
+    return timeline
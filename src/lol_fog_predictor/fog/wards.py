@@ -0,0 +1,251 @@
+"""
+Durée de vie des wards, partagée par le processeur et le webapp
+
+- Position d'une ward: position du poseur à la frame la plus proche
+  (les events WARD_PLACED n'ont pas de position dans l'API)
+- Fin de vie: expiration (WARD_DURATIONS) ou WARD_KILL du même type
+- WardIndex: balayage des extrémités triées, "wards actives de l'équipe T
+  à l'instant t" en O(log n + k)
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lol_fog_predictor.api.timeline_cache import TimelineCache
+
+WARD_DURATIONS = {
+    'YELLOW_TRINKET': 90000,  # 90 secondes
+    'SIGHT_WARD': 150000,      # 150 secondes (2m30)
+    'CONTROL_WARD': None,      # Permanent jusqu'à destruction
+    'UNDEFINED': 2000          # 2 secondes (Farsight Alteration / Zombie Wards / Ghost Poro)
+}
+
+# Écart max entre le placement et la frame utilisée pour la position
+MAX_POSITION_TIME_DIFF = 60000
+
+
+@dataclass
+class Ward:
+    """Représente une ward placée"""
+    creator_id: int
+    champion: str
+    team: int
+    ward_type: str
+    placed_at: int  # timestamp en ms
+    position_x: float
+    position_y: float
+    expires_at: Optional[int]  # None si permanent (control ward)
+    destroyed_at: Optional[int] = None
+
+    @property
+    def ends_at(self) -> Optional[int]:
+        """Premier instant où la ward n'est plus active (None si jamais)"""
+        ends = [t for t in (self.destroyed_at, self.expires_at) if t]
+        return min(ends) if ends else None
+
+    def is_active(self, timestamp: int) -> bool:
+        """Vérifie si la ward est active à un timestamp donné"""
+        if self.destroyed_at and timestamp >= self.destroyed_at:
+            return False
+        if self.expires_at and timestamp >= self.expires_at:
+            return False
+        return timestamp >= self.placed_at
+
+
+def build_wards(cache: TimelineCache, champion_names: Dict[int, str] = None) -> List[Ward]:
+    """
+    Construire la liste des wards d'un match, dans l'ordre de placement
+
+    Les wards UNDEFINED (Farsight Alteration / trinket bleue) sont ignorées:
+    elles ne durent que 2 secondes et ne sont pas pertinentes pour le fog.
+    Une destruction est attribuée au premier WARD_KILL du même type entre le
+    placement et l'expiration, chaque kill ne servant qu'une fois.
+    """
+    champion_names = champion_names or {}
+    vocab = cache.vocab
+    timestamps = np.asarray(cache.timestamps, dtype=np.int64)
+    placed = cache.events_of_type('WARD_PLACED')
+    killed = cache.events_of_type('WARD_KILL')
+
+    # Types de ward: code '' (wardType absent) → UNDEFINED
+    ward_types = np.where(vocab == '', 'UNDEFINED', vocab)
+    placed_types = ward_types[placed['subtype']].tolist()
+    killed_types = ward_types[killed['subtype']].tolist()
+
+    # Position du poseur à la frame la plus proche (la première en cas d'égalité)
+    placed_at = placed['timestamp'].astype(np.int64)
+    creator_ids = placed['participant_id'].astype(np.int64)
+    if len(timestamps):
+        after = np.clip(np.searchsorted(timestamps, placed_at), 0, len(timestamps) - 1)
+        before = np.clip(after - 1, 0, len(timestamps) - 1)
+        use_before = np.abs(placed_at - timestamps[before]) <= np.abs(timestamps[after] - placed_at)
+        closest = np.where(use_before, before, after)
+        close_enough = np.abs(timestamps[closest] - placed_at) < MAX_POSITION_TIME_DIFF
+        valid_creator = (creator_ids >= 1) & (creator_ids <= cache.n_participants)
+        xy = cache.positions[closest, np.clip(creator_ids - 1, 0, None)]
+        has_position = close_enough & valid_creator & ~np.isnan(xy[:, 0])
+    else:
+        xy = np.zeros((len(placed_at), 2))
+        has_position = np.zeros(len(placed_at), dtype=bool)
+
+    # Kills triés par temps, par type
+    kills_by_type: Dict[str, List[int]] = {}
+    for kill_time, kill_type in sorted(zip(killed['timestamp'].tolist(), killed_types)):
+        kills_by_type.setdefault(kill_type, []).append(kill_time)
+    used_kills = set()
+
+    wards = []
+    for i, ward_type in enumerate(placed_types):
+        if ward_type == 'UNDEFINED' or not has_position[i]:
+            continue
+
+        creator_id = int(creator_ids[i])
+        ward_placed_at = int(placed_at[i])
+        duration = WARD_DURATIONS.get(ward_type)
+        expires_at = (ward_placed_at + duration) if duration else None
+
+        ward = Ward(
+            creator_id=creator_id,
+            champion=champion_names.get(creator_id, f'Player{creator_id}'),
+            team=100 if creator_id <= 5 else 200,
+            ward_type=ward_type,
+            placed_at=ward_placed_at,
+            position_x=int(xy[i, 0]),
+            position_y=int(xy[i, 1]),
+            expires_at=expires_at,
+        )
+
+        # Premier kill du même type après placement et avant expiration
+        kill_times = kills_by_type.get(ward_type, [])
+        for kill_time in kill_times[bisect_right(kill_times, ward_placed_at):]:
+            if expires_at and kill_time >= expires_at:
+                break
+            if (kill_time, ward_type) not in used_kills:
+                used_kills.add((kill_time, ward_type))
+                ward.destroyed_at = kill_time
+                break
+
+        wards.append(ward)
+
+    return wards
+
+
+class WardIndex:
+    """
+    Index d'intervalles [placed_at, ends_at) des wards, par équipe
+
+    Balayage des extrémités triées: entre deux extrémités consécutives,
+    l'ensemble des wards actives est constant. On stocke ces ensembles en
+    CSR (offsets + ids); une requête est un bisect + une tranche, O(log n + k).
+    """
+
+    def __init__(self, wards: List[Ward]):
+        self.wards = wards
+        self.positions = np.array(
+            [(w.position_x, w.position_y) for w in wards], dtype=np.float64
+        ).reshape(-1, 2)
+        self._times: Dict[int, np.ndarray] = {}
+        self._offsets: Dict[int, np.ndarray] = {}
+        self._ids: Dict[int, np.ndarray] = {}
+
+        for team in (100, 200):
+            self._build_team(team)
+
+    def _build_team(self, team: int):
+        changes: Dict[int, List] = {}
+        for ward_id, ward in enumerate(self.wards):
+            if ward.team != team:
+                continue
+            changes.setdefault(ward.placed_at, []).append((ward_id, True))
+            if ward.ends_at is not None:
+                changes.setdefault(ward.ends_at, []).append((ward_id, False))
+
+        times = sorted(changes)
+        active = set()
+        offsets = [0]
+        ids: List[int] = []
+        for t in times:
+            for ward_id, is_start in changes[t]:
+                if is_start:
+                    active.add(ward_id)
+                else:
+                    active.discard(ward_id)
+            ids.extend(sorted(active))
+            offsets.append(len(ids))
+
+        self._times[team] = np.array(times, dtype=np.int64)
+        self._offsets[team] = np.array(offsets, dtype=np.int64)
+        self._ids[team] = np.array(ids, dtype=np.int64)
+
+    def active_ids(self, team: int, timestamp: int) -> np.ndarray:
+        """Index (dans self.wards) des wards de `team` actives à `timestamp`"""
+        segment = bisect_right(self._times[team], timestamp) - 1
+        if segment < 0:
+            return self._ids[team][:0]
+        offsets = self._offsets[team]
+        return self._ids[team][offsets[segment]:offsets[segment + 1]]
+
+    def active_slots(self, team: int, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Index (dans self.wards) des wards actives de `team` pour chaque timestamp (batch)
+
+        L'index d'une ward est stable sur tout le match (ordre de placement,
+        même liste que WardTracker.wards), contrairement à son slot.
+
+        Returns:
+            (T, K) int64, -1 pour un slot vide, K = max de wards actives simultanément
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        times, offsets, ids = self._times[team], self._offsets[team], self._ids[team]
+
+        segment = np.searchsorted(times, timestamps, side='right') - 1
+        start = np.where(segment >= 0, offsets[np.maximum(segment, 0)], 0)
+        count = np.where(segment >= 0, offsets[segment + 1] - start, 0)
+
+        width = int(count.max()) if len(count) else 0
+        slots = np.arange(width)
+        present = slots[None, :] < count[:, None]
+        flat = np.where(present, start[:, None] + slots[None, :], 0)
+
+        result = np.full((len(timestamps), width), -1, dtype=np.int64)
+        if width:
+            result[present] = ids[flat[present]]
+        return result
+
+    def slot_positions(self, slots: np.ndarray) -> np.ndarray:
+        """(..., 2) positions des wards d'un tableau d'index (active_slots), NaN pour -1"""
+        positions = np.full(slots.shape + (2,), np.nan)
+        present = slots >= 0
+        positions[present] = self.positions[slots[present]]
+        return positions
+
+    def active_positions(self, team: int, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Positions des wards actives de `team` pour chaque timestamp (batch)
+
+        Returns:
+            (T, K, 2) NaN-padded, K = max de wards actives simultanément
+        """
+        return self.slot_positions(self.active_slots(team, timestamps))
+
+
+class WardTracker:
+    """Tracker de wards avec interpolation de position"""
+
+    def __init__(self, cache: TimelineCache, champion_names: Dict[int, str] = None):
+        self.cache = cache
+        self.champion_names = champion_names or {}
+        self.wards: List[Ward] = build_wards(cache, self.champion_names)
+        self.index = WardIndex(self.wards)
+
+    def get_active_wards_at(self, timestamp: int) -> List[Ward]:
+        """Retourne les wards actives à un timestamp donné (ordre de placement)"""
+        ids = np.sort(np.concatenate([self.index.active_ids(team, timestamp) for team in (100, 200)]))
+        return [self.wards[i] for i in ids]
+
+    def get_wards_placed_in_window(self, start_time: int, end_time: int) -> List[Ward]:
+        """Retourne les wards placées dans une fenêtre de temps"""
+        return [w for w in self.wards if start_time <= w.placed_at < end_time]
@@ -1,3 +1,19 @@
 """Machine Learning module."""
 
-__all__ = []
+from .evaluation import baseline_predictions, evaluate, hidden_samples
+from .features import add_features, build_context, build_features
+from .shards import ShardedDataset, write_shards
+from .tensors import OccupancyTensors, build_tensors
+
+__all__ = [
+    'OccupancyTensors',
+    'ShardedDataset',
+    'add_features',
+    'baseline_predictions',
+    'build_context',
+    'build_features',
+    'build_tensors',
+    'evaluate',
+    'hidden_samples',
+    'write_shards',
+]
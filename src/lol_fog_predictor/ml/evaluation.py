@@ -0,0 +1,162 @@
+"""
+Évaluation des prédictions de position des ennemis cachés
+
+Échantillons: toutes les lignes du dataset avec visible_to_enemy = False
+(un champion que l'équipe adverse ne voit pas). Une prédiction est un
+tableau (N, 2) de positions aligné sur ces échantillons.
+
+Baseline (ML_ROADMAP Phase 2): l'ennemi reste à sa dernière position vue
+(last_visible_x/y), ou dans sa fontaine s'il n'a jamais été vu.
+
+Métriques:
+    - erreur de distance (unités): moyenne, médiane, p90
+    - zones de la grille 50×50 (alignée sur ml/tensors.py): pour chaque
+      (match, timestamp, équipe cachée), zones prédites vs zones réellement
+      occupées; precision / recall / F1 micro sur tous les groupes
+
+Tout est vectorisé (Polars pour la sélection, NumPy pour les métriques):
+un million d'échantillons s'évalue en moins d'une seconde.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import polars as pl
+
+from lol_fog_predictor.api.dataset import DATASET_DIR, scan_dataset
+from lol_fog_predictor.fog.engine import TEAMS
+from lol_fog_predictor.fog.line_of_sight import FOUNTAIN_POSITIONS
+from lol_fog_predictor.ml.tensors import TENSOR_GRID_SIZE, zone_edges, zone_of
+
+SAMPLE_COLUMNS = [
+    'match_id', 'timestamp', 'team', 'participant_id',
+    'position_x', 'position_y', 'last_visible_x', 'last_visible_y',
+]
+
+
+def hidden_samples(lf: pl.LazyFrame) -> pl.DataFrame:
+    """Échantillons à prédire: ennemis hors de la vision adverse"""
+    return lf.filter(~pl.col('visible_to_enemy')).select(SAMPLE_COLUMNS).collect()
+
+
+def baseline_predictions(samples: pl.DataFrame) -> np.ndarray:
+    """
+    Baseline "reste à sa dernière position connue"
+
+    Returns:
+        (N, 2) float64, fontaine de l'équipe si jamais vu
+    """
+    fountain_x = pl.when(pl.col('team') == 100).then(FOUNTAIN_POSITIONS[100][0]).otherwise(FOUNTAIN_POSITIONS[200][0])
+    fountain_y = pl.when(pl.col('team') == 100).then(FOUNTAIN_POSITIONS[100][1]).otherwise(FOUNTAIN_POSITIONS[200][1])
+    return samples.select(
+        pl.col('last_visible_x').cast(pl.Float64).fill_null(fountain_x),
+        pl.col('last_visible_y').cast(pl.Float64).fill_null(fountain_y),
+    ).to_numpy()
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """Valeurs uniques triées (tri + diff, plus rapide que np.unique sur des int64)"""
+    values = np.sort(values)
+    return values[np.r_[True, values[1:] != values[:-1]]]
+
+
+def group_ids(samples: pl.DataFrame) -> np.ndarray:
+    """(N,) identifiant dense du groupe (match, timestamp, équipe) de chaque échantillon"""
+    match = samples.select(pl.col('match_id').rank('dense')).to_series().to_numpy().astype(np.int64)
+    timestamp = samples['timestamp'].to_numpy().astype(np.int64)
+    team = (samples['team'].to_numpy() != TEAMS[0]).astype(np.int64)
+    key = (match << 33) | (timestamp << 1) | team
+    return np.unique(key, return_inverse=True)[1].reshape(-1)
+
+
+def evaluate(
+    samples: pl.DataFrame,
+    predictions: np.ndarray,
+    grid_size: int = TENSOR_GRID_SIZE,
+) -> Dict[str, float]:
+    """
+    Scorer des prédictions de position
+
+    Args:
+        samples: hidden_samples()
+        predictions: (N, 2) positions prédites, alignées sur samples
+        grid_size: Côté de la grille des métriques par zone
+
+    Returns:
+        {'samples', 'distance_mean', 'distance_median', 'distance_p90',
+         'precision', 'recall', 'f1'}
+    """
+    predictions = np.asarray(predictions, dtype=np.float64)
+    if predictions.shape != (len(samples), 2):
+        raise ValueError(f"Prédictions de forme {predictions.shape}, attendu {(len(samples), 2)}")
+    if not len(samples):
+        return {'samples': 0}
+
+    truth = samples.select('position_x', 'position_y').to_numpy().astype(np.float64)
+    distance = np.linalg.norm(predictions - truth, axis=1)
+
+    # Zones: ensembles (groupe, zone) uniques, prédits et réels
+    edges = zone_edges(grid_size)
+    cells = grid_size * grid_size
+    groups = group_ids(samples)
+
+    def zone_keys(points: np.ndarray) -> np.ndarray:
+        zones = zone_of(points[:, 1], edges) * grid_size + zone_of(points[:, 0], edges)
+        return sorted_unique(groups * cells + zones)
+
+    predicted, actual = zone_keys(predictions), zone_keys(truth)
+    hits = len(np.intersect1d(predicted, actual, assume_unique=True))
+    precision = hits / len(predicted)
+    recall = hits / len(actual)
+    f1 = 2 * precision * recall / (precision + recall) if hits else 0.0
+
+    return {
+        'samples': len(samples),
+        'distance_mean': float(distance.mean()),
+        'distance_median': float(np.median(distance)),
+        'distance_p90': float(np.percentile(distance, 90)),
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1': float(f1),
+    }
+
+
+def evaluate_baseline(
+    dataset_dir: Path = DATASET_DIR,
+    grid_size: int = TENSOR_GRID_SIZE,
+    predictions: Optional[np.ndarray] = None,
+) -> Dict[str, float]:
+    """Évaluer la baseline (ou `predictions`, alignées sur hidden_samples) sur tout le dataset"""
+    samples = hidden_samples(scan_dataset(dataset_dir))
+    if predictions is None:
+        predictions = baseline_predictions(samples)
+    return evaluate(samples, predictions, grid_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Évaluer la baseline \"dernière position connue\"")
+    parser.add_argument('--dataset', type=Path, default=DATASET_DIR, help="Dataset partitionné")
+    parser.add_argument('--grid-size', type=int, default=TENSOR_GRID_SIZE, help="Côté de la grille")
+    parser.add_argument('--predictions', type=Path, help="Prédictions (N, 2) .npy à scorer au lieu de la baseline")
+    parser.add_argument('--json', type=Path, help="Écrire les métriques en JSON")
+    args = parser.parse_args()
+
+    predictions = np.load(args.predictions) if args.predictions else None
+    metrics = evaluate_baseline(args.dataset, args.grid_size, predictions)
+
+    print(f"📊 {metrics['samples']:,} ennemis cachés")
+    if metrics['samples']:
+        print(f"   📏 Distance: moyenne {metrics['distance_mean']:.0f}, "
+              f"médiane {metrics['distance_median']:.0f}, p90 {metrics['distance_p90']:.0f}")
+        print(f"   🎯 Zones {args.grid_size}×{args.grid_size}: precision {metrics['precision']:.3f}, "
+              f"recall {metrics['recall']:.3f}, F1 {metrics['f1']:.3f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(metrics, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Features dérivées du dataset fog of war (Polars lazy)
+
+Toutes les features sont des expressions sur un LazyFrame:
+    - distances aux objectifs (dragon, baron) et à sa fontaine
+    - or et niveau d'équipe via fenêtres over('match_id', 'timestamp', ...)
+    - contexte d'équipe (objectifs pris, wards actives, couverture des
+      wards) rattaché par join_asof sur le timestamp
+
+Le pipeline complet (build_features) tourne match par match: les fenêtres
+over(...), le join_asof et le contexte ne portent que sur une partition,
+puis les fichiers des matchs sont concaténés en streaming. La mémoire est
+bornée par le plus gros match, pas par la taille du dataset.
+"""
+
+import argparse
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import polars as pl
+
+from lol_fog_predictor.api.dataset import DATASET_DIR, scan_dataset
+from lol_fog_predictor.api.timeline_cache import get_timeline_cache
+from lol_fog_predictor.fog.engine import TEAMS, WARD_VISION_RADIUS
+from lol_fog_predictor.fog.line_of_sight import FOUNTAIN_POSITIONS
+from lol_fog_predictor.fog.raster import rasterize_vision
+from lol_fog_predictor.fog.wards import WardIndex, build_wards
+
+MATCHES_DIR = Path('data/riot_api/matches')
+FEATURES_PATH = Path('data/processed/fog_features.parquet')
+
+OBJECTIVE_POSITIONS = {
+    'dragon': (9866, 4414),
+    'baron': (5007, 10471),
+}
+
+# ELITE_MONSTER_KILL (monsterType) → colonne du contexte, comptés pour killerTeamId
+MONSTER_COLUMNS = {
+    'DRAGON': 'dragons',
+    'BARON_NASHOR': 'barons',
+    'RIFTHERALD': 'heralds',
+    'HORDE': 'voidgrubs',
+    'ATAKHAN': 'atakhans',
+}
+
+# BUILDING_KILL → colonne du contexte, comptés pour l'équipe adverse du bâtiment
+BUILDING_COLUMNS = {
+    'TOWER_BUILDING': 'turrets_taken',
+    'INHIBITOR_BUILDING': 'inhibitors_taken',
+}
+
+CONTEXT_SCHEMA = {
+    'match_id': pl.String,
+    'timestamp': pl.Int32,
+    'team': pl.Int16,
+    **{name: pl.Int16 for name in MONSTER_COLUMNS.values()},
+    **{name: pl.Int16 for name in BUILDING_COLUMNS.values()},
+    'active_wards': pl.Int16,
+    'ward_coverage': pl.Float32,
+}
+
+
+def _distance(x: float, y: float) -> pl.Expr:
+    return ((pl.col('position_x').cast(pl.Float32) - x) ** 2
+            + (pl.col('position_y').cast(pl.Float32) - y) ** 2).sqrt()
+
+
+def distance_features() -> List[pl.Expr]:
+    """Distances (unités) aux objectifs et à la fontaine de son équipe"""
+    fountain_x = pl.when(pl.col('team') == 100).then(FOUNTAIN_POSITIONS[100][0]).otherwise(FOUNTAIN_POSITIONS[200][0])
+    fountain_y = pl.when(pl.col('team') == 100).then(FOUNTAIN_POSITIONS[100][1]).otherwise(FOUNTAIN_POSITIONS[200][1])
+    return [
+        *(_distance(x, y).alias(f'dist_to_{name}') for name, (x, y) in OBJECTIVE_POSITIONS.items()),
+        ((pl.col('position_x') - fountain_x).cast(pl.Float32) ** 2
+         + (pl.col('position_y') - fountain_y).cast(pl.Float32) ** 2).sqrt().alias('dist_to_fountain'),
+    ]
+
+
+def team_features() -> List[pl.Expr]:
+    """Or et niveau d'équipe, par fenêtre (match, timestamp[, team])"""
+    team_gold = pl.col('total_gold').sum().over('match_id', 'timestamp', 'team')
+    match_gold = pl.col('total_gold').sum().over('match_id', 'timestamp')
+    return [
+        team_gold.alias('team_gold'),
+        (match_gold - team_gold).alias('enemy_gold'),
+        (2 * team_gold - match_gold).alias('gold_diff'),
+        pl.col('level').cast(pl.Float32).mean().over('match_id', 'timestamp', 'team').alias('team_avg_level'),
+    ]
+
+
+def match_context(timeline_path: Path) -> pl.DataFrame:
+    """
+    Contexte d'équipe d'un match à chaque instant où il change
+
+    Une ligne par (instant, équipe): objectifs pris cumulés, wards actives
+    et fraction de la map couverte par ces wards (rasterisée, recouvrements
+    comptés une fois).
+    """
+    cache = get_timeline_cache(timeline_path)
+    match_id = timeline_path.stem.replace('_timeline', '')
+    vocab = cache.vocab
+
+    # (temps, équipe créditée, colonne) des objectifs
+    credited = []
+    monsters = cache.events_of_type('ELITE_MONSTER_KILL')
+    for t, team, code in zip(monsters['timestamp'], monsters['team_id'], monsters['subtype']):
+        if vocab[code] in MONSTER_COLUMNS:
+            credited.append((int(t), int(team), MONSTER_COLUMNS[vocab[code]]))
+    buildings = cache.events_of_type('BUILDING_KILL')
+    for t, team, code in zip(buildings['timestamp'], buildings['team_id'], buildings['subtype']):
+        kind = 'TOWER_BUILDING' if vocab[code].endswith('_TURRET') else vocab[code]
+        if kind in BUILDING_COLUMNS and int(team) in TEAMS:
+            credited.append((int(t), TEAMS[1 - TEAMS.index(int(team))], BUILDING_COLUMNS[kind]))
+
+    ward_index = WardIndex(build_wards(cache))
+    frames = []
+    for team in TEAMS:
+        team_wards = [w for w in ward_index.wards if w.team == team]
+        change_times = {0}
+        change_times.update(t for t, credited_team, _ in credited if credited_team == team)
+        change_times.update(w.placed_at for w in team_wards)
+        change_times.update(w.ends_at for w in team_wards if w.ends_at is not None)
+        times = np.array(sorted(change_times), dtype=np.int64)
+
+        columns = {'timestamp': times, 'team': np.full(len(times), team)}
+        for name in [*MONSTER_COLUMNS.values(), *BUILDING_COLUMNS.values()]:
+            event_times = np.sort([t for t, credited_team, column in credited
+                                   if credited_team == team and column == name])
+            columns[name] = np.searchsorted(event_times, times, side='right')
+
+        wards = ward_index.active_positions(team, times)
+        columns['active_wards'] = (~np.isnan(wards[..., 0])).sum(axis=1)
+        masks = rasterize_vision(times, {team: [(wards, WARD_VISION_RADIUS)]})
+        columns['ward_coverage'] = masks.pool(team, grid_size=1)[:, 0, 0]
+
+        frames.append(pl.DataFrame(columns).with_columns(pl.lit(match_id).alias('match_id')))
+
+    return pl.concat(frames).select(
+        pl.col(name).cast(dtype) for name, dtype in CONTEXT_SCHEMA.items()
+    ).sort('match_id', 'team', 'timestamp')
+
+
+def build_context(matches_dir: Path = MATCHES_DIR) -> pl.LazyFrame:
+    """Contexte de tous les matchs (petit: une ligne par changement d'état)"""
+    frames = [match_context(path) for path in sorted(Path(matches_dir).glob('*_timeline.json'))]
+    if not frames:
+        return pl.LazyFrame(schema=CONTEXT_SCHEMA)
+    return pl.concat(frames).lazy()
+
+
+def add_features(lf: pl.LazyFrame, context: Optional[pl.LazyFrame] = None) -> pl.LazyFrame:
+    """
+    Ajouter les features au dataset (lazy, rien n'est calculé)
+
+    Args:
+        lf: Dataset (scan_dataset), trié par timestamp dans chaque match
+        context: build_context(); si donné, rattaché au dernier état ≤ timestamp
+            du (match, équipe) de chaque ligne
+    """
+    lf = lf.with_columns(*distance_features(), *team_features())
+
+    if context is not None:
+        context_columns = [name for name in CONTEXT_SCHEMA if name not in ('match_id', 'timestamp', 'team')]
+        lf = lf.join_asof(
+            context,
+            on='timestamp',
+            by=['match_id', 'team'],
+            # Les partitions sont triées par timestamp dans chaque match
+            check_sortedness=False,
+        ).with_columns(pl.col(context_columns).fill_null(0))
+
+    return lf
+
+
+def build_features(
+    dataset_dir: Path = DATASET_DIR,
+    matches_dir: Path = MATCHES_DIR,
+    output_path: Path = FEATURES_PATH,
+) -> Path:
+    """
+    Calculer les features de tout le dataset et les écrire en Parquet
+
+    Un match à la fois: ses lignes (filtre sur match_id, une seule
+    partition lue) et son contexte passent par add_features puis sont
+    écrits dans un fichier temporaire. Les fenêtres over(...) ne voient
+    donc jamais qu'un match. Les fichiers sont ensuite concaténés en
+    streaming dans output_path (pas de fenêtre: aucune matérialisation).
+    """
+    dataset = scan_dataset(dataset_dir)
+    match_ids = dataset.select(pl.col('match_id').unique().sort()).collect().to_series().to_list()
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    parts_dir = output_path.with_name(f'{output_path.stem}.{os.getpid()}.parts')
+    parts_dir.mkdir(exist_ok=True)
+    try:
+        parts = []
+        for match_id in match_ids:
+            timeline_path = Path(matches_dir) / f'{match_id}_timeline.json'
+            context = (
+                match_context(timeline_path).lazy() if timeline_path.exists()
+                else pl.LazyFrame(schema=CONTEXT_SCHEMA)
+            )
+            part = parts_dir / f'{match_id}.parquet'
+            lf = add_features(dataset.filter(pl.col('match_id') == match_id), context)
+            lf.sink_parquet(part, engine='streaming')
+            parts.append(part)
+
+        lf = pl.scan_parquet(parts) if parts else add_features(dataset, pl.LazyFrame(schema=CONTEXT_SCHEMA))
+        lf.sink_parquet(output_path, compression='zstd', engine='streaming')
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset fog of war → features ML")
+    parser.add_argument('--dataset', type=Path, default=DATASET_DIR, help="Dataset partitionné")
+    parser.add_argument('--matches', type=Path, default=MATCHES_DIR, help="Dossier des timelines")
+    parser.add_argument('--output', type=Path, default=FEATURES_PATH, help="Fichier Parquet de sortie")
+    args = parser.parse_args()
+
+    path = build_features(args.dataset, args.matches, args.output)
+    features = pl.scan_parquet(path)
+    rows = features.select(pl.len()).collect().item()
+    print(f"✅ Features: {path} ({rows:,} lignes, {len(features.collect_schema())} colonnes)")
+
+
+if __name__ == '__main__':
+    main()
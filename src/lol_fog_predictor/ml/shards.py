@@ -0,0 +1,348 @@
+"""
+Shards d'entraînement du dataset fog of war (split par match)
+
+Le dataset partitionné est réécrit en shards de taille fixe, un jeu par
+split (train / val / test):
+    - Split déterministe par hash du match_id (sha1, indépendant de la
+      graine Python): toutes les lignes d'un match sont dans le même split
+    - Mélange par buffer (SHUFFLE_BUFFER lignes, graine fixe): les lignes
+      d'un shard viennent de plusieurs matchs, sans tout charger en mémoire
+    - Shards de SHARD_ROWS lignes, en blocs de BLOCK_ROWS records numpy
+      compressés zstd; un index des offsets en octets des blocs permet de
+      lire n'importe quel bloc directement (seek + décompression)
+
+    fog_shards/
+        _meta.json                   # dtype, vocabulaires, splits, shards
+        train-00000.bin              # blocs zstd concaténés
+        train-00000_index.npy        # (blocs + 1,) offsets en octets
+
+Les valeurs nulles (jamais vu) des colonnes entières sont écrites à
+NULL_VALUE (-1), celles des colonnes flottantes (coverage_* sans
+--coverage) à NaN.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import polars as pl
+import zstandard as zstd
+
+from lol_fog_predictor.api.dataset import DATASET_DIR, DATASET_SCHEMA, scan_dataset
+
+SHARDS_DIR = Path('data/processed/fog_shards')
+SPLITS = {'train': 0.8, 'val': 0.1, 'test': 0.1}
+SHARD_ROWS = 1 << 18
+BLOCK_ROWS = 1 << 12
+SHUFFLE_BUFFER = 1 << 16
+SHUFFLE_SEED = 0
+NULL_VALUE = -1
+ZSTD_LEVEL = 3
+
+# À incrémenter si le format des shards change
+SHARDS_VERSION = 5
+
+# Types numpy des colonnes du dataset (champion et match_id: codes de vocabulaire)
+NUMPY_TYPES = {
+    pl.Int8: np.int8,
+    pl.Int16: np.int16,
+    pl.Int32: np.int32,
+    pl.UInt64: np.uint64,
+    pl.Float32: np.float32,
+    pl.Boolean: np.bool_,
+}
+CATEGORY_TYPE = np.int16
+
+
+def record_dtype() -> np.dtype:
+    """dtype structuré d'une ligne: colonnes du dataset + code du match"""
+    fields = [
+        (name, CATEGORY_TYPE if isinstance(dtype, pl.Categorical) else NUMPY_TYPES[dtype])
+        for name, dtype in DATASET_SCHEMA.items()
+    ]
+    return np.dtype(fields + [('match', np.int32)])
+
+
+def split_of(match_id: str, splits: Dict[str, float] = SPLITS) -> str:
+    """
+    Split d'un match, déterministe (hash sha1 du match_id → [0, 1))
+
+    Un match garde son split quand le dataset grandit.
+    """
+    value = int.from_bytes(hashlib.sha1(match_id.encode()).digest()[:8], 'big') / 2 ** 64
+    total = sum(splits.values())
+    cumulative = 0.0
+    for name, fraction in splits.items():
+        cumulative += fraction / total
+        if value < cumulative:
+            return name
+    return name
+
+
+def to_records(df: pl.DataFrame, match: int, champions: Dict[str, int]) -> np.ndarray:
+    """Lignes d'un match → records numpy (nulls → NULL_VALUE, NaN pour les flottants)"""
+    records = np.zeros(len(df), dtype=record_dtype())
+    for name, dtype in DATASET_SCHEMA.items():
+        column = df[name]
+        if isinstance(dtype, pl.Categorical):
+            records[name] = [champions.setdefault(c, len(champions)) for c in column.cast(pl.String).to_list()]
+        elif dtype == pl.Boolean:
+            records[name] = column.fill_null(False).to_numpy()
+        elif dtype.is_unsigned_integer():
+            records[name] = column.fill_null(0).to_numpy()
+        elif dtype.is_float():
+            records[name] = column.fill_null(np.nan).to_numpy()
+        else:
+            records[name] = column.fill_null(NULL_VALUE).to_numpy()
+    records['match'] = match
+    return records
+
+
+class ShardFileWriter:
+    """Écrit les lignes reçues en shards de shard_rows lignes, par blocs zstd"""
+
+    def __init__(self, output_dir: Path, prefix: str, shard_rows: int = SHARD_ROWS, block_rows: int = BLOCK_ROWS):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.shard_rows = shard_rows
+        self.block_rows = block_rows
+        self.compressor = zstd.ZstdCompressor(level=ZSTD_LEVEL)
+        self.pending: List[np.ndarray] = []
+        self.pending_rows = 0
+        self.shards: List[dict] = []
+
+    def write(self, records: np.ndarray):
+        self.pending.append(records)
+        self.pending_rows += len(records)
+        while self.pending_rows >= self.shard_rows:
+            rows = np.concatenate(self.pending)
+            self._write_shard(rows[:self.shard_rows])
+            self.pending = [rows[self.shard_rows:]]
+            self.pending_rows = len(self.pending[0])
+
+    def close(self):
+        if self.pending_rows:
+            self._write_shard(np.concatenate(self.pending))
+        self.pending, self.pending_rows = [], 0
+
+    def _write_shard(self, rows: np.ndarray):
+        name = f'{self.prefix}-{len(self.shards):05d}'
+        offsets = [0]
+        with open(self.output_dir / f'{name}.bin', 'wb') as f:
+            for start in range(0, len(rows), self.block_rows):
+                f.write(self.compressor.compress(rows[start:start + self.block_rows].tobytes()))
+                offsets.append(f.tell())
+        np.save(self.output_dir / f'{name}_index.npy', np.array(offsets, dtype=np.int64))
+        self.shards.append({'name': name, 'rows': len(rows)})
+
+
+class ShuffleBuffer:
+    """
+    Mélange en flux: buffer de `capacity` lignes, vidé de moitié dans un
+    ordre aléatoire à chaque fois qu'il est plein
+    """
+
+    def __init__(self, sink: ShardFileWriter, capacity: int = SHUFFLE_BUFFER, seed: int = SHUFFLE_SEED):
+        self.sink = sink
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.buffer: Optional[np.ndarray] = None
+
+    def add(self, records: np.ndarray):
+        self.buffer = records if self.buffer is None else np.concatenate([self.buffer, records])
+        while len(self.buffer) >= self.capacity:
+            self.buffer = self.buffer[self.rng.permutation(len(self.buffer))]
+            emitted = len(self.buffer) - self.capacity // 2
+            self.sink.write(self.buffer[:emitted])
+            self.buffer = self.buffer[emitted:]
+
+    def close(self):
+        if self.buffer is not None and len(self.buffer):
+            self.sink.write(self.buffer[self.rng.permutation(len(self.buffer))])
+        self.buffer = None
+        self.sink.close()
+
+
+def write_shards(
+    dataset_dir: Path = DATASET_DIR,
+    output_dir: Path = SHARDS_DIR,
+    splits: Dict[str, float] = SPLITS,
+    shard_rows: int = SHARD_ROWS,
+    block_rows: int = BLOCK_ROWS,
+    shuffle_buffer: int = SHUFFLE_BUFFER,
+    seed: int = SHUFFLE_SEED,
+) -> Path:
+    """
+    Réécrire le dataset en shards mélangés, un jeu par split
+
+    Lit une partition (un match) à la fois: la mémoire est bornée par le
+    buffer de mélange et un shard, quelle que soit la taille du dataset.
+
+    Returns:
+        Chemin de _meta.json
+    """
+    dataset_dir, output_dir = Path(dataset_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in [*output_dir.glob('*.bin'), *output_dir.glob('*_index.npy')]:
+        stale.unlink()
+
+    dataset = scan_dataset(dataset_dir)
+    match_ids = dataset.select(pl.col('match_id').unique().sort()).collect()['match_id'].to_list()
+    match_codes = {match_id: code for code, match_id in enumerate(match_ids)}
+    champions: Dict[str, int] = {}
+    meta_splits = {}
+
+    for index, split in enumerate(splits):
+        # Ordre des matchs mélangé (graine fixe) avant le buffer de mélange
+        split_matches = [m for m in match_ids if split_of(m, splits) == split]
+        order = np.random.default_rng(seed + index).permutation(len(split_matches))
+
+        writer = ShardFileWriter(output_dir, split, shard_rows, block_rows)
+        buffer = ShuffleBuffer(writer, shuffle_buffer, seed + index)
+        for i in order:
+            match_id = split_matches[i]
+            rows = dataset.filter(pl.col('match_id') == match_id).collect()
+            buffer.add(to_records(rows, match_codes[match_id], champions))
+        buffer.close()
+        meta_splits[split] = {'matches': split_matches, 'shards': writer.shards}
+
+    meta = {
+        'version': SHARDS_VERSION,
+        'dtype': [[name, np.dtype(dtype).str] for name, dtype in record_dtype().descr],
+        'block_rows': block_rows,
+        'null_value': NULL_VALUE,
+        'match_ids': match_ids,
+        'champions': sorted(champions, key=champions.get),
+        'splits': meta_splits,
+    }
+    meta_path = output_dir / '_meta.json'
+    tmp_path = meta_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+    return meta_path
+
+
+class DatasetShard:
+    """Un shard: accès direct aux blocs par leurs offsets en octets"""
+
+    def __init__(self, path: Path, dtype: np.dtype, block_rows: int, rows: int):
+        self.path = path
+        self.dtype = dtype
+        self.block_rows = block_rows
+        self.rows = rows
+        self.offsets = np.load(path.with_name(f'{path.stem}_index.npy'))
+        self.decompressor = zstd.ZstdDecompressor()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def num_blocks(self) -> int:
+        return len(self.offsets) - 1
+
+    def block(self, index: int) -> np.ndarray:
+        """Records du bloc `index` (une lecture + une décompression)"""
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            data = self.decompressor.decompress(f.read(end - start))
+        return np.frombuffer(data, dtype=self.dtype)
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """Records aux lignes `indices` du shard (blocs lus une fois chacun)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        blocks = indices // self.block_rows
+        out = np.empty(len(indices), dtype=self.dtype)
+        for b in np.unique(blocks):
+            rows = blocks == b
+            out[rows] = self.block(int(b))[indices[rows] - b * self.block_rows]
+        return out
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for index in range(self.num_blocks):
+            yield self.block(index)
+
+
+class ShardedDataset:
+    """
+    Lecture des shards d'un split
+
+    Exemple (lecteurs parallèles: chaque worker lit un shard sur num_workers):
+        dataset = ShardedDataset(split='train')
+        for records in dataset.iter_blocks(worker=rank, num_workers=world):
+            ...
+    """
+
+    def __init__(self, directory: Path = SHARDS_DIR, split: str = 'train'):
+        self.directory = Path(directory)
+        with open(self.directory / '_meta.json') as f:
+            meta = json.load(f)
+        if meta['version'] != SHARDS_VERSION:
+            raise ValueError(f"Shards version {meta['version']}, attendu {SHARDS_VERSION}")
+        if split not in meta['splits']:
+            raise KeyError(f"Split inconnu: {split} ({', '.join(meta['splits'])})")
+
+        self.split = split
+        self.dtype = np.dtype([tuple(field) for field in meta['dtype']])
+        self.match_ids = meta['match_ids']
+        self.champions = meta['champions']
+        self.matches = meta['splits'][split]['matches']
+        self.shards = [
+            DatasetShard(self.directory / f"{s['name']}.bin", self.dtype, meta['block_rows'], s['rows'])
+            for s in meta['splits'][split]['shards']
+        ]
+        self.offsets = np.r_[0, np.cumsum([len(s) for s in self.shards])].astype(np.int64)
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """Accès aléatoire: records aux indices globaux du split"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Index hors limites (0-{len(self) - 1})")
+        shard = np.searchsorted(self.offsets, indices, side='right') - 1
+        out = np.empty(len(indices), dtype=self.dtype)
+        for s in np.unique(shard):
+            rows = shard == s
+            out[rows] = self.shards[s].take(indices[rows] - self.offsets[s])
+        return out
+
+    def iter_blocks(self, worker: int = 0, num_workers: int = 1) -> Iterator[np.ndarray]:
+        """Blocs des shards attribués à `worker` (shards worker, worker + num_workers, ...)"""
+        for shard in self.shards[worker::num_workers]:
+            yield from shard
+
+    def to_frame(self, records: np.ndarray) -> pl.DataFrame:
+        """Records → DataFrame (match_id et champion décodés)"""
+        columns = {name: records[name] for name in DATASET_SCHEMA if name != 'champion'}
+        df = pl.DataFrame(columns).with_columns(
+            pl.Series('champion', np.array(self.champions)[records['champion']]),
+            pl.Series('match_id', np.array(self.match_ids)[records['match']]),
+        )
+        return df.select(*DATASET_SCHEMA, 'match_id')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset fog of war → shards train/val/test")
+    parser.add_argument('--dataset', type=Path, default=DATASET_DIR, help="Dataset partitionné")
+    parser.add_argument('--output', type=Path, default=SHARDS_DIR, help="Dossier des shards")
+    parser.add_argument('--shard-rows', type=int, default=SHARD_ROWS, help="Lignes par shard")
+    parser.add_argument('--shuffle-buffer', type=int, default=SHUFFLE_BUFFER, help="Taille du buffer de mélange")
+    parser.add_argument('--seed', type=int, default=SHUFFLE_SEED, help="Graine du mélange")
+    args = parser.parse_args()
+
+    write_shards(args.dataset, args.output, shard_rows=args.shard_rows,
+                 shuffle_buffer=args.shuffle_buffer, seed=args.seed)
+    for split in SPLITS:
+        dataset = ShardedDataset(args.output, split)
+        print(f"✅ {split}: {len(dataset.matches)} matchs, {len(dataset):,} lignes, {len(dataset.shards)} shards")
+
+
+if __name__ == '__main__':
+    main()
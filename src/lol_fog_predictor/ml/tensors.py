@@ -0,0 +1,298 @@
+"""
+Tenseurs d'occupation par zone pour l'entraînement (ML_ROADMAP Option A)
+
+Un échantillon par (match, timestamp, équipe), grille 50×50, 3 canaux:
+    - enemy_presence: zones occupées par au moins un champion adverse (cible)
+    - fog: zones hors de la vision de l'équipe (masques rasterisés, fraction
+      vue < FOG_THRESHOLD)
+    - ally_positions: zones occupées par au moins un allié
+
+Les grilles sont bit-packées (np.packbits sur les 2500 zones d'un canal,
+313 octets) et écrites en shards .npy de SHARD_SAMPLES échantillons:
+
+    occupancy/
+        _meta.json               # grille, canaux, match_ids, shards
+        shard-00000.npy          # (N, 3, 313) uint8
+        shard-00000_keys.npy     # (N,) (match, timestamp, team)
+
+Le build traite un match à la fois et n'a qu'un shard en mémoire; la lecture
+(OccupancyTensors) ouvre les shards en memory map, sans rien reconstruire.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import polars as pl
+
+from lol_fog_predictor.api.dataset import DATASET_DIR, scan_dataset
+from lol_fog_predictor.api.manifest import DatasetManifest
+from lol_fog_predictor.api.timeline_processor import MANIFEST_NAME, get_vision_masks
+from lol_fog_predictor.fog.engine import TEAMS
+from lol_fog_predictor.fog.raster import RASTER_CELL_SIZE, raster_size
+from lol_fog_predictor.ml.features import MATCHES_DIR
+
+TENSORS_DIR = Path('data/processed/occupancy')
+TENSOR_GRID_SIZE = 50
+CHANNELS = ('enemy_presence', 'fog', 'ally_positions')
+SHARD_SAMPLES = 16384
+FOG_THRESHOLD = 0.5  # Zone dans le fog si moins de la moitié est vue
+
+# À incrémenter si le format des shards change
+TENSORS_VERSION = 1
+
+KEY_DTYPE = np.dtype([('match', np.int32), ('timestamp', np.int32), ('team', np.int16)])
+
+
+def zone_edges(grid_size: int = TENSOR_GRID_SIZE, cell_size: int = RASTER_CELL_SIZE) -> np.ndarray:
+    """
+    Bords des zones en unités de jeu, alignés sur VisionMasks.pool
+
+    Returns:
+        (grid_size + 1,) bords croissants
+    """
+    return np.linspace(0, raster_size(cell_size), grid_size + 1).astype(np.int64) * cell_size
+
+
+def zone_of(coords: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Index de zone de chaque coordonnée (bornée à la grille)"""
+    return np.clip(np.searchsorted(edges, coords, side='right') - 1, 0, len(edges) - 2)
+
+
+def match_tensors(
+    rows: pl.DataFrame,
+    masks,
+    grid_size: int = TENSOR_GRID_SIZE,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Grilles bit-packées d'un match
+
+    Args:
+        rows: Lignes du match (timestamp, team, position_x, position_y)
+        masks: VisionMasks du match (get_vision_masks)
+        grid_size: Côté de la grille
+
+    Returns:
+        (timestamps (2T,), teams (2T,), packed (2T, len(CHANNELS), ceil(g²/8)) uint8),
+        triés par (timestamp, équipe)
+    """
+    timestamps = np.unique(rows['timestamp'].to_numpy())
+    edges = zone_edges(grid_size, masks.cell_size)
+
+    # Occupation par équipe des champions: (T, 2, g, g)
+    occupancy = np.zeros((len(timestamps), len(TEAMS), grid_size, grid_size), dtype=bool)
+    sample = np.searchsorted(timestamps, rows['timestamp'].to_numpy())
+    team_idx = np.where(rows['team'].to_numpy() == TEAMS[0], 0, 1)
+    zx = zone_of(rows['position_x'].to_numpy(), edges)
+    zy = zone_of(rows['position_y'].to_numpy(), edges)
+    occupancy[sample, team_idx, zy, zx] = True
+
+    samples = masks.sample_index(timestamps)
+    per_team = []
+    for idx, team in enumerate(TEAMS):
+        fog = masks.pool(team, grid_size)[samples] < FOG_THRESHOLD
+        grids = np.stack([occupancy[:, 1 - idx], fog, occupancy[:, idx]], axis=1)
+        per_team.append(np.packbits(grids.reshape(len(timestamps), len(CHANNELS), -1), axis=-1))
+
+    packed = np.stack(per_team, axis=1).reshape(len(timestamps) * len(TEAMS), len(CHANNELS), -1)
+    return (
+        np.repeat(timestamps, len(TEAMS)),
+        np.tile(np.array(TEAMS), len(timestamps)),
+        packed,
+    )
+
+
+class ShardWriter:
+    """Accumule les échantillons et écrit un shard .npy tous les shard_samples"""
+
+    def __init__(self, output_dir: Path, row_bytes: int, shard_samples: int = SHARD_SAMPLES):
+        self.output_dir = output_dir
+        self.shard_samples = shard_samples
+        self.tensors = np.zeros((shard_samples, len(CHANNELS), row_bytes), dtype=np.uint8)
+        self.keys = np.zeros(shard_samples, dtype=KEY_DTYPE)
+        self.filled = 0
+        self.shards: List[dict] = []
+
+    def add(self, match: int, timestamps: np.ndarray, teams: np.ndarray, packed: np.ndarray):
+        start = 0
+        while start < len(packed):
+            n = min(len(packed) - start, self.shard_samples - self.filled)
+            rows = slice(self.filled, self.filled + n)
+            self.tensors[rows] = packed[start:start + n]
+            self.keys['match'][rows] = match
+            self.keys['timestamp'][rows] = timestamps[start:start + n]
+            self.keys['team'][rows] = teams[start:start + n]
+            self.filled += n
+            start += n
+            if self.filled == self.shard_samples:
+                self.flush()
+
+    def flush(self):
+        if not self.filled:
+            return
+        name = f'shard-{len(self.shards):05d}'
+        np.save(self.output_dir / f'{name}.npy', self.tensors[:self.filled])
+        np.save(self.output_dir / f'{name}_keys.npy', self.keys[:self.filled])
+        self.shards.append({'name': name, 'samples': self.filled})
+        self.filled = 0
+
+
+def build_tensors(
+    dataset_dir: Path = DATASET_DIR,
+    matches_dir: Path = MATCHES_DIR,
+    output_dir: Path = TENSORS_DIR,
+    grid_size: int = TENSOR_GRID_SIZE,
+    shard_samples: int = SHARD_SAMPLES,
+) -> Path:
+    """
+    Construire les shards de tenseurs d'occupation depuis le dataset
+
+    Les masques de vision sont construits avec les options du dataset
+    (step_ms, murs, buissons, sbires lus dans le manifest), mis en cache à
+    côté des timelines.
+
+    Returns:
+        Chemin de _meta.json
+    """
+    dataset_dir, matches_dir, output_dir = Path(dataset_dir), Path(matches_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob('shard-*.npy'):
+        stale.unlink()
+
+    manifest = DatasetManifest(dataset_dir / MANIFEST_NAME)
+    dataset = scan_dataset(dataset_dir)
+    match_ids = dataset.select(pl.col('match_id').unique().sort()).collect()['match_id'].to_list()
+
+    writer = ShardWriter(output_dir, int(np.ceil(grid_size * grid_size / 8)), shard_samples)
+    built = []
+    for match_id in match_ids:
+        timeline_path = matches_dir / f'{match_id}_timeline.json'
+        if not timeline_path.exists():
+            print(f"   ⚠️  Timeline absente, ignoré: {match_id}")
+            continue
+
+        # Masques avec les mêmes options que la visibilité du dataset
+        entry = manifest.entries.get(match_id)
+        options = entry.options if entry else {}
+        masks = get_vision_masks(
+            timeline_path, step_ms=options.get('step_ms'),
+            line_of_sight=options.get('line_of_sight', False),
+            brushes=options.get('brushes', False),
+            minions=options.get('minions', False),
+        )
+        rows = dataset.filter(pl.col('match_id') == match_id).select(
+            'timestamp', 'team', 'position_x', 'position_y'
+        ).collect()
+
+        timestamps, teams, packed = match_tensors(rows, masks, grid_size)
+        writer.add(len(built), timestamps, teams, packed)
+        built.append(match_id)
+    writer.flush()
+
+    meta = {
+        'version': TENSORS_VERSION,
+        'grid_size': grid_size,
+        'channels': list(CHANNELS),
+        'match_ids': built,
+        'shards': writer.shards,
+    }
+    meta_path = output_dir / '_meta.json'
+    tmp_path = meta_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+    return meta_path
+
+
+class OccupancyTensors:
+    """
+    Lecture des shards en memory map (indexation globale sur tous les shards)
+
+    Exemple:
+        tensors = OccupancyTensors()
+        grids = tensors.batch(np.arange(256))   # (256, 3, 50, 50) bool
+        match_id, timestamp, team = tensors.key(0)
+    """
+
+    def __init__(self, directory: Path = TENSORS_DIR):
+        self.directory = Path(directory)
+        with open(self.directory / '_meta.json') as f:
+            meta = json.load(f)
+        if meta['version'] != TENSORS_VERSION:
+            raise ValueError(f"Tensors version {meta['version']}, attendu {TENSORS_VERSION}")
+
+        self.grid_size = meta['grid_size']
+        self.channels = tuple(meta['channels'])
+        self.match_ids = meta['match_ids']
+        self.shards = [np.load(self.directory / f"{s['name']}.npy", mmap_mode='r') for s in meta['shards']]
+        self.shard_keys = [np.load(self.directory / f"{s['name']}_keys.npy", mmap_mode='r') for s in meta['shards']]
+        self.offsets = np.r_[0, np.cumsum([s['samples'] for s in meta['shards']])]
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def _locate(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Index hors limites (0-{len(self) - 1})")
+        shard = np.searchsorted(self.offsets, indices, side='right') - 1
+        return shard, indices - self.offsets[shard]
+
+    def packed(self, indices: np.ndarray) -> np.ndarray:
+        """(N, C, ceil(g²/8)) uint8, lus depuis les shards"""
+        shard, local = self._locate(indices)
+        row_bytes = int(np.ceil(self.grid_size * self.grid_size / 8))
+        out = np.empty((len(shard), len(self.channels), row_bytes), dtype=np.uint8)
+        for s in np.unique(shard):
+            rows = shard == s
+            out[rows] = self.shards[s][local[rows]]
+        return out
+
+    def batch(self, indices: np.ndarray) -> np.ndarray:
+        """(N, C, g, g) bool, grilles décodées"""
+        cells = self.grid_size * self.grid_size
+        bits = np.unpackbits(self.packed(indices), axis=-1, count=cells)
+        return bits.reshape(len(bits), len(self.channels), self.grid_size, self.grid_size).astype(bool)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """(C, g, g) bool"""
+        return self.batch(np.array([index]))[0]
+
+    def keys(self, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Clés (match, timestamp, team) des échantillons (tous si indices=None)"""
+        if indices is None:
+            return np.concatenate(self.shard_keys) if self.shard_keys else np.zeros(0, dtype=KEY_DTYPE)
+        shard, local = self._locate(indices)
+        out = np.empty(len(shard), dtype=KEY_DTYPE)
+        for s in np.unique(shard):
+            rows = shard == s
+            out[rows] = self.shard_keys[s][local[rows]]
+        return out
+
+    def key(self, index: int) -> Tuple[str, int, int]:
+        """(match_id, timestamp, team) d'un échantillon"""
+        key = self.keys(np.array([index]))[0]
+        return self.match_ids[key['match']], int(key['timestamp']), int(key['team'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset fog of war → tenseurs d'occupation (shards .npy)")
+    parser.add_argument('--dataset', type=Path, default=DATASET_DIR, help="Dataset partitionné")
+    parser.add_argument('--matches', type=Path, default=MATCHES_DIR, help="Dossier des timelines")
+    parser.add_argument('--output', type=Path, default=TENSORS_DIR, help="Dossier des shards")
+    parser.add_argument('--grid-size', type=int, default=TENSOR_GRID_SIZE, help="Côté de la grille")
+    parser.add_argument('--shard-samples', type=int, default=SHARD_SAMPLES, help="Échantillons par shard")
+    args = parser.parse_args()
+
+    build_tensors(args.dataset, args.matches, args.output, args.grid_size, args.shard_samples)
+    tensors = OccupancyTensors(args.output)
+    size = sum(s.nbytes for s in tensors.shards)
+    print(f"✅ Tenseurs: {args.output} ({len(tensors):,} échantillons, "
+          f"{len(tensors.shards)} shards, {size / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,169 +3,66 @@ Webapp Flask pour visualiser les positions des joueurs sur la minimap
 """
 
 from flask import Flask, render_template, jsonify, request
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
 import polars as pl
 import json
-from dataclasses import dataclass
-from typing import Optional, List, Dict
+import sys
+from typing import Optional, Tuple
 
-# === WARD TRACKING ===
-
-WARD_DURATIONS = {
-    'YELLOW_TRINKET': 90000,  # 90 secondes
-    'SIGHT_WARD': 150000,      # 150 secondes (2m30)
-    'CONTROL_WARD': None,      # Permanent jusqu'à destruction
-    'UNDEFINED': 2000          # 2 secondes (Farsight Alteration / Zombie Wards / Ghost Poro)
-}
-
-@dataclass
-class Ward:
-    """Représente une ward placée"""
-    creator_id: int
-    champion: str
-    team: int
-    ward_type: str
-    placed_at: int  # timestamp en ms
-    position_x: float
-    position_y: float
-    expires_at: Optional[int]  # None si permanent (control ward)
-    destroyed_at: Optional[int] = None
-    
-    def is_active(self, timestamp: int) -> bool:
-        """Vérifie si la ward est active à un timestamp donné"""
-        if self.destroyed_at and timestamp >= self.destroyed_at:
-            return False
-        if self.expires_at and timestamp >= self.expires_at:
-            return False
-        return timestamp >= self.placed_at
-
-
-class WardTracker:
-    """Tracker de wards avec interpolation de position"""
-    
-    def __init__(self, timeline_data: dict, champion_names: Dict[int, str] = None):
-        self.timeline_data = timeline_data
-        self.frames = timeline_data.get('info', {}).get('frames', [])
-        self.champion_names = champion_names or {}
-        self.wards: List[Ward] = []
-        self._build_ward_list()
-    
-    def _get_player_position_at_time(self, participant_id: int, target_time: int) -> Optional[tuple]:
-        """Interpole la position d'un joueur au moment du placement de ward"""
-        closest_frame = None
-        min_time_diff = float('inf')
-        
-        for frame in self.frames:
-            frame_time = frame['timestamp']
-            time_diff = abs(frame_time - target_time)
-            
-            if time_diff < min_time_diff:
-                min_time_diff = time_diff
-                closest_frame = frame
-        
-        if closest_frame and min_time_diff < 60000:  # Max 60s de différence
-            pf = closest_frame.get('participantFrames', {}).get(str(participant_id), {})
-            pos = pf.get('position', {})
-            
-            if 'x' in pos and 'y' in pos:
-                return (pos['x'], pos['y'])
-        
-        return None
-    
-    def _get_champion_name(self, participant_id: int) -> str:
-        """Récupère le nom du champion d'un participant"""
-        return self.champion_names.get(participant_id, f'Player{participant_id}')
-    
-    def _build_ward_list(self):
-        """Construit la liste complète des wards avec positions interpolées"""
-        ward_placements = []
-        ward_kills = []
-        
-        # Extraire tous les events
-        for frame in self.frames:
-            for event in frame.get('events', []):
-                if event.get('type') == 'WARD_PLACED':
-                    ward_placements.append(event)
-                elif event.get('type') == 'WARD_KILL':
-                    ward_kills.append(event)
-        
-        # Créer les wards avec positions interpolées
-        for event in ward_placements:
-            creator_id = event.get('creatorId')
-            placed_at = event.get('timestamp')
-            ward_type = event.get('wardType', 'UNDEFINED')
-            
-            # Ignorer les wards UNDEFINED (Farsight Alteration / trinket bleue)
-            # Ces wards ne durent que 2 secondes et ne sont pas pertinentes pour le fog of war
-            if ward_type == 'UNDEFINED':
-                continue
-            
-            # Interpoler la position
-            position = self._get_player_position_at_time(creator_id, placed_at)
-            
-            if position:
-                team = 100 if creator_id <= 5 else 200
-                champion = self._get_champion_name(creator_id)
-                
-                duration = WARD_DURATIONS.get(ward_type)
-                expires_at = (placed_at + duration) if duration else None
-                
-                ward = Ward(
-                    creator_id=creator_id,
-                    champion=champion,
-                    team=team,
-                    ward_type=ward_type,
-                    placed_at=placed_at,
-                    position_x=position[0],
-                    position_y=position[1],
-                    expires_at=expires_at
-                )
-                
-                # Chercher si la ward a été détruite
-                # Matcher par type de ward ET par ordre chronologique
-                for kill_event in ward_kills:
-                    kill_time = kill_event.get('timestamp')
-                    kill_ward_type = kill_event.get('wardType', 'UNDEFINED')
-                    
-                    # Vérifier que c'est le bon type de ward
-                    type_match = (kill_ward_type == ward_type) or (kill_ward_type == 'UNDEFINED' and ward_type == 'UNDEFINED')
-                    
-                    # Si destruction après placement et avant expiration
-                    if type_match and kill_time > placed_at and kill_time < (expires_at or float('inf')):
-                        # Vérifier que ce kill n'a pas déjà été assigné à une autre ward
-                        already_used = any(w.destroyed_at == kill_time and w.ward_type == ward_type for w in self.wards)
-                        
-                        if not already_used:
-                            ward.destroyed_at = kill_time
-                            break
-                
-                self.wards.append(ward)
-    
-    def get_active_wards_at(self, timestamp: int) -> List[Ward]:
-        """Retourne les wards actives à un timestamp donné"""
-        return [w for w in self.wards if w.is_active(timestamp)]
-    
-    def get_wards_placed_in_window(self, start_time: int, end_time: int) -> List[Ward]:
-        """Retourne les wards placées dans une fenêtre de temps"""
-        return [w for w in self.wards if start_time <= w.placed_at < end_time]
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+from lol_fog_predictor.api.dataset import scan_dataset
+from lol_fog_predictor.api.timeline_cache import get_timeline_cache
+from lol_fog_predictor.fog.engine import TEAMS
+from lol_fog_predictor.fog.raster import COVERAGE_REGIONS
+from lol_fog_predictor.fog.structures import TURRET_POSITIONS, TurretTimeline, get_turret_timeline
+from lol_fog_predictor.fog.wards import WardTracker  # Index des wards actives, partagé avec le processeur
 
 app = Flask(__name__)
 
-# Charger le dataset
-DATASET_PATH = Path(__file__).parent.parent / 'data' / 'processed' / 'fog_dataset.csv'
-df = None
+# Dataset Parquet partitionné par match (scan lazy, rien n'est lu au démarrage)
+DATASET_PATH = Path(__file__).parent.parent / 'data' / 'processed' / 'fog_dataset'
+df: Optional[pl.LazyFrame] = None
+
+# Colonnes du dataset envoyées pour chaque joueur de /frames
+PLAYER_COLUMNS = ('participant_id', 'champion', 'team', 'position_x', 'position_y',
+                  'visible_to_enemy', 'level', 'total_gold')
 
 def load_dataset():
-    """Charger le dataset au démarrage"""
+    """Ouvrir le dataset au démarrage"""
     global df
-    if DATASET_PATH.exists():
-        df = pl.read_csv(DATASET_PATH)
-        print(f"✅ Dataset chargé: {df.height} positions")
-    else:
+    try:
+        df = scan_dataset(DATASET_PATH)
+        print(f"✅ Dataset ouvert: {DATASET_PATH}")
+    except FileNotFoundError:
         print(f"❌ Dataset non trouvé: {DATASET_PATH}")
 
 
+@lru_cache(maxsize=32)
+def load_match_context(timeline_file: Path, match_file: Path, mtime_ns: int) -> Tuple[WardTracker, TurretTimeline]:
+    """
+    Wards et tourelles d'un match, construites une fois par timeline
+
+    Les tables d'events par type viennent du cache colonnaire; mtime_ns
+    (timeline) fait partie de la clé pour suivre un re-téléchargement.
+    """
+    # Charger les noms des champions depuis le match data
+    champion_names = {}
+    if match_file.exists():
+        with open(match_file) as f:
+            match_full = json.load(f)
+            participants = match_full.get('info', {}).get('participants', [])
+            for i, participant in enumerate(participants):
+                participant_id = i + 1  # participantId va de 1 à 10
+                champion_names[participant_id] = participant.get('championName', f'Player{participant_id}')
+    
+    ward_tracker = WardTracker(get_timeline_cache(timeline_file), champion_names)
+    turret_timeline = get_turret_timeline(timeline_file)  # Calculée une fois, en cache
+    return ward_tracker, turret_timeline
+
+
 @app.route('/')
 def index():
     """Page principale"""
@@ -182,7 +79,7 @@ def get_matches():
     matches = df.group_by('match_id').agg([
         pl.col('timestamp').max().alias('duration'),
         pl.col('timestamp').count().alias('frame_count')
-    ]).sort('match_id')
+    ]).sort('match_id').collect()
     
     result = []
     for row in matches.iter_rows(named=True):
@@ -205,8 +102,8 @@ def get_match_frames(match_id):
     # Paramètre team pour POV (100=blue, 200=red, all=tous)
     pov_team = request.args.get('team', 'all')
     
-    # Filtrer par match
-    match_data = df.filter(pl.col('match_id') == match_id).sort('timestamp')
+    # Filtrer par match (seule la partition du match est lue)
+    match_data = df.filter(pl.col('match_id') == match_id).sort('timestamp', maintain_order=True).collect()
     
     if match_data.height == 0:
         return jsonify({'error': 'Match non trouvé'}), 404
@@ -216,44 +113,47 @@ def get_match_frames(match_id):
     timeline_file = matches_dir / f"{match_id}_timeline.json"
     match_file = matches_dir / f"{match_id}.json"
     
-    # Charger les noms des champions depuis le match data
-    champion_names = {}
-    if match_file.exists():
-        with open(match_file) as f:
-            match_full = json.load(f)
-            participants = match_full.get('info', {}).get('participants', [])
-            for i, participant in enumerate(participants):
-                participant_id = i + 1  # participantId va de 1 à 10
-                champion_names[participant_id] = participant.get('championName', f'Player{participant_id}')
-    
     ward_tracker = None
+    turret_timeline = None
     if timeline_file.exists():
-        with open(timeline_file) as f:
-            timeline_full = json.load(f)
-            ward_tracker = WardTracker(timeline_full, champion_names)
+        ward_tracker, turret_timeline = load_match_context(
+            timeline_file, match_file, timeline_file.stat().st_mtime_ns
+        )
+    
+    # Une passe: lignes triées par timestamp, bornes [début, fin) de chaque frame
+    timestamps = match_data['timestamp'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, timestamps[1:] != timestamps[:-1]])
+    ends = np.r_[starts[1:], len(timestamps)]
+    frame_times = timestamps[starts].tolist()
+    
+    # Colonnes converties une fois en listes Python (pas de dict par ligne du DataFrame)
+    columns = {name: match_data[name].to_list() for name in PLAYER_COLUMNS}
+    
+    # Ne plus filtrer côté backend - envoyer tous les joueurs
+    # Le frontend gère le filtrage selon le POV
+    players_per_frame = [
+        [
+            {
+                'participant_id': columns['participant_id'][i],
+                'champion': columns['champion'][i],
+                'team': columns['team'][i],
+                'position': {'x': columns['position_x'][i], 'y': columns['position_y'][i]},
+                'visible_to_enemy': columns['visible_to_enemy'][i],
+                'level': columns['level'][i],
+                'total_gold': columns['total_gold'][i],
+            }
+            for i in range(start, end)
+        ]
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+    
+    # Tourelles encore debout à chaque frame: (frames, tourelles) par équipe
+    turrets_alive = {}
+    if turret_timeline:
+        turrets_alive = {team: turret_timeline.alive_at(team, frame_times) for team in (100, 200)}
     
-    # Grouper par timestamp
     frames = []
-    for timestamp in match_data.select('timestamp').unique().sort('timestamp').to_series():
-        frame_data = match_data.filter(pl.col('timestamp') == timestamp)
-        
-        players = []
-        for row in frame_data.iter_rows(named=True):
-            # Ne plus filtrer côté backend - envoyer tous les joueurs
-            # Le frontend gère le filtrage selon le POV
-            players.append({
-                'participant_id': row['participant_id'],
-                'champion': row['champion'],
-                'team': row['team'],
-                'position': {
-                    'x': row['position_x'],
-                    'y': row['position_y']
-                },
-                'visible_to_enemy': row['visible_to_enemy'],
-                'level': row['level'],
-                'total_gold': row['total_gold']
-            })
-        
+    for k, (timestamp, players) in enumerate(zip(frame_times, players_per_frame)):
         # Informations sur les wards
         ward_info = {
             'active_wards': [],
@@ -285,12 +185,19 @@ def get_match_frames(match_id):
                     'is_new': is_new  # Placée dans la dernière minute
                 })
         
+        # Tourelles encore debout (masque de bits, recherche binaire)
+        turret_info = {
+            str(team): [{'x': int(x), 'y': int(y)} for x, y in TURRET_POSITIONS[team][alive[k]]]
+            for team, alive in turrets_alive.items()
+        }
+        
         frames.append({
             'timestamp': timestamp,
             'time_min': timestamp // 60000,
             'time_sec': (timestamp // 1000) % 60,
             'players': players,
-            'wards': ward_info
+            'wards': ward_info,
+            'turrets': turret_info
         })
     
     return jsonify({
@@ -299,6 +206,52 @@ def get_match_frames(match_id):
     })
 
 
+@app.route('/api/match/<match_id>/coverage')
+def get_match_coverage(match_id):
+    """
+    Part de la map et de chaque région en vision de chaque équipe, par timestamp
+    
+    Colonnes coverage_<région> du dataset (une valeur par équipe et par
+    timestamp). Paramètre regions: liste séparée par des virgules
+    (défaut: toutes, voir COVERAGE_REGIONS).
+    """
+    if df is None:
+        return jsonify({'error': 'Dataset non chargé'}), 500
+    
+    regions = request.args.get('regions')
+    regions = regions.split(',') if regions else list(COVERAGE_REGIONS)
+    unknown = [r for r in regions if r not in COVERAGE_REGIONS]
+    if unknown:
+        return jsonify({'error': f"Régions inconnues: {', '.join(unknown)}", 'regions': list(COVERAGE_REGIONS)}), 400
+    
+    columns = [f'coverage_{region}' for region in regions]
+    if not set(columns) <= set(df.collect_schema().names()):
+        return jsonify({'error': 'Dataset sans couverture de vision: relancer timeline_processor'}), 500
+    
+    # Même valeur pour tous les joueurs d'une équipe à un timestamp
+    coverage = (
+        df.filter(pl.col('match_id') == match_id)
+        .group_by('team', 'timestamp')
+        .agg(pl.col(columns).first())
+        .sort('team', 'timestamp')
+        .collect()
+    )
+    if coverage.height == 0:
+        return jsonify({'error': 'Match non trouvé'}), 404
+    if coverage[columns[0]].null_count() == coverage.height:
+        return jsonify({'error': 'Couverture non calculée: relancer timeline_processor --coverage'}), 404
+    
+    teams = {}
+    for team in TEAMS:
+        team_rows = coverage.filter(pl.col('team') == team)
+        teams[str(team)] = {
+            'timestamps': team_rows['timestamp'].to_list(),
+            **{region: team_rows[column].cast(pl.Float64).round(4).to_list() for region, column in zip(regions, columns)},
+        }
+    
+    return jsonify({'match_id': match_id, 'regions': regions, 'teams': teams})
+
+
 @app.route('/api/match/<match_id>/frame/<int:timestamp>')
 def get_frame(match_id, timestamp):
     """Récupérer une frame spécifique"""
@@ -309,7 +262,7 @@ def get_frame(match_id, timestamp):
     frame_data = df.filter(
         (pl.col('match_id') == match_id) & 
         (pl.col('timestamp') == timestamp)
-    )
+    ).collect()
     
     if frame_data.height == 0:
         return jsonify({'error': 'Frame non trouvée'}), 404